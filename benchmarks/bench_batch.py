@@ -0,0 +1,33 @@
+"""
+Offline replay cost: per-row tick/predict versus the vectorized predict_batch.
+
+    python -m benchmarks.bench_batch
+"""
+import time
+import numpy as np
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+
+
+def synthetic_feed(n, seed=0):
+    rng = np.random.default_rng(seed)
+    times = 100 + np.cumsum(rng.exponential(0.06, size=n))
+    dove_locations = np.cumsum(rng.standard_t(df=3, size=n) * 0.01)
+    return times, dove_locations
+
+
+if __name__ == '__main__':
+    times, dove_locations = synthetic_feed(200000)
+    for tracker_class in [EMWAVarTracker, MixtureTracker]:
+        tracker = tracker_class()
+        start = time.perf_counter()
+        for t, x in zip(times.tolist(), dove_locations.tolist()):
+            tracker.tick({'time': t, 'dove_location': x}, {})
+            tracker.predict()
+        slow = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tracker_class().predict_batch(times, dove_locations)
+        fast = time.perf_counter() - start
+        print(f"{tracker_class.__name__:16s}: loop {1e6 * slow / len(times):6.2f} us/row, "
+              f"predict_batch {1e6 * fast / len(times):5.2f} us/row, speedup {slow / fast:5.1f}x")
@@ -0,0 +1,29 @@
+"""
+Cost of updating many fading factors: a list of FEWVar instances versus one FEWVarBank.
+
+    python -m benchmarks.bench_fewbank
+"""
+import time
+import numpy as np
+from birdgame.stats.fewvar import FEWVar
+from birdgame.stats.fewvarbank import FEWVarBank
+
+
+if __name__ == '__main__':
+    xs = np.random.default_rng(0).normal(size=5000).tolist()
+    for n_factors in [3, 30, 300]:
+        fading_factors = np.geomspace(1e-4, 0.5, n_factors)
+        fewvars = [FEWVar(fading_factor=f) for f in fading_factors]
+        start = time.perf_counter()
+        for x in xs:
+            for v in fewvars:
+                v.update(x)
+        slow = time.perf_counter() - start
+
+        bank = FEWVarBank(fading_factors)
+        start = time.perf_counter()
+        for x in xs:
+            bank.update(x)
+        fast = time.perf_counter() - start
+        print(f"{n_factors:4d} fading factors: FEWVar list {1e6 * slow / len(xs):8.2f} us/update, "
+              f"FEWVarBank {1e6 * fast / len(xs):6.2f} us/update, speedup {slow / fast:5.1f}x")
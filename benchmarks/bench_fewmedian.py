@@ -0,0 +1,23 @@
+"""
+Cost of a rolling median update for the two FEWMedian backends as the window grows.
+
+    python -m benchmarks.bench_fewmedian
+"""
+import time
+import numpy as np
+from birdgame.stats.fewmedian import FEWMedian
+
+
+if __name__ == '__main__':
+    for window_size in [6, 100, 1000, 10_000, 100_000]:
+        n = max(20_000, 2 * window_size)
+        xs = np.random.default_rng(0).normal(size=n).tolist()
+        timings = {}
+        for backend in ['sorted', 'heaps']:
+            median_filter = FEWMedian(window_size=window_size, backend=backend)
+            start = time.perf_counter()
+            for x in xs:
+                median_filter.update(x)
+            timings[backend] = 1e6 * (time.perf_counter() - start) / n
+        print(f"window {window_size:8d}: sorted {timings['sorted']:7.2f} us/update, "
+              f"heaps {timings['heaps']:7.2f} us/update")
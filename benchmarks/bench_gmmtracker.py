@@ -0,0 +1,33 @@
+"""
+GMMTracker fit modes: tick latency and log-likelihood on a simulated feed.
+
+'sync, cold' is the original behaviour, a fresh fit inside tick every batch_size differences.
+
+    python -m benchmarks.bench_gmmtracker
+"""
+import time
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.gmmtracker import GMMTracker
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+
+MODES = {
+    'sync, cold': dict(fit_mode='sync', warm_start=False),
+    'sync, warm': dict(fit_mode='sync', warm_start=True),
+    'background': dict(fit_mode='background', warm_start=True),
+    'online': dict(fit_mode='online'),
+}
+
+
+if __name__ == '__main__':
+    n_rows = 30_000
+    payloads = list(simulated_data_generator(n_rows, seed=0, mean_dt=0.06, jump_rate=0.5, sigma=0.5))
+    for label, kwargs in MODES.items():
+        evaluator = TrackerEvaluator(GMMTracker(burn_in=2000, **kwargs))
+        start = time.perf_counter()
+        for payload in payloads:
+            evaluator.tick_and_predict(payload, {})
+        elapsed = time.perf_counter() - start
+        s = evaluator.latency.summary(percentiles=(50, 99, 99.9))
+        print(f"{label:11s}: {n_rows / elapsed:7.0f} ticks/s, tick p50 {s['tick_p50_ms']:6.3f} ms, "
+              f"p99 {s['tick_p99_ms']:7.3f} ms, p99.9 {s['tick_p99.9_ms']:7.3f} ms, max {s['tick_max_ms']:7.1f} ms, "
+              f"refits {evaluator.tracker.refit_count:3d}, log-likelihood {evaluator.overall_likelihood_score():.4f}")
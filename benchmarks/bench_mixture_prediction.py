@@ -0,0 +1,57 @@
+"""
+Cost per predict of building the prediction dict: a fresh dict followed by the `density_pdf`
+validity check (as MixtureTracker used to do), and the fresh dict alone, as the trackers now
+return it. Reports time and the memory allocated per call.
+
+    python -m benchmarks.bench_mixture_prediction
+"""
+import time
+import tracemalloc
+from densitypdf import density_pdf
+
+
+def fresh_dict(loc, stds, weights):
+    components = []
+    for i, x_std in enumerate(stds):
+        components.append({
+            "density": {
+                "type": "builtin",
+                "name": "norm",
+                "params": {"loc": loc, "scale": x_std}
+            },
+            "weight": weights[i]
+        })
+    return {"type": "mixture", "components": components}
+
+
+def fresh_dict_validated(loc, stds, weights):
+    prediction = fresh_dict(loc, stds, weights)
+    _ = density_pdf(prediction, x=0.0)
+    return prediction
+
+
+def measure(predict, n):
+    start = time.perf_counter()
+    for i in range(n):
+        predict(0.001 * i)
+    seconds = (time.perf_counter() - start) / n
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [predict(0.001 * i) for i in range(1000)]  # Kept, as an evaluator's quarantine would
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / len(kept)
+    return seconds, allocated
+
+
+if __name__ == '__main__':
+    n = 100_000
+    stds, weights = [0.01, 0.05], [0.9, 0.1]
+    candidates = {
+        'dict + density_pdf': lambda loc: fresh_dict_validated(loc, stds, weights),
+        'dict': lambda loc: fresh_dict(loc, stds, weights),
+    }
+    for label, predict in candidates.items():
+        seconds, allocated = measure(predict, n)
+        print(f"{label:18s}: {1e6 * seconds:6.2f} us per predict, {allocated:6.0f} bytes kept per predict")
@@ -0,0 +1,39 @@
+"""
+Per-tick scoring cost of the closed-form mixture scorer versus density_pdf.
+
+    python -m benchmarks.bench_mixture_scorer
+"""
+import time
+import numpy as np
+from densitypdf import density_pdf
+from birdgame.trackers.mixture_scorer import mixture_pdf, batch_mixture_pdf
+
+
+def make_predictions(n, n_components, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"type": "mixture",
+             "components": [{"density": {"type": "builtin", "name": "norm",
+                                         "params": {"loc": float(rng.normal()), "scale": float(rng.uniform(0.1, 2))}},
+                             "weight": float(rng.uniform())} for _ in range(n_components)]}
+            for _ in range(n)]
+
+
+def per_call_us(fn, predictions, xs):
+    start = time.perf_counter()
+    for prediction, x in zip(predictions, xs):
+        fn(prediction, x)
+    return 1e6 * (time.perf_counter() - start) / len(predictions)
+
+
+if __name__ == '__main__':
+    n = 50000
+    xs = [float(x) for x in np.random.default_rng(1).normal(size=n)]
+    for n_components in [1, 2, 5]:
+        predictions = make_predictions(n, n_components)
+        slow = per_call_us(lambda p, x: density_pdf(p, x=x), predictions, xs)
+        fast = per_call_us(mixture_pdf, predictions, xs)
+        start = time.perf_counter()
+        batch_mixture_pdf(predictions, xs)
+        batch = 1e6 * (time.perf_counter() - start) / n
+        print(f"{n_components} components: density_pdf {slow:6.2f} us/tick, mixture_pdf {fast:6.2f} us/tick, "
+              f"batch {batch:6.2f} us/prediction")
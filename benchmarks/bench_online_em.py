@@ -0,0 +1,65 @@
+"""
+OnlineEMMixtureTracker against the batch mixture trackers on the same simulated feed: throughput,
+tick latency, memory held by the tracker and log-likelihood. GMMTracker refits are shown for two
+window lengths, since their cost grows with the window while online EM does not have one.
+TorchGMMTracker is included when torch and tgmm are installed.
+
+    python -m benchmarks.bench_online_em
+"""
+import time
+import tracemalloc
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.gmmtracker import GMMTracker
+from birdgame.examples.derived.onlineemmixturetracker import OnlineEMMixtureTracker
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+
+try:
+    from birdgame.examples.derived.torchgmmtracker import TorchGMMTracker, using_tgmm
+except ImportError:
+    using_tgmm = False
+
+BURN_IN = 2000
+
+
+def run(tracker, payloads):
+    evaluator = TrackerEvaluator(tracker)
+    start = time.perf_counter()
+    for payload in payloads:
+        evaluator.tick_and_predict(payload, {})
+    elapsed = time.perf_counter() - start
+    if getattr(tracker, 'fit_mode', None) == 'background':
+        tracker.wait_for_refit()
+    return evaluator, elapsed
+
+
+def candidates():
+    trackers = {'online EM': lambda: OnlineEMMixtureTracker(burn_in=BURN_IN)}
+    if GMMTracker is not None:
+        for window_len in (2_000, 10_000):
+            for fit_mode in ('sync', 'background'):
+                trackers[f'GMM {fit_mode}, window {window_len}'] = \
+                    lambda fit_mode=fit_mode, window_len=window_len: GMMTracker(burn_in=BURN_IN, fit_mode=fit_mode,
+                                                                                 window_len=window_len)
+    if using_tgmm:
+        trackers['TorchGMM'] = lambda: TorchGMMTracker()
+    return trackers
+
+
+if __name__ == '__main__':
+    n_rows = 30_000
+    payloads = list(simulated_data_generator(n_rows, seed=0, mean_dt=0.06, jump_rate=0.5, sigma=0.5))
+    if not using_tgmm:
+        print("TorchGMMTracker skipped (torch or tgmm is not installed)")
+    for label, make_tracker in candidates().items():
+        evaluator, elapsed = run(make_tracker(), payloads)
+        s = evaluator.latency.summary(percentiles=(50, 99, 99.9))
+
+        tracemalloc.start()  # A second pass, as tracing would distort the timings
+        kept = run(make_tracker(), payloads)  # Kept, so `current` is what the tracker still holds
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{label:28s}: {n_rows / elapsed:6.0f} ticks/s, tick p50 {s['tick_p50_ms']:6.3f} ms, "
+              f"p99.9 {s['tick_p99.9_ms']:7.3f} ms, max {s['tick_max_ms']:6.1f} ms, "
+              f"memory {current / 1e6:5.2f} MB (peak {peak / 1e6:5.2f} MB), "
+              f"log-likelihood {evaluator.overall_likelihood_score():.4f}")
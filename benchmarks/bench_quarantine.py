@@ -0,0 +1,46 @@
+"""
+Micro-benchmark comparing the deque-backed Quarantine with the original list-based implementation.
+
+    python -m benchmarks.bench_quarantine
+"""
+import time
+from birdgame.trackers.trackerbase import Quarantine
+
+
+class ListQuarantine:
+    """ The original list-based implementation, for comparison. """
+
+    def __init__(self, horizon):
+        self.horizon = horizon
+        self.quarantine = []
+
+    def add_to_quarantine(self, time, value):
+        self.quarantine.append((time + self.horizon, value))
+
+    def pop_from_quarantine(self, current_time):
+        valid = [(j, (ti, xi)) for (j, (ti, xi)) in enumerate(self.quarantine) if ti <= current_time]
+        if valid:
+            prev_ndx, (ti, prev_x) = valid[-1]
+            self.quarantine = self.quarantine[prev_ndx:]
+            return prev_x
+        return None
+
+
+def run(quarantine, n_ticks, ticks_per_second):
+    dt = 1.0 / ticks_per_second
+    start = time.perf_counter()
+    for i in range(n_ticks):
+        t = i * dt
+        quarantine.add_to_quarantine(t, i)
+        quarantine.pop_from_quarantine(t)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_ticks = 50000
+    for ticks_per_second in [1, 17, 100, 1000]:
+        backlog = 3 * ticks_per_second
+        slow = run(ListQuarantine(horizon=3), n_ticks, ticks_per_second)
+        fast = run(Quarantine(horizon=3), n_ticks, ticks_per_second)
+        print(f"backlog ~{backlog:5d}: list {1e6 * slow / n_ticks:8.2f} us/tick, "
+              f"deque {1e6 * fast / n_ticks:6.2f} us/tick, speedup {slow / fast:7.1f}x")
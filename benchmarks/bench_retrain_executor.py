@@ -0,0 +1,63 @@
+"""
+Tick latency of a tracker while a Python-bound model is retrained every `every` ticks, either on a
+thread (as NGBoostTracker and AutoETSsktimeTracker did) or through the RetrainExecutor's worker
+process. The fit is deliberately pure Python, like much of NGBoost's boosting loop.
+
+    python -m benchmarks.bench_retrain_executor
+"""
+import threading
+import time
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+from birdgame.trackers.latency_monitor import LatencyHistogram
+from birdgame.trackers.retrain_executor import RetrainExecutor, shared_pool
+from birdgame.trackers.ring_buffer import RingBuffer
+
+
+def fit_python(model, y, n_rounds=30):
+    """ Stands in for a slow fit that holds the GIL: repeated passes over the data in Python. """
+    values = y.tolist()
+    level = 0.0
+    for _ in range(n_rounds):
+        for v in values:
+            level += 0.01 * (v - level)
+    return {'model': model, 'level': level}
+
+
+def run(payloads, mode, every=200):
+    tracker = MixtureTracker()
+    buffer = RingBuffer(5000)
+    histogram = LatencyHistogram()
+    executor = RetrainExecutor(fit=fit_python) if mode == 'process' else None
+    threads = []
+    for i, payload in enumerate(payloads):
+        start = time.perf_counter_ns()
+        tracker.tick(payload, {})
+        tracker.predict()
+        buffer.append(payload['dove_location'])
+        if i and i % every == 0:
+            if executor is not None:
+                executor.submit('level', buffer.view(), version=i)
+            elif mode == 'thread':
+                thread = threading.Thread(target=fit_python, args=('level', buffer.view().copy()), daemon=True)
+                thread.start()
+                threads.append(thread)
+        histogram.record(time.perf_counter_ns() - start)
+    for thread in threads:
+        thread.join()
+    metrics = executor.metrics() if executor is not None else {}
+    if executor is not None:
+        executor.close()
+    return histogram, metrics
+
+
+if __name__ == '__main__':
+    payloads = list(simulated_data_generator(20_000, seed=0, mean_dt=0.06))
+    shared_pool().submit(int).result()  # Start the worker before timing
+    for mode in ('none', 'thread', 'process'):
+        histogram, metrics = run(payloads, mode)
+        s = histogram.summary(percentiles=(50, 99, 99.9))
+        extra = (f", fits {metrics['completed']}, coalesced {metrics['coalesced']}, "
+                 f"fit p50 {metrics['fit_p50_ms']:.0f} ms, versions behind {metrics['versions_behind']}") if metrics else ''
+        print(f"retrain {mode:7s}: tick+predict p50 {s['p50_ms']:6.3f} ms, p99 {s['p99_ms']:6.3f} ms, "
+              f"p99.9 {s['p99.9_ms']:6.3f} ms, max {s['max_ms']:6.1f} ms{extra}")
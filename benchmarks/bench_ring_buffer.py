@@ -0,0 +1,62 @@
+"""
+Cost of preparing NGBoostTracker's training set (X from windows of previous locations, y the
+current ones) from a list of (prev_x, x) tuples, as the tracker used to, and from RingBuffers.
+Also reports the cost of one append, and the memory allocated by one preparation.
+
+    python -m benchmarks.bench_ring_buffer
+"""
+import time
+import tracemalloc
+import numpy as np
+from birdgame.trackers.ring_buffer import RingBuffer
+
+NUM_DATA_POINTS_MAX = 1000
+WINDOW_SIZE = 5
+
+
+def prepare_from_list(x_y_data):
+    x_y_data = np.array(x_y_data)
+    xi_values, yi_values = x_y_data[:, 0], x_y_data[:, 1]
+    X = np.lib.stride_tricks.sliding_window_view(xi_values[-(NUM_DATA_POINTS_MAX + WINDOW_SIZE - 1):], WINDOW_SIZE)
+    return X, yi_values[-NUM_DATA_POINTS_MAX:]
+
+
+def prepare_from_ring(xi_data, yi_data):
+    return xi_data.windows(WINDOW_SIZE)[-NUM_DATA_POINTS_MAX:], yi_data.view(NUM_DATA_POINTS_MAX)
+
+
+def timed(f, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        f()
+    return 1e6 * (time.perf_counter() - start) / n
+
+
+def allocated(f):
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    capacity = NUM_DATA_POINTS_MAX + 2 * WINDOW_SIZE
+    values = np.random.default_rng(0).normal(size=(capacity, 2)).tolist()
+    x_y_data = [tuple(row) for row in values]
+    xi_data, yi_data = RingBuffer(capacity), RingBuffer(capacity)
+    for prev_x, x in values:
+        xi_data.append(prev_x)
+        yi_data.append(x)
+
+    assert all(np.array_equal(a, b) for a, b in zip(prepare_from_list(x_y_data), prepare_from_ring(xi_data, yi_data)))
+    print(f"prepare from list   : {timed(lambda: prepare_from_list(x_y_data), 2000):8.2f} us, "
+          f"{allocated(lambda: prepare_from_list(x_y_data)):7d} bytes")
+    print(f"prepare from ring   : {timed(lambda: prepare_from_ring(xi_data, yi_data), 2000):8.2f} us, "
+          f"{allocated(lambda: prepare_from_ring(xi_data, yi_data)):7d} bytes")
+    print(f"append + prepare    : {timed(lambda: (xi_data.append(0.1), yi_data.append(0.2), prepare_from_ring(xi_data, yi_data)), 2000):8.2f} us "
+          f"(windows not cached)")
+    print(f"prepare + copy      : {timed(lambda: [a.copy() for a in prepare_from_ring(xi_data, yi_data)], 2000):8.2f} us "
+          f"(what the threaded tracker hands to its worker)")
+    print(f"list append         : {timed(lambda: x_y_data.append((0.1, 0.2)), 100_000):8.2f} us")
+    print(f"ring append (x2)    : {timed(lambda: (xi_data.append(0.1), yi_data.append(0.2)), 100_000):8.2f} us")
@@ -0,0 +1,28 @@
+"""
+Cost of running the stats estimators over a whole series: repeated `update` versus `update_many`.
+
+    python -m benchmarks.bench_update_many
+"""
+import time
+import numpy as np
+from birdgame.stats.fewmean import FEWMean
+from birdgame.stats.fewvar import FEWVar
+from birdgame.stats.tanhmean import TanhMean
+from birdgame.stats.jumpdiffusion import jump_diffusion
+
+
+if __name__ == '__main__':
+    xs = np.asarray(jump_diffusion(100_000, jump_rate=0.01, jump_size=20, epsilon=0.3, vega=2.0, seed=0))
+    for make in [lambda: FEWMean(0.01), lambda: FEWVar(0.01), lambda: TanhMean(mean_fading_factor=0.05)]:
+        estimator = make()
+        start = time.perf_counter()
+        for x in xs.tolist():
+            estimator.update(x)
+        slow = time.perf_counter() - start
+
+        estimator = make()
+        start = time.perf_counter()
+        estimator.update_many(xs)
+        fast = time.perf_counter() - start
+        print(f"{type(estimator).__name__:8s}: update {1e3 * slow:8.1f} ms, update_many {1e3 * fast:7.1f} ms, "
+              f"speedup {slow / fast:5.1f}x")
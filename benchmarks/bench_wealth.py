@@ -0,0 +1,35 @@
+"""
+Per-tick cost of update_wealth (dict of players) versus WealthBook (arrays) as the number of players grows.
+
+    python -m benchmarks.bench_wealth
+"""
+import time
+import numpy as np
+from birdgame.wealth.wealth_mechanism import update_wealth
+from birdgame.wealth.wealth_book import WealthBook
+
+
+def time_dict(likelihoods):
+    n = likelihoods.shape[1]
+    players = {i: {"wealth": 1000.0} for i in range(n)}
+    rows = [dict(enumerate(row.tolist())) for row in likelihoods]
+    start = time.perf_counter()
+    for row in rows:
+        update_wealth(players, row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def time_book(likelihoods):
+    book = WealthBook(likelihoods.shape[1])
+    start = time.perf_counter()
+    book.update_block(likelihoods)
+    return (time.perf_counter() - start) / len(likelihoods)
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    for n_players, n_ticks in [(10, 2000), (1000, 200), (100000, 5)]:
+        likelihoods = rng.lognormal(size=(n_ticks, n_players))
+        slow, fast = time_dict(likelihoods), time_book(likelihoods)
+        print(f"{n_players:6d} players: update_wealth {1e3 * slow:9.3f} ms/tick, "
+              f"WealthBook {1e3 * fast:7.3f} ms/tick, speedup {slow / fast:6.1f}x")
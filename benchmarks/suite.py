@@ -0,0 +1,318 @@
+"""
+Benchmark suite: tracker throughput and latency, evaluator scoring, update_wealth and the data loaders,
+all on a deterministic synthetic feed (`simulated_data_generator`, built on jump_diffusion).
+
+Every bundled tracker (the classes with tick and predict in birdgame.examples.derived,
+birdgame.examples.selfcontained and birdgame.model_benchmark) is run through a TrackerEvaluator. Trackers
+whose optional dependency is missing are reported as skipped. Results can be written as JSON, with the
+git commit and machine, and two such files compared to spot regressions between commits.
+
+    python -m benchmarks.suite                              # Print results
+    python -m benchmarks.suite --quick --json before.json   # Smaller feeds, save the results
+    python -m benchmarks.suite --only tracker.              # Only benchmarks whose name contains 'tracker.'
+    python -m benchmarks.suite --compare before.json after.json
+"""
+import argparse
+import importlib
+import inspect
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from birdgame.datasources.cachedtestdata import TEST_DATA_SKIP_ROWS, cached_test_data_batches, \
+    cached_test_data_generator
+from birdgame.datasources.feedrecorder import record_feed, recorded_feed_batches, recorded_feed_generator
+from birdgame.datasources.simulateddata import simulated_data_batches, simulated_data_generator
+from birdgame.stats.fewvar import FEWVar
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+from birdgame.wealth.wealth_book import WealthBook
+from birdgame.wealth.wealth_mechanism import update_wealth
+
+SUITE_VERSION = 1
+TRACKER_PACKAGES = ['birdgame.examples.derived', 'birdgame.examples.selfcontained', 'birdgame.model_benchmark']
+FEED = dict(seed=0, mean_dt=0.06, jump_rate=0.5, sigma=0.5)
+TRACKER_KWARGS = {}  # Constructor arguments by class name, for trackers whose defaults do not suit the feed
+PLAYER_COUNTS = (10, 100, 1000, 10000)
+PERCENTILES = (50, 99)
+
+
+def bundled_trackers():
+    """
+    ({name: tracker class}, {name: reason skipped}) for the tracker modules of TRACKER_PACKAGES, where
+    name is 'module:Class'. A module that cannot be imported, or whose `using_*` flags are False
+    (an optional dependency is missing), is skipped.
+    """
+    trackers, skipped = {}, {}
+    for package_name in TRACKER_PACKAGES:
+        package = importlib.import_module(package_name)
+        for info in pkgutil.iter_modules(package.__path__):
+            module_name = f'{package_name}.{info.name}'
+            short_name = module_name.rsplit('.', 1)[-1]
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                skipped[short_name] = f'import failed: {e}'
+                continue
+            missing = [name[len('using_'):] for name, value in vars(module).items()
+                       if name.startswith('using_') and value is False]
+            if missing:
+                skipped[short_name] = f"{', '.join(missing)} not installed"
+                continue
+            for name, cls in vars(module).items():
+                if inspect.isclass(cls) and cls.__module__ == module_name and callable(getattr(cls, 'tick', None)) \
+                        and callable(getattr(cls, 'predict', None)):
+                    trackers[f'{short_name}:{name}'] = cls
+    return trackers, skipped
+
+
+def best_of(fn, repeat):
+    """ Smallest wall clock time of `repeat` calls to fn(), in seconds. """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_tracker(cls, payloads):
+    """ Ticks per second and tick/predict latency percentiles through a TrackerEvaluator, plus its score. """
+    evaluator = TrackerEvaluator(cls(**TRACKER_KWARGS.get(cls.__name__, {})))
+    start = time.perf_counter()
+    for payload in payloads:
+        evaluator.tick_and_predict(payload, {})
+    elapsed = time.perf_counter() - start
+    latency = evaluator.latency
+    result = {'ticks_per_s': latency.total.count / (1e-9 * latency.total.total),
+              'evaluated_ticks_per_s': len(payloads) / elapsed}
+    for kind in ('tick', 'predict', 'total'):
+        result.update(getattr(latency, kind).summary(PERCENTILES, prefix=f'{kind}_'))
+    result['log_likelihood'] = evaluator.overall_likelihood_score()
+    return result
+
+
+def bench_scoring(payloads, repeat):
+    """ Cost of TrackerEvaluator.score_prediction (quarantine plus mixture pdf) on recorded predictions. """
+    from birdgame.examples.derived.mixturetracker import MixtureTracker
+
+    tracker = MixtureTracker()
+    predictions = [tracker.tick_and_predict(payload, {}) for payload in payloads]
+
+    def score_all():
+        evaluator = TrackerEvaluator(tracker)
+        for payload, prediction in zip(payloads, predictions):
+            evaluator.score_prediction(payload, prediction)
+
+    return {'score_us': 1e6 * best_of(score_all, repeat) / len(payloads)}
+
+
+def bench_fewvar(payloads, repeat):
+    xs = np.diff([payload['dove_location'] for payload in payloads]).tolist()
+
+    def update_all():
+        fewvar = FEWVar(fading_factor=1e-4)
+        for x in xs:
+            fewvar.update(x)
+
+    return {'update_ns': 1e9 * best_of(update_all, repeat) / len(xs)}
+
+
+def bench_wealth(n_players, n_ticks, repeat):
+    """ update_wealth (dict of players) and WealthBook (arrays) per tick, for `n_players` players. """
+    likelihoods = np.random.default_rng(0).lognormal(size=(n_ticks, n_players))
+    rows = [dict(enumerate(row.tolist())) for row in likelihoods]
+
+    def dict_run():
+        players = {i: {'wealth': 1000.0} for i in range(n_players)}
+        for row in rows:
+            update_wealth(players, row)
+
+    def book_run():
+        WealthBook(n_players).update_block(likelihoods)
+
+    update_wealth_s = best_of(dict_run, repeat) / n_ticks
+    return {'update_wealth_us': 1e6 * update_wealth_s,
+            'update_wealth_ns_per_player': 1e9 * update_wealth_s / n_players,
+            'wealth_book_us': 1e6 * best_of(book_run, repeat) / n_ticks}
+
+
+def write_feed_csv(path, n_rows):
+    """
+    The simulated feed as a CSV laid out like the remote test data, so the column cache can be
+    benchmarked offline: the first TEST_DATA_SKIP_ROWS rows are padding and times are multiplied by pi.
+    """
+    batches = list(simulated_data_batches(n_rows + TEST_DATA_SKIP_ROWS, batch_size=100_000, **FEED))
+    columns = {name: np.concatenate([batch[name] for batch in batches])
+               for name in ('time', 'falcon_location', 'dove_location', 'falcon_id')}
+    columns['time'] = (columns['time'] + 100) * np.pi
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def bench_loaders(n_rows, repeat, directory):
+    """ Rows per second of each offline data loader, as payloads (generator) and as column batches. """
+
+    def rate(make_iterator):
+        def consume():
+            for _ in make_iterator():
+                pass
+        return n_rows / best_of(consume, repeat)
+
+    def read(batches):
+        # Batches of memory-mapped views cost nothing until they are read
+        return (float(batch['dove_location'].sum()) for batch in batches)
+
+    results = {
+        'simulated': {'generator_rows_per_s': rate(lambda: simulated_data_generator(n_rows, **FEED)),
+                      'batches_rows_per_s': rate(lambda: read(simulated_data_batches(n_rows, **FEED)))},
+    }
+
+    recording = os.path.join(directory, 'recording')
+    start = time.perf_counter()
+    for _ in record_feed(simulated_data_generator(n_rows, **FEED), recording):
+        pass
+    results['recorded'] = {
+        'record_rows_per_s': n_rows / (time.perf_counter() - start),
+        'generator_rows_per_s': rate(lambda: recorded_feed_generator(recording)),
+        'batches_rows_per_s': rate(lambda: read(recorded_feed_batches(recording))),
+    }
+
+    csv_path = os.path.join(directory, 'bird_feed_data.csv')
+    write_feed_csv(csv_path, n_rows)
+    start = time.perf_counter()
+    next(cached_test_data_batches(csv_path=csv_path, max_rows=1))  # Builds the column cache
+    build_s = time.perf_counter() - start
+    results['cached'] = {
+        'build_rows_per_s': n_rows / build_s,
+        'generator_rows_per_s': rate(lambda: cached_test_data_generator(csv_path=csv_path)),
+        'batches_rows_per_s': rate(lambda: read(cached_test_data_batches(csv_path=csv_path))),
+    }
+    return results
+
+
+def run(n_rows=20_000, n_loader_rows=200_000, repeat=3, only=None):
+    """
+    Run the suite. Returns {'benchmarks': {name: {metric: value}}, 'skipped': {name: reason}}.
+    Names are dotted, e.g. 'tracker.mixturetracker:MixtureTracker' or 'wealth.players_1000'.
+    """
+    benchmarks, skipped = {}, {}
+
+    def wanted(name):
+        return only is None or any(pattern in name for pattern in only)
+
+    payloads = list(simulated_data_generator(n_rows, **FEED))
+    trackers, skipped_trackers = bundled_trackers()
+    skipped.update({f'tracker.{name}': reason for name, reason in skipped_trackers.items()})
+    for name, cls in sorted(trackers.items()):
+        if wanted(f'tracker.{name}'):
+            benchmarks[f'tracker.{name}'] = bench_tracker(cls, payloads)
+
+    if wanted('evaluator.score_prediction'):
+        benchmarks['evaluator.score_prediction'] = bench_scoring(payloads, repeat)
+    if wanted('stats.fewvar'):
+        benchmarks['stats.fewvar'] = bench_fewvar(payloads, repeat)
+
+    for n_players in PLAYER_COUNTS:
+        if wanted(f'wealth.players_{n_players}'):
+            n_ticks = max(10, 200_000 // n_players)  # About the same work for every size
+            benchmarks[f'wealth.players_{n_players}'] = bench_wealth(n_players, n_ticks, repeat)
+
+    if any(wanted(f'loader.{kind}') for kind in ('simulated', 'recorded', 'cached')):
+        with tempfile.TemporaryDirectory() as directory:
+            for kind, result in bench_loaders(n_loader_rows, repeat, directory).items():
+                if wanted(f'loader.{kind}'):
+                    benchmarks[f'loader.{kind}'] = result
+    return {'benchmarks': benchmarks, 'skipped': skipped}
+
+
+def git_commit():
+    """ (commit hash, True if the working tree has uncommitted changes), or (None, None) outside git. """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def machine():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(), 'cpu_count': os.cpu_count()}
+
+
+def compare(before, after, threshold=0.1):
+    """
+    Rows (name, metric, before, after, ratio, verdict) for the metrics of two result files, where ratio is
+    after / before and the verdict is 'slower' or 'faster' when it moved by more than `threshold` in the
+    bad or good direction. Counts and log-likelihoods are listed without a verdict.
+    """
+    rows = []
+    for name, metrics in before['benchmarks'].items():
+        for metric, old in metrics.items():
+            new = after['benchmarks'].get(name, {}).get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+                continue
+            ratio = new / old
+            verdict = ''
+            if metric.endswith(('_per_s', '_ms', '_us', '_ns', '_ns_per_player')):
+                better = ratio > 1 if metric.endswith('_per_s') else ratio < 1
+                if abs(ratio - 1) > threshold:
+                    verdict = 'faster' if better else 'slower'
+            rows.append((name, metric, old, new, ratio, verdict))
+    return rows
+
+
+def print_results(results):
+    for name, metrics in results['benchmarks'].items():
+        print(f"{name:50s} " + ', '.join(f'{metric} {value:.4g}' for metric, value in metrics.items()
+                                          if isinstance(value, float)))
+    for name, reason in results['skipped'].items():
+        print(f"{name:50s} skipped ({reason})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--quick', action='store_true', help='Smaller feeds and a single repeat')
+    parser.add_argument('--only', nargs='+', help='Only run benchmarks whose name contains one of these')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported by --compare')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], 'rb') as f:
+            before = orjson.loads(f.read())
+        with open(args.compare[1], 'rb') as f:
+            after = orjson.loads(f.read())
+        print(f"{before['commit']} -> {after['commit']}")
+        for name, metric, old, new, ratio, verdict in compare(before, after, args.threshold):
+            print(f"{name:50s} {metric:28s} {old:12.4g} {new:12.4g} {ratio:6.2f}x {verdict}")
+        return
+
+    sizes = dict(n_rows=5_000, n_loader_rows=50_000, repeat=1) if args.quick else {}
+    start = time.perf_counter()
+    results = run(only=args.only, **sizes)
+    commit, dirty = git_commit()
+    results = {'suite_version': SUITE_VERSION, 'commit': commit, 'dirty': dirty,
+               'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'machine': machine(),
+               'config': {'feed': FEED, 'quick': args.quick, **sizes}, 'seconds': time.perf_counter() - start,
+               **results}
+    print_results(results)
+    if args.json:
+        with open(args.json, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,7 +1,40 @@
 import importlib.resources
+import os
+
+# Set by set_redis_config to point everything that calls get_redis_config somewhere else
+_redis_config_override = None
+
+
+def set_redis_config(config=None):
+    """
+    Override the connection settings returned by get_redis_config, e.g. with
+    ReplayServer.redis_config() to run the live code path against a local server.
+    Pass None to go back to the public server.
+    """
+    global _redis_config_override
+    _redis_config_override = None if config is None else dict(config)
 
 
 def get_redis_config():
+    """
+    Connection settings for the bird game Redis stream.
+
+    These are, in order of precedence: the override from set_redis_config, a local server at
+    BIRDGAME_REDIS_HOST (and BIRDGAME_REDIS_PORT, default 6379) if that environment variable is set,
+    or the public server. A local server is spoken to over RESP2, which is all ReplayServer supports.
+    """
+    if _redis_config_override is not None:
+        return dict(_redis_config_override)
+
+    host = os.environ.get('BIRDGAME_REDIS_HOST')
+    if host:
+        return {
+            'host': host,
+            'port': int(os.environ.get('BIRDGAME_REDIS_PORT', 6379)),
+            'decode_responses': True,
+            'protocol': 2
+        }
+
     ca_crt = importlib.resources.read_text(__package__ + ".certificates", 'ca.crt')
 
     return {
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import numpy as np
+import orjson
+import redis
+import redis.asyncio
+from birdgame.config.getredisconfig import get_redis_config
+from birdgame.datasources.livedata import BIRD_PAYLOAD_NAME, BIRD_STREAM_NAME, FEED_COLUMNS
+
+bird_logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+
+def async_redis_client():
+    """ redis.asyncio client for the bird game stream, returning raw bytes rather than decoded strings. """
+    return redis.asyncio.Redis(**{**get_redis_config(), 'decode_responses': False})
+
+
+def payloads_to_columns(payloads):
+    """ Columnar batch, one array per feed column, from a list of payload dicts. """
+    return {name: np.array([payload[name] for payload in payloads]) for name in FEED_COLUMNS if name in payloads[0]}
+
+
+def _parse_messages(response):
+    """ (last redis id, payload dicts) from an XREAD response, parsing the raw payload bytes with orjson. """
+    last_id, payloads = None, []
+    for _stream_name, messages in response or []:
+        for redis_id, fields in messages:
+            last_id = redis_id
+            payload = fields.get(BIRD_PAYLOAD_NAME.encode(), fields.get(BIRD_PAYLOAD_NAME))
+            if payload is None:
+                raise ValueError(f"Payload '{BIRD_PAYLOAD_NAME}' not found in msg_data")
+            try:
+                payloads.append(orjson.loads(payload))
+            except orjson.JSONDecodeError as e:
+                raise ValueError(f"Failed to decode payload '{BIRD_PAYLOAD_NAME}': {e}")
+    return last_id, payloads
+
+
+async def async_live_data_generator(start_from_latest=True, max_rows=None, batch=False, count=1000, block=5000,
+                                    client=None, stream_name=BIRD_STREAM_NAME, max_retries=5):
+    """
+    Asynchronous version of `live_data_generator`, for consuming the feed inside an event loop.
+
+    The next XREAD is sent as soon as a response arrives, so it is in flight while the consumer
+    processes the current batch. Responses are read as raw bytes and parsed directly by orjson.
+    Payload dicts are yielded as parsed, without rebuilding them in a fixed key order.
+
+        async for payload in async_live_data_generator(max_rows=10):
+            tracker.tick(payload, {})
+
+    :param start_from_latest: Start at the end of the stream rather than replaying it from the beginning.
+    :param max_rows: Maximum number of rows to yield (default is None, meaning no limit).
+    :param batch: If True, yield one columnar batch (dict of arrays, see `payloads_to_columns`) per XREAD.
+    :param count: Maximum number of messages per XREAD.
+    :param block: Milliseconds each XREAD waits for new messages.
+    :param client: A redis.asyncio client, by default one from `async_redis_client`, closed on exit.
+    """
+    own_client = client is None
+    client = async_redis_client() if own_client else client
+    last_id = "$" if start_from_latest else "0-0"
+    count_rows, retries = 0, 0
+
+    def read():
+        return asyncio.ensure_future(client.xread(streams={stream_name: last_id}, count=count, block=block))
+
+    pending = read()
+    try:
+        while max_rows is None or count_rows < max_rows:
+            try:
+                response = await pending
+                retries = 0
+            except CONNECTION_ERRORS as e:
+                bird_logger.error(f"Redis connection error: {e}")
+                retries += 1
+                if retries > max_retries:
+                    bird_logger.error("Max retries reached, exiting fetch loop.")
+                    break
+                sleep_time = min(2 ** retries, 60)  # Exponential backoff up to 60 sec
+                bird_logger.info(f"Retrying after {sleep_time} seconds...")
+                await asyncio.sleep(sleep_time)
+                pending = read()
+                continue
+            except Exception:
+                bird_logger.exception("Unexpected error while reading from Redis")
+                await asyncio.sleep(1)  # Sleep to prevent excessive retries
+                pending = read()
+                continue
+
+            batch_last_id, payloads = _parse_messages(response)
+            last_id = batch_last_id or last_id
+            if max_rows is not None:
+                payloads = payloads[:max_rows - count_rows]
+            # Keep the next read in flight while this batch is consumed, unless this is the last batch
+            more = max_rows is None or count_rows + len(payloads) < max_rows
+            pending = read() if more else None
+
+            if not payloads:
+                continue
+            count_rows += len(payloads)
+            if batch:
+                yield payloads_to_columns(payloads)
+            else:
+                for payload in payloads:
+                    yield payload
+
+        if max_rows is not None and count_rows >= max_rows:
+            bird_logger.info(f"Reached MAX_ROWS={max_rows}. Stopping generator.")
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, Exception):
+                pass
+        elif pending is not None and not pending.cancelled():
+            pending.exception()  # Retrieve any error from the last read so it is not reported as unhandled
+        if own_client:
+            await client.aclose()
+
+
+if __name__ == '__main__':
+    async def main():
+        async for payload in async_live_data_generator(max_rows=10):
+            print(payload)
+
+    asyncio.run(main())
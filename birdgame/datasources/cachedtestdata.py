@@ -0,0 +1,134 @@
+import os
+import math
+import urllib.request
+import numpy as np
+import pandas as pd
+import orjson
+
+REMOTE_TEST_DATA_URL = 'https://raw.githubusercontent.com/microprediction/birdgame/refs/heads/main/data/bird_feed_data.csv'
+TEST_DATA_START_TIME = 90
+TEST_DATA_SKIP_ROWS = 501  # The first rows of the recorded feed are not used
+MANIFEST_NAME = 'manifest.json'
+
+
+def default_cache_dir():
+    return os.environ.get('BIRDGAME_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'birdgame'))
+
+
+def local_test_data_path(cache_dir=None, url=REMOTE_TEST_DATA_URL):
+    """
+    Path of a local copy of the remote test data, downloading it the first time only.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    path = os.path.join(cache_dir, os.path.basename(url))
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + '.part'
+        urllib.request.urlretrieve(url, tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _columns_dir(csv_path, cache_dir=None):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir or os.path.dirname(os.path.abspath(csv_path)), stem + '_columns')
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_column_cache(csv_path, cache_dir=None):
+    """
+    Convert the CSV once into one .npy file per column, with the same preprocessing as
+    `remote_test_data_generator` already applied:
+
+      - the first TEST_DATA_SKIP_ROWS rows are dropped
+      - time is divided by pi
+      - only rows whose time exceeds every earlier time are kept
+
+    Because the kept times are strictly increasing, the generator's `start_time` filter is
+    then just a `searchsorted` on the cached time column.
+    """
+    df = pd.read_csv(csv_path).iloc[TEST_DATA_SKIP_ROWS:]
+    time = df['time'].to_numpy(dtype=float) / math.pi
+    previous_max = np.maximum.accumulate(np.concatenate([[-np.inf], time[:-1]]))
+    keep = time > previous_max
+
+    columns_dir = _columns_dir(csv_path, cache_dir)
+    os.makedirs(columns_dir, exist_ok=True)
+    columns = list(df.columns)
+    for name in columns:
+        values = time if name == 'time' else df[name].to_numpy()
+        np.save(os.path.join(columns_dir, name + '.npy'), np.ascontiguousarray(values[keep]))
+
+    # Written last, so a partially built cache is never mistaken for a valid one
+    manifest = {'columns': columns, 'source': _source_signature(csv_path)}
+    with open(os.path.join(columns_dir, MANIFEST_NAME), 'wb') as f:
+        f.write(orjson.dumps(manifest))
+    return columns_dir
+
+
+def load_test_data_columns(csv_path=None, cache_dir=None, start_time=TEST_DATA_START_TIME):
+    """
+    Memory-mapped columns of the test data, building the column cache on first use.
+
+    :param csv_path: Local CSV file. If None, the remote test data is downloaded once into the cache.
+    :param cache_dir: Where to keep the column files (default is next to the CSV).
+    :param start_time: Only rows with time > start_time are returned.
+    :return: dict mapping column name to a read-only array
+    """
+    csv_path = csv_path or local_test_data_path()
+    columns_dir = _columns_dir(csv_path, cache_dir)
+    manifest_path = os.path.join(columns_dir, MANIFEST_NAME)
+
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'rb') as f:
+            manifest = orjson.loads(f.read())
+    if manifest is None or manifest['source'] != _source_signature(csv_path):
+        build_column_cache(csv_path, cache_dir)
+        with open(manifest_path, 'rb') as f:
+            manifest = orjson.loads(f.read())
+
+    columns = {name: np.load(os.path.join(columns_dir, name + '.npy'), mmap_mode='r')
+               for name in manifest['columns']}
+    start = int(np.searchsorted(columns['time'], start_time, side='right'))
+    return {name: values[start:] for name, values in columns.items()}
+
+
+def cached_test_data_batches(csv_path=None, batch_size=1000, start_time=TEST_DATA_START_TIME, max_rows=None,
+                             cache_dir=None):
+    """
+    Generate the test data as batches: dicts mapping column name to an array of up to `batch_size` rows.
+    """
+    columns = load_test_data_columns(csv_path=csv_path, cache_dir=cache_dir, start_time=start_time)
+    n_rows = len(columns['time'])
+    if max_rows is not None:
+        n_rows = min(n_rows, max_rows)
+
+    for start in range(0, n_rows, batch_size):
+        stop = min(start + batch_size, n_rows)
+        yield {name: values[start:stop] for name, values in columns.items()}
+
+
+def cached_test_data_generator(csv_path=None, start_time=TEST_DATA_START_TIME, max_rows=None, cache_dir=None,
+                               batch_size=1000):
+    """
+    Generate the test data yielding one record (dict) at a time, read from the column cache.
+
+    {'time': 96470034, 'falcon_location': 9458.851809144342, 'dove_location': 9458.90654918728, 'falcon_id': 6}
+    """
+    for batch in cached_test_data_batches(csv_path=csv_path, batch_size=batch_size, start_time=start_time,
+                                          max_rows=max_rows, cache_dir=cache_dir):
+        names = list(batch)
+        for row in zip(*(values.tolist() for values in batch.values())):
+            yield dict(zip(names, row))
+
+
+if __name__ == '__main__':
+    gen = cached_test_data_generator(max_rows=3)
+
+    for _ in range(3):
+        print(next(gen))
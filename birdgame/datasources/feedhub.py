@@ -0,0 +1,402 @@
+import abc
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from birdgame.datasources.feedrecorder import RECORD_DTYPE, payload_to_record, records_to_payloads
+
+bird_logger = logging.getLogger(__name__)
+
+POLICIES = ('block', 'drop', 'conflate')
+
+
+class Subscription(abc.ABC):
+    """
+    Common bookkeeping for FeedHub subscribers.
+
+    `published` counts payloads offered by the hub, `delivered` those handed to the consumer,
+    `dropped` those discarded because the consumer was full (policy 'drop') and `conflated` older
+    payloads overwritten by newer ones (policy 'conflate'). `lag` is the number of payloads
+    waiting for the consumer.
+    """
+
+    def __init__(self, name, policy='block'):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {list(POLICIES)}")
+        self.name = name
+        self.policy = policy
+        self.published = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.max_lag = 0
+        self.closed = False
+
+    @property
+    @abc.abstractmethod
+    def delivered(self):
+        """ Number of payloads handed to the consumer. """
+
+    @property
+    def lag(self):
+        return self.published - self.dropped - self.conflated - self.delivered
+
+    @abc.abstractmethod
+    def publish(self, payload):
+        """ Offer a payload to the consumer, on the hub thread. """
+
+    def close(self):
+        self.closed = True
+
+    def metrics(self):
+        return {'policy': self.policy, 'published': self.published, 'delivered': self.delivered,
+                'dropped': self.dropped, 'conflated': self.conflated, 'lag': self.lag, 'max_lag': self.max_lag}
+
+
+class CallbackSubscription(Subscription):
+    """ Calls `callback(payload)` on the hub thread. A slow callback delays every other subscriber. """
+
+    def __init__(self, name, callback):
+        super().__init__(name, policy='block')
+        self.callback = callback
+        self.errors = 0
+        self._delivered = 0
+
+    @property
+    def delivered(self):
+        return self._delivered
+
+    def publish(self, payload):
+        self.published += 1
+        try:
+            self.callback(payload)
+        except Exception:
+            self.errors += 1
+            bird_logger.exception(f"Subscriber {self.name} failed on a payload")
+        self._delivered += 1
+
+    def metrics(self):
+        return {**super().metrics(), 'errors': self.errors}
+
+
+class QueueSubscription(Subscription):
+    """
+    Bounded queue consumed by another thread, with `get()` or by iterating until the hub stops.
+
+    When the queue is full, 'block' makes the hub wait, 'drop' discards the new payload and
+    'conflate' discards the oldest queued one, so the consumer skips ahead to recent data.
+    """
+
+    def __init__(self, name, maxsize=1000, policy='block'):
+        super().__init__(name, policy=policy)
+        self.maxsize = maxsize
+        self.items = deque()
+        self.condition = threading.Condition()
+        self._delivered = 0
+
+    @property
+    def delivered(self):
+        return self._delivered
+
+    def publish(self, payload):
+        with self.condition:
+            self.published += 1
+            if len(self.items) >= self.maxsize:
+                if self.policy == 'drop':
+                    self.dropped += 1
+                    return
+                if self.policy == 'conflate':
+                    self.items.popleft()
+                    self.conflated += 1
+                else:
+                    self.condition.wait_for(lambda: len(self.items) < self.maxsize or self.closed)
+            self.items.append(payload)
+            self.max_lag = max(self.max_lag, len(self.items))
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        """ Next payload, or None once the hub has stopped and the queue is drained (or on timeout). """
+        with self.condition:
+            self.condition.wait_for(lambda: self.items or self.closed, timeout=timeout)
+            if not self.items:
+                return None
+            self._delivered += 1
+            payload = self.items.popleft()
+            self.condition.notify_all()
+            return payload
+
+    def __iter__(self):
+        while True:
+            payload = self.get()
+            if payload is None:
+                return
+            yield payload
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class SharedRing:
+    """
+    Single-producer single-consumer ring of RECORD_DTYPE records in shared memory, so a worker
+    process receives payloads without pickling.
+
+    The header holds the write position, read position, a closed flag, the number of records
+    the consumer skipped and whether the producer may overwrite unread records. The producer writes a record and then advances the write position. The
+    consumer reads records below the write position and then advances the read position.
+
+    With `overwrite` (the 'conflate' policy) the producer never waits and overwrites the oldest
+    unread records. A consumer that finds it has been lapped skips ahead. It also discards any
+    record that was overwritten, or may have been half written, while it was being copied.
+    """
+    HEADER = 5  # write_seq, read_seq, closed, skipped, overwrite (int64)
+
+    def __init__(self, capacity, name=None, overwrite=False):
+        size = 8 * self.HEADER + capacity * RECORD_DTYPE.itemsize
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.capacity = capacity
+        self.header = np.ndarray((self.HEADER,), dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=8 * self.HEADER)
+        if self.owner:
+            self.header[:] = 0
+            self.header[4] = int(overwrite)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # --- Producer side ---
+
+    def free(self):
+        return self.capacity - (int(self.header[0]) - int(self.header[1]))
+
+    def put(self, record):
+        write_seq = int(self.header[0])
+        self.records[write_seq % self.capacity] = record
+        self.header[0] = write_seq + 1
+
+    def close_writer(self):
+        self.header[2] = 1
+
+    # --- Consumer side ---
+
+    def read(self, max_records=1000, poll_interval=0.0005):
+        """ Next records as a structured array, waiting for some. Empty once closed and drained. """
+        while True:
+            write_seq, read_seq = int(self.header[0]), int(self.header[1])
+            if write_seq - read_seq > self.capacity:  # Lapped by the producer
+                self.header[3] += write_seq - self.capacity - read_seq
+                read_seq = write_seq - self.capacity
+                self.header[1] = read_seq
+            if write_seq > read_seq:
+                n = min(write_seq - read_seq, max_records, self.capacity - read_seq % self.capacity)
+                start = read_seq % self.capacity
+                chunk = self.records[start:start + n].copy()
+                # Records the producer overwrote (or may be writing) while they were copied are discarded
+                in_progress = int(self.header[4] and not self.header[2])
+                overwritten = max(0, int(self.header[0]) + in_progress - self.capacity - read_seq)
+                if overwritten:
+                    self.header[3] += min(overwritten, n)
+                    chunk = chunk[overwritten:]
+                self.header[1] = read_seq + n
+                if len(chunk):
+                    return chunk
+                continue
+            if self.header[2]:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            time.sleep(poll_interval)
+
+    def payloads(self):
+        """ Iterate payload dicts until the producer closes the ring. """
+        while True:
+            records = self.read()
+            if not len(records):
+                return
+            yield from records_to_payloads(records)
+
+    def release(self):
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _run_process_subscriber(ring_name, capacity, target, args):
+    ring = SharedRing(capacity, name=ring_name)
+    try:
+        target(ring.payloads(), *args)
+    finally:
+        ring.release()
+
+
+class ProcessSubscription(Subscription):
+    """
+    Runs `target(payloads, *args)` in a worker process, where `payloads` iterates the feed from a
+    SharedRing. 'block' makes the hub wait for space, 'drop' discards new payloads when the ring is
+    full, and 'conflate' overwrites the oldest unread ones.
+    """
+
+    def __init__(self, name, target, args=(), capacity=65536, policy='block', poll_interval=0.0005):
+        super().__init__(name, policy=policy)
+        self.ring = SharedRing(capacity, overwrite=policy == 'conflate')
+        self.poll_interval = poll_interval
+        self.positions = None  # Final (write_seq, read_seq, skipped) once the ring is released
+        self.process = multiprocessing.Process(target=_run_process_subscriber, name=f'feedhub-{name}',
+                                               args=(self.ring.name, capacity, target, args), daemon=True)
+        self.process.start()
+
+    def _positions(self):
+        if self.positions is not None:
+            return self.positions
+        return int(self.ring.header[0]), int(self.ring.header[1]), int(self.ring.header[3])
+
+    @property
+    def delivered(self):
+        _, read_seq, skipped = self._positions()
+        return read_seq - skipped
+
+    @property
+    def lag(self):
+        write_seq, read_seq, _ = self._positions()
+        return min(max(0, write_seq - read_seq), self.ring.capacity)
+
+    def publish(self, payload):
+        self.published += 1
+        if self.ring.free() <= 0:
+            if self.policy == 'drop':
+                self.dropped += 1
+                return
+            if self.policy == 'block':
+                while self.ring.free() <= 0 and self.process.is_alive():
+                    time.sleep(self.poll_interval)
+        self.ring.put(payload_to_record(payload))
+        self.conflated = self._positions()[2]
+        self.max_lag = max(self.max_lag, self.lag)
+
+    def close(self):
+        super().close()
+        self.ring.close_writer()
+
+    def join(self, timeout=None):
+        """ Wait for the worker to finish reading the ring. """
+        self.process.join(timeout)
+        self.conflated = self._positions()[2]
+
+    def release(self):
+        """ Free the shared memory, keeping the final counts for `metrics()`. """
+        if self.positions is None:
+            self.positions = self._positions()
+            self.ring.release()
+
+    def metrics(self):
+        return {**super().metrics(), 'alive': self.process.is_alive()}
+
+
+class FeedHub:
+    """
+    Reads a feed once and fans every payload out to many subscribers, so that many trackers can
+    share one connection and one JSON decode per message.
+
+    Subscribers are callbacks run on the hub thread, bounded queues consumed by other threads, or
+    worker processes fed through shared-memory rings. Queues and processes have a policy for when
+    they fall behind: 'block' (the hub waits, slowing every subscriber), 'drop' (new payloads are
+    discarded) or 'conflate' (the oldest pending payloads are discarded, so the subscriber jumps
+    to recent data).
+
+        hub = FeedHub(live_data_generator())
+        queue = hub.subscribe_queue(maxsize=10_000, policy='conflate')
+        hub.subscribe_callback(lambda payload: tracker.tick(payload, {}))
+        hub.start()
+        ...
+        print(hub.metrics())
+
+    Parameters
+    ----------
+    source : iterable of dict
+        Payloads, e.g. `live_data_generator()`, `remote_test_data_generator()` or a replay.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.subscriptions = {}
+        self.count = 0
+        self.thread = None
+        self._stopping = threading.Event()
+
+    def _add(self, subscription):
+        if subscription.name in self.subscriptions:
+            raise ValueError(f"There is already a subscriber named '{subscription.name}'")
+        self.subscriptions[subscription.name] = subscription
+        return subscription
+
+    def _name(self, name):
+        return name if name is not None else f'subscriber-{len(self.subscriptions)}'
+
+    def subscribe_callback(self, callback, name=None):
+        return self._add(CallbackSubscription(self._name(name), callback))
+
+    def subscribe_queue(self, maxsize=1000, policy='block', name=None):
+        return self._add(QueueSubscription(self._name(name), maxsize=maxsize, policy=policy))
+
+    def subscribe_process(self, target, args=(), capacity=65536, policy='block', name=None):
+        return self._add(ProcessSubscription(self._name(name), target, args=args, capacity=capacity, policy=policy))
+
+    def run(self, max_rows=None):
+        """ Distribute payloads on this thread until the source ends, `max_rows` or `stop()`. """
+        subscriptions = list(self.subscriptions.values())
+        try:
+            for payload in self.source:
+                for subscription in subscriptions:
+                    subscription.publish(payload)
+                self.count += 1
+                if self._stopping.is_set() or (max_rows is not None and self.count >= max_rows):
+                    break
+        finally:
+            for subscription in subscriptions:
+                subscription.close()
+
+    def start(self, max_rows=None):
+        """ Run the hub on a background thread. """
+        self.thread = threading.Thread(target=self.run, kwargs={'max_rows': max_rows}, name='feedhub', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """ Stop after the current payload (the source may first block until it yields one). """
+        self._stopping.set()
+
+    def join(self, timeout=None):
+        """ Wait for the hub thread, if started, and then for process subscribers to finish. """
+        if self.thread is not None:
+            self.thread.join(timeout)
+        for subscription in self.subscriptions.values():
+            if isinstance(subscription, ProcessSubscription):
+                subscription.join(timeout)
+
+    def metrics(self):
+        """ Per-subscriber counts and lag, see `Subscription`. """
+        return {name: subscription.metrics() for name, subscription in self.subscriptions.items()}
+
+    def release(self):
+        """ Free the shared memory of process subscribers once they have finished. """
+        for subscription in self.subscriptions.values():
+            if isinstance(subscription, ProcessSubscription):
+                subscription.release()
+
+
+if __name__ == '__main__':
+    from birdgame.datasources.simulateddata import simulated_data_generator
+
+    hub = FeedHub(simulated_data_generator(100_000, seed=0))
+    counts = []
+    hub.subscribe_callback(lambda payload: counts.append(1), name='callback')
+    queue = hub.subscribe_queue(maxsize=100, policy='conflate', name='queue')
+    start = time.perf_counter()
+    hub.run()
+    print(f"Fan-out of {hub.count} payloads in {time.perf_counter() - start:.2f}s")
+    print(hub.metrics())
@@ -0,0 +1,200 @@
+import glob
+import math
+import os
+import time
+import numpy as np
+from birdgame.datasources.livedata import FEED_COLUMNS
+
+# Fixed-width little-endian records, packed without padding
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('dove_location', '<f8'), ('falcon_location', '<f8'),
+                         ('falcon_id', '<i4'), ('falcon_wingspan', '<f8')])
+SEGMENT_MAGIC = b'BIRDSEG1'
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('record_size', '<u4'), ('reserved', '<u4')])
+MISSING_FALCON_ID = -1  # Recorded when a payload has no falcon_id, missing float fields are NaN
+
+
+def payload_to_record(payload):
+    """ Tuple of RECORD_DTYPE fields for a feed payload, with missing fields as -1 or NaN. """
+    falcon_id = payload.get('falcon_id')
+    return (payload['time'], payload['dove_location'], payload.get('falcon_location', np.nan),
+            MISSING_FALCON_ID if falcon_id is None else falcon_id, payload.get('falcon_wingspan', np.nan))
+
+
+def records_to_payloads(records):
+    """
+    Payload dicts from RECORD_DTYPE records (a structured array or a batch of columns), with the
+    keys in the order of `live_data_generator` and missing fields left out again.
+    """
+    for row in zip(*(records[name].tolist() for name in FEED_COLUMNS)):
+        payload = dict(zip(FEED_COLUMNS, row))
+        if payload['falcon_id'] == MISSING_FALCON_ID:
+            del payload['falcon_id']
+        for name in ('falcon_location', 'falcon_wingspan'):
+            if math.isnan(payload[name]):
+                del payload[name]
+        yield payload
+
+
+def segment_path(directory, prefix, index):
+    return os.path.join(directory, f'{prefix}-{index:06d}.bin')
+
+
+def segment_paths(directory, prefix='feed'):
+    """ Segment files of a recording, oldest first. """
+    return sorted(glob.glob(os.path.join(glob.escape(directory), f'{glob.escape(prefix)}-[0-9]*.bin')))
+
+
+class FeedRecorder:
+    """
+    Appends feed payloads to rotating binary segment files, one RECORD_DTYPE record per payload.
+
+    Records are buffered and written `buffer_size` at a time, or sooner once `fsync_interval`
+    seconds have passed since the last fsync, so a slow feed is not held in memory for long. The file
+    is fsync'ed at most every `fsync_interval` seconds, and when a segment is closed. A new segment is started once the current
+    one would exceed `max_segment_bytes`. Because records have a fixed width, a segment cut short
+    by a crash loses at most its unsynced tail, and readers simply ignore a trailing partial record.
+
+    Parameters
+    ----------
+    directory : str
+        Where to write the segments (created if needed). Numbering continues after existing segments.
+    prefix : str
+        Segment file name prefix, files are <prefix>-000000.bin, <prefix>-000001.bin, ...
+    max_segment_bytes : int
+        Size at which to rotate to a new segment.
+    buffer_size : int
+        Records accumulated in memory before each write.
+    fsync_interval : float
+        Seconds between fsyncs, 0 to fsync every write.
+    """
+
+    def __init__(self, directory, prefix='feed', max_segment_bytes=64 * 2 ** 20, buffer_size=1000,
+                 fsync_interval=1.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.records_per_segment = max(1, (max_segment_bytes - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize)
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory, prefix)
+        self.segment_index = int(os.path.basename(existing[-1])[len(prefix) + 1:-4]) + 1 if existing else 0
+        self.buffer = []
+        self.file = None
+        self.segment_records = 0
+        self.last_fsync = time.monotonic()
+        self.count = 0
+
+    def _open_segment(self):
+        self.file = open(segment_path(self.directory, self.prefix, self.segment_index), 'xb')
+        header = np.array([(SEGMENT_MAGIC, RECORD_DTYPE.itemsize, 0)], dtype=HEADER_DTYPE)
+        self.file.write(header.tobytes())
+        self.segment_records = 0
+
+    def _close_segment(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+        self.segment_index += 1
+
+    def write(self, payload):
+        """ Buffer one payload, writing the buffer out once it is full or an fsync is due. """
+        self.buffer.append(payload_to_record(payload))
+        if len(self.buffer) >= self.buffer_size or time.monotonic() - self.last_fsync >= self.fsync_interval:
+            self.flush()
+
+    def flush(self):
+        """ Write out buffered records, rotating segments as needed, and fsync if it is time to. """
+        records = np.array(self.buffer, dtype=RECORD_DTYPE)
+        self.buffer = []
+        while len(records):
+            if self.file is None:
+                self._open_segment()
+            n = min(len(records), self.records_per_segment - self.segment_records)
+            self.file.write(records[:n].tobytes())
+            self.segment_records += n
+            self.count += n
+            records = records[n:]
+            if self.segment_records >= self.records_per_segment:
+                self._close_segment()
+
+        if self.file is not None:
+            self.file.flush()
+            now = time.monotonic()
+            if now - self.last_fsync >= self.fsync_interval:
+                os.fsync(self.file.fileno())
+                self.last_fsync = now
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_feed(gen, directory, **kwargs):
+    """
+    Pass through the payloads of `gen` (e.g. `live_data_generator()`), recording each one with a
+    FeedRecorder (keyword arguments are passed to it). The recording is closed when `gen` is exhausted
+    or the consumer stops iterating.
+    """
+    with FeedRecorder(directory, **kwargs) as recorder:
+        for payload in gen:
+            recorder.write(payload)
+            yield payload
+
+
+def load_segment(path):
+    """ Records of one segment as a read-only memory-mapped structured array. """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header[0]['magic'] != SEGMENT_MAGIC or header[0]['record_size'] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a feed segment with the expected record layout")
+    n_records = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+    if n_records == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize, shape=(n_records,))
+
+
+def recorded_feed_batches(directory, prefix='feed', batch_size=100_000, max_rows=None):
+    """
+    Replay a recording as batches: dicts mapping column name to an array of up to `batch_size` rows.
+    The arrays are views into the memory-mapped segments, so nothing is copied until they are read.
+    """
+    remaining = np.inf if max_rows is None else max_rows
+    for path in segment_paths(directory, prefix):
+        records = load_segment(path)
+        for start in range(0, len(records), batch_size):
+            if remaining <= 0:
+                return
+            chunk = records[start:start + int(min(batch_size, remaining))]
+            remaining -= len(chunk)
+            yield {name: chunk[name] for name in RECORD_DTYPE.names}
+
+
+def recorded_feed_generator(directory, prefix='feed', max_rows=None, batch_size=100_000):
+    """
+    Replay a recording yielding one record (dict) at a time, with the keys in the order of
+    `live_data_generator`. Fields missing from the original payloads are left out again.
+    Times come back as floats.
+    """
+    for batch in recorded_feed_batches(directory, prefix=prefix, batch_size=batch_size, max_rows=max_rows):
+        yield from records_to_payloads(batch)
+
+
+if __name__ == '__main__':
+    import tempfile
+    from birdgame.datasources.simulateddata import simulated_data_generator
+
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in record_feed(simulated_data_generator(100_000, seed=0), directory, max_segment_bytes=2 ** 20):
+            pass
+        print(f"{len(segment_paths(directory))} segments")
+        start = time.perf_counter()
+        n = sum(len(batch['time']) for batch in recorded_feed_batches(directory))
+        print(f"Replayed {n} rows as batches in {time.perf_counter() - start:.4f}s")
@@ -5,6 +5,8 @@ import time
 import logging
 
 BIRD_PAYLOAD_NAME = 'bird_payload'
+BIRD_STREAM_NAME = 'prod_bird_game_public'
+FEED_COLUMNS = ['time', 'falcon_location', 'dove_location', 'falcon_id', 'falcon_wingspan']
 
 bird_logger = logging.getLogger(__name__)
 
@@ -24,7 +26,7 @@ def live_data_generator(start_from_latest=True, max_rows=None):
     """
     config = get_redis_config()
     client = redis.Redis(**config)
-    stream_name = 'prod_bird_game_public'
+    stream_name = BIRD_STREAM_NAME
 
     # Determine the last existing message in the stream
     last_id = "$" if start_from_latest else "0-0"
@@ -73,8 +75,7 @@ def live_data_generator(start_from_latest=True, max_rows=None):
                             raise ValueError(f"Failed to decode payload '{BIRD_PAYLOAD_NAME}': {e}")
 
 
-                        key_order = ['time', 'falcon_location', 'dove_location', 'falcon_id', 'falcon_wingspan']
-                        data = {k: data[k] for k in key_order}
+                        data = {k: data[k] for k in FEED_COLUMNS}
 
                         yield data
                         count_rows += 1
@@ -1,13 +1,15 @@
 import pandas as pd
-import math
+from birdgame.datasources.cachedtestdata import (
+    TEST_DATA_START_TIME,
+    local_test_data_path,
+    cached_test_data_generator,
+)
 
-TEST_DATA_START_TIME = 90
 
 def remote_test_data() -> pd.DataFrame:
-    return pd.read_csv(
-        'https://raw.githubusercontent.com/microprediction/birdgame/refs/heads/main/data/bird_feed_data.csv')
+    return pd.read_csv(local_test_data_path())
 
-def remote_test_data_generator(chunksize=1000, start_time=TEST_DATA_START_TIME, max_rows=None):
+def remote_test_data_generator(chunksize=1000, start_time=TEST_DATA_START_TIME, max_rows=None, path=None):
     """
     Generate the remote test data yielding one record (dict) at a time.
 
@@ -15,23 +17,15 @@ def remote_test_data_generator(chunksize=1000, start_time=TEST_DATA_START_TIME,
     {'time': 96470034, 'falcon_location': 9458.853520393484, 'dove_location': 9458.903957685423, 'falcon_id': 6}
     {'time': 96470034, 'falcon_location': 9458.916319354752, 'dove_location': 9458.89921971448, 'falcon_id': 6}
 
+    The CSV is downloaded once and converted to a memory-mapped column cache (see cachedtestdata.py),
+    so later runs neither hit the network nor parse the CSV again.
+
     :param chunksize: Number of rows to read at a time (default is 1000).
     :param max_rows: Maximum number of rows to yield (default is None, meaning no limit).
+    :param path: Optional local copy of the CSV, e.g. for working offline.
     """
-    url = 'https://raw.githubusercontent.com/microprediction/birdgame/refs/heads/main/data/bird_feed_data.csv'
-    prev_time = start_time
-    row_count = 0
-
-    for chunk in pd.read_csv(url, chunksize=chunksize):
-        for k, row in chunk.iterrows():
-            if max_rows is not None and row_count >= max_rows:
-                return
-            if k > 500:
-                row['time'] = row['time'] / math.pi  # don't ask
-                if row['time'] > prev_time:
-                    prev_time = row['time']
-                    row_count += 1
-                    yield row.to_dict()
+    yield from cached_test_data_generator(csv_path=path, start_time=start_time, max_rows=max_rows,
+                                          batch_size=chunksize)
 
 
 if __name__ == '__main__':
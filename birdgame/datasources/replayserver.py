@@ -0,0 +1,356 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+import orjson
+from birdgame.datasources.livedata import BIRD_PAYLOAD_NAME, BIRD_STREAM_NAME
+
+bird_logger = logging.getLogger(__name__)
+
+
+class ProtocolError(Exception):
+
+    def __init__(self, message, prefix='ERR'):
+        super().__init__(message)
+        self.prefix = prefix
+
+
+class SimpleString(str):
+    pass
+
+
+OK, PONG = SimpleString('OK'), SimpleString('PONG')
+NULL_ARRAY = object()  # Reply of a blocking XREAD that timed out
+
+
+def _parse_id(value, last):
+    """ Stream id as a (ms, seq) tuple, with '$' meaning the last id currently in the stream. """
+    if value == '$':
+        return last
+    ms, _, seq = value.partition('-')
+    return int(ms), int(seq or 0)
+
+
+def _to_bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+def _encode(value):
+    """ RESP2 encoding of a reply: simple string, error, integer, bulk string (str/bytes/None) or array. """
+    if isinstance(value, SimpleString):
+        return b'+' + value.encode() + b'\r\n'
+    if isinstance(value, ProtocolError):
+        return b'-%s %s\r\n' % (value.prefix.encode(), str(value).encode())
+    if value is NULL_ARRAY:
+        return b'*-1\r\n'
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, (str, bytes)):
+        value = _to_bytes(value)
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    return b'*%d\r\n' % len(value) + b''.join(_encode(v) for v in value)
+
+
+class ReplayServer:
+    """
+    Minimal Redis-compatible server holding streams in memory, for running the live feed code offline.
+
+    It speaks enough of the Redis protocol for redis-py clients: AUTH, HELLO, PING, SELECT,
+    CLIENT, XADD, XLEN, XRANGE and XREAD, including BLOCK. Only RESP2 is supported, so clients
+    need protocol=2, which `redis_config` includes. The server runs its own event loop
+    on a background thread, so the synchronous `live_data_generator` works against it unchanged once
+    `set_redis_config(server.redis_config())` points the package at it.
+
+        with ReplayServer() as server:
+            set_redis_config(server.redis_config())
+            server.replay(simulated_data_generator(10_000, seed=0), rate=10)
+            for payload in live_data_generator(start_from_latest=False, max_rows=10_000):
+                ...
+
+    Parameters
+    ----------
+    host, port : str, int
+        Address to listen on. Port 0 picks a free port (see `port` once started).
+    maxlen : int or None
+        Keep only about this many of the latest entries per stream.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, maxlen=1_000_000):
+        self.host = host
+        self.port = port
+        self.maxlen = maxlen
+        self.streams = {}  # name -> (ids, fields), parallel lists with ids as (ms, seq) tuples
+        self.connections = set()
+        self.handlers = set()
+        self.closing = False
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.changed = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.changed = asyncio.Condition()
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name='birdgame-replay-server', daemon=True)
+        self.thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        async def shutdown():
+            # Connection handlers exit by themselves once their socket is closed and blocked reads are woken
+            self.closing = True
+            self.server.close()
+            for writer in list(self.connections):
+                writer.close()
+            async with self.changed:
+                self.changed.notify_all()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            replays = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in replays:
+                task.cancel()
+            await asyncio.gather(*replays, return_exceptions=True)
+
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def redis_config(self):
+        """ Keyword arguments for redis.Redis, to pass to `set_redis_config`. """
+        return {'host': self.host, 'port': self.port, 'decode_responses': True, 'protocol': 2}
+
+    def drop_connections(self):
+        """ Close every client connection, e.g. to exercise reconnection and backoff. """
+        def close_all():
+            for writer in list(self.connections):
+                writer.close()
+        self.loop.call_soon_threadsafe(close_all)
+
+    # --- Publishing ---
+
+    def xadd(self, fields, stream_name=BIRD_STREAM_NAME):
+        """ Append one entry (dict of field to value) from any thread, returning its id. """
+        return asyncio.run_coroutine_threadsafe(self._add_entries(stream_name, [fields]), self.loop).result()[0]
+
+    def replay(self, payloads, rate=1.0, time_scale=1.0, stream_name=BIRD_STREAM_NAME):
+        """
+        Publish feed payloads in the background, spaced out by their 'time' fields.
+
+        Payload times are converted to seconds with `time_scale` and the replay runs `rate` times
+        faster than that, or as fast as possible if `rate` is None.
+
+        Returns a concurrent.futures.Future that completes with the number of entries published.
+        """
+        return asyncio.run_coroutine_threadsafe(self._replay(payloads, rate, time_scale, stream_name), self.loop)
+
+    async def _replay(self, payloads, rate, time_scale, stream_name):
+        start_wall, start_time, count, due = time.monotonic(), None, 0, []
+        for payload in payloads:
+            if start_time is None:
+                start_time = payload['time']
+            delay = 0 if not rate else start_wall + (payload['time'] - start_time) * time_scale / rate - time.monotonic()
+            if delay > 0 or len(due) >= 1000:
+                await self._add_entries(stream_name, due)
+                count += len(due)
+                due = []
+                await asyncio.sleep(max(delay, 0))
+            due.append({BIRD_PAYLOAD_NAME: orjson.dumps(payload)})
+        await self._add_entries(stream_name, due)
+        return count + len(due)
+
+    async def _add_entries(self, stream_name, entries, entry_id='*'):
+        ids, fields = self.streams.setdefault(stream_name, ([], []))
+        added = []
+        for entry in entries:
+            last = ids[-1] if ids else (0, 0)
+            if entry_id == '*':
+                ms = int(time.time() * 1000)
+                new_id = (ms, 0) if ms > last[0] else (last[0], last[1] + 1)
+            else:
+                new_id = _parse_id(entry_id, last)
+                if new_id <= last:
+                    raise ProtocolError('The ID specified in XADD is equal or smaller than the target stream top item')
+            ids.append(new_id)
+            fields.append([_to_bytes(v) for item in entry.items() for v in item])
+            added.append('%d-%d' % new_id)
+
+        if self.maxlen is not None and len(ids) > 1.1 * self.maxlen:
+            excess = len(ids) - self.maxlen
+            del ids[:excess], fields[:excess]
+        if added:
+            async with self.changed:
+                self.changed.notify_all()
+        return added
+
+    # --- Protocol ---
+
+    async def _serve(self, reader, writer):
+        self.connections.add(writer)
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                try:
+                    reply = await self._execute(command)
+                except ProtocolError as e:
+                    reply = e
+                except (ValueError, IndexError):
+                    reply = ProtocolError('syntax error')
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.discard(writer)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.decode().split()  # Inline command, e.g. from telnet
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _execute(self, command):
+        name = command[0].decode().upper() if isinstance(command[0], bytes) else command[0].upper()
+        args = [a.decode() if isinstance(a, bytes) else a for a in command[1:]]
+        if name in ('AUTH', 'SELECT', 'CLIENT'):
+            return OK
+        if name == 'PING':
+            return PONG
+        if name == 'HELLO':
+            if args and args[0] != '2':
+                return ProtocolError('unsupported protocol version', prefix='NOPROTO')
+            return ['server', 'redis', 'version', '7.0.0', 'proto', 2, 'id', 1, 'mode', 'standalone',
+                    'role', 'master', 'modules', []]
+        if name == 'XADD':
+            return await self._xadd(command[1:])
+        if name == 'XLEN':
+            return len(self.streams.get(args[0], ([], []))[0])
+        if name == 'XRANGE':
+            return self._xrange(*args)
+        if name == 'XREAD':
+            return await self._xread(args)
+        raise ProtocolError(f"unknown command '{name}'")
+
+    async def _xadd(self, args):
+        args = list(args)
+        stream_name = args.pop(0).decode()
+        maxlen = None
+        while args[0].upper() in (b'NOMKSTREAM', b'MAXLEN'):
+            if args.pop(0).upper() == b'MAXLEN':
+                if args[0] in (b'~', b'='):
+                    args.pop(0)
+                maxlen = int(args.pop(0))
+        entry_id = args.pop(0).decode()
+        if len(args) % 2:
+            raise ProtocolError("wrong number of arguments for 'xadd' command")
+        (added,) = await self._add_entries(stream_name, [dict(zip(args[::2], args[1::2]))], entry_id=entry_id)
+        if maxlen is not None:
+            ids, fields = self.streams[stream_name]
+            excess = max(len(ids) - maxlen, 0)
+            del ids[:excess], fields[:excess]
+        return added
+
+    def _entries_after(self, stream_name, after, count=None, inclusive=False, end=None):
+        ids, fields = self.streams.get(stream_name, ([], []))
+        start = (bisect.bisect_left if inclusive else bisect.bisect_right)(ids, after)
+        stop = len(ids) if end is None else bisect.bisect_right(ids, end)
+        if count is not None:
+            stop = min(stop, start + count)
+        return [['%d-%d' % ids[i], fields[i]] for i in range(start, stop)]
+
+    def _xrange(self, stream_name, start, end, *options):
+        first = (0, 0) if start == '-' else _parse_id(start, None)
+        last = None if end == '+' else _parse_id(end, None)
+        count = int(options[1]) if len(options) == 2 and options[0].upper() == 'COUNT' else None
+        return self._entries_after(stream_name, first, count=count, inclusive=True, end=last)
+
+    async def _xread(self, args):
+        count, block = None, None
+        while args[0].upper() != 'STREAMS':
+            option = args.pop(0).upper()
+            if option == 'COUNT':
+                count = int(args.pop(0))
+            elif option == 'BLOCK':
+                block = int(args.pop(0))
+            else:
+                raise ProtocolError('syntax error')
+        args = args[1:]
+        if not args or len(args) % 2:
+            raise ProtocolError("Unbalanced 'xread' list of streams")
+        names = args[:len(args) // 2]
+        after = {name: _parse_id(last_id, (self.streams[name][0] or [(0, 0)])[-1] if name in self.streams else (0, 0))
+                 for name, last_id in zip(names, args[len(args) // 2:])}
+
+        def ready():
+            result = [[name, self._entries_after(name, after[name], count=count)] for name in names]
+            return [r for r in result if r[1]]
+
+        result = ready()
+        if not result and block is not None:
+            async def wait():
+                async with self.changed:
+                    await self.changed.wait_for(lambda: self.closing or bool(ready()))
+            try:
+                await asyncio.wait_for(wait(), timeout=block / 1000 if block else None)
+            except asyncio.TimeoutError:
+                pass
+            result = ready()
+        return result if result else NULL_ARRAY
+
+
+if __name__ == '__main__':
+    import argparse
+    from birdgame.datasources.simulateddata import simulated_data_generator
+    from birdgame.datasources.feedrecorder import recorded_feed_generator
+
+    parser = argparse.ArgumentParser(description='Serve a recorded or simulated bird feed over the Redis protocol.')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--rate', type=float, default=1.0, help='Replay speed multiplier, 0 for as fast as possible')
+    parser.add_argument('--recording', help='Directory of a FeedRecorder recording (default: simulated data)')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows of simulated data')
+    options = parser.parse_args()
+
+    payloads = recorded_feed_generator(options.recording) if options.recording \
+        else simulated_data_generator(options.rows, seed=0)
+    with ReplayServer(port=options.port) as server:
+        print(f"Serving {BIRD_STREAM_NAME} on {server.host}:{server.port}, set BIRDGAME_REDIS_HOST={server.host} "
+              f"and BIRDGAME_REDIS_PORT={server.port} in the environment of the clients")
+        published = server.replay(payloads, rate=options.rate or None).result()
+        print(f"Published {published} entries, still serving (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,79 @@
+import numpy as np
+from birdgame.stats.jumpdiffusion import jump_diffusion_streams, simulate_chunk
+from birdgame.datasources.livedata import FEED_COLUMNS
+
+
+def simulated_data_batches(n_rows, batch_size=1000, seed=None, start_time=0.0, mean_dt=1.0, irregular=True,
+                           n_falcons=12, falcon_noise=0.1, x0=0.0, jump_rate=0.01, jump_size=1.0, drift=0.0,
+                           sigma=0.1, epsilon=0.1, vega=2.0):
+    """
+    Synthetic bird feed with the columns of the live feed, generated `batch_size` rows at a time
+    so arbitrarily long streams never need to fit in memory.
+
+    The dove follows `jump_diffusion_paths` (one path). Each row is reported by a falcon picked at
+    random, whose location is the latent (noise free) dove path plus gaussian noise proportional to
+    its wingspan. Batches have the layout of `cached_test_data_batches`, so they can be fed to
+    `TrackerBase.tick_batch`, and `simulated_data_generator` yields the same rows one payload at a time.
+
+    Parameters
+    ----------
+    n_rows : int
+        Total number of rows.
+    seed : int, numpy.random.Generator or None
+        Seed. The same seed gives the same feed for any `batch_size`.
+    start_time : float
+        All times are after this.
+    mean_dt : float
+        Average time between rows.
+    irregular : bool
+        If True the gaps between rows are exponential with mean `mean_dt`, otherwise all equal it.
+    n_falcons : int
+        Number of distinct falcons. Wingspans are drawn once per falcon.
+    falcon_noise : float
+        Falcon location noise per unit of wingspan.
+    x0 : float
+        Starting dove location.
+    jump_rate, jump_size, drift, sigma, epsilon, vega : float
+        Dove dynamics per unit of time, see `jump_diffusion`.
+    """
+    path_seed, dt_rng, falcon_rng, noise_rng = np.random.default_rng(seed).spawn(4)
+    streams = jump_diffusion_streams(path_seed)
+    wingspans = np.round(falcon_rng.uniform(0.1, 1.5, size=n_falcons), 5)
+    x = np.array([float(x0)])
+    time = float(start_time)
+
+    for start in range(0, n_rows, batch_size):
+        n = min(batch_size, n_rows - start)
+        dt = dt_rng.exponential(mean_dt, size=n) if irregular else np.full(n, float(mean_dt))
+        times = np.cumsum(np.concatenate([[time], dt]))[1:]
+        time = float(times[-1])
+
+        observed, latent = simulate_chunk(streams, x, n, step_dt=dt[:, None], jump_rate=jump_rate,
+                                          jump_size=jump_size, drift=drift, sigma=sigma, epsilon=epsilon, vega=vega)
+        x = latent[-1]
+
+        falcon_ids = falcon_rng.integers(0, n_falcons, size=n)
+        falcon_wingspans = wingspans[falcon_ids]
+        falcon_locations = latent[:, 0] + falcon_noise * falcon_wingspans * noise_rng.standard_normal(n)
+        yield {'time': times, 'falcon_location': falcon_locations, 'dove_location': observed[:, 0],
+               'falcon_id': falcon_ids, 'falcon_wingspan': falcon_wingspans}
+
+
+def simulated_data_generator(n_rows, batch_size=1000, **kwargs):
+    """
+    Generate the synthetic feed yielding one record (dict) at a time, like `live_data_generator`:
+
+        {'time': 1.03, 'falcon_location': 0.021, 'dove_location': -1.87, 'falcon_id': 4, 'falcon_wingspan': 0.53113}
+
+    Keyword arguments are passed to `simulated_data_batches`.
+    """
+    for batch in simulated_data_batches(n_rows, batch_size=batch_size, **kwargs):
+        for row in zip(*(batch[name].tolist() for name in FEED_COLUMNS)):
+            yield dict(zip(FEED_COLUMNS, row))
+
+
+if __name__ == '__main__':
+    gen = simulated_data_generator(n_rows=3, seed=0)
+
+    for _ in range(3):
+        print(next(gen))
@@ -13,6 +13,8 @@ warnings.filterwarnings("ignore", message="Non-stationary starting autoregressiv
 warnings.filterwarnings("ignore", message="Non-invertible starting MA parameters found")
 
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.ring_buffer import RingBuffer
+from birdgame.trackers.retrain_executor import RetrainExecutor
 from birdgame import HORIZON
 
 class AutoETSConstants:
@@ -21,6 +23,7 @@ class AutoETSConstants:
     NUM_DATA_POINTS_MAX=20
     WARMUP_CUTOFF=0
     USE_THREADING=True # Set this to True for live data streams where each `tick()` and `predict()` call must complete within ~50 ms
+    USE_PROCESS_POOL=False # Opt-in: with USE_THREADING, retrain in a worker process so that fitting does not hold the GIL
 
 
 try:
@@ -38,6 +41,14 @@ except ImportError:
 
 if using_sktime:
 
+    def fit_autoets(forecaster, y, fh):
+        """Fit a clone of `forecaster` and predict the variance (run by the RetrainExecutor in a worker process)."""
+        new_forecaster = forecaster.clone()
+        new_forecaster.fit(y, fh=fh)
+        var = new_forecaster.predict_var(fh=fh)
+        scale = np.sqrt(var.values.flatten()[-1])
+        return new_forecaster, scale
+
     class AutoETSsktimeTracker(TrackerBase):
         """
         A model that tracks the dove location using AutoETS.
@@ -58,17 +69,26 @@ if using_sktime:
             /!/ Set this to True for live data streams where each `tick()`  
             and `predict()` call must complete within ~50 ms.  
             When enabled, retraining happens in parallel without blocking predictions.
+        use_process_pool : bool
+            With `use_threading`, retrain in a worker process (see `RetrainExecutor`) rather than in a
+            thread, because statsmodels ETS fitting would otherwise hold the GIL and delay `tick()` and `predict()`.
+            Off by default (`AutoETSConstants.USE_PROCESS_POOL`).
         """
 
+        # Checkpoints pickle the fitted forecaster; a pending background retrain is not checkpointed
+        CHECKPOINT_EXCLUDE = TrackerBase.CHECKPOINT_EXCLUDE + ('_new_data', '_stop_worker')
+        CHECKPOINT_PICKLE = ('forecaster',)
+
         def __init__(self, horizon=HORIZON):
             super().__init__(horizon)
             self.current_x = None
-            self.last_observed_data = [] # Holds the last few observed data points
             self.prev_t = 0
 
             self.min_samples = AutoETSConstants.MIN_SAMPLES
             self.train_model_frequency = AutoETSConstants.TRAIN_MODEL_FREQUENCY
             self.num_data_points_max = AutoETSConstants.NUM_DATA_POINTS_MAX
+            # Holds the last few observed data points (fixed size, to limit memory usage on continuous live data)
+            self.last_observed_data = RingBuffer(self.num_data_points_max + 2)
 
             # Number of steps to predict
             steps = 1 # only one because the univariate serie will only have values separated of at least HORIZON time
@@ -86,8 +106,13 @@ if using_sktime:
 
             # Threading tools
             self.use_threading = AutoETSConstants.USE_THREADING
+            self.use_process_pool = AutoETSConstants.USE_PROCESS_POOL
             self._lock = threading.Lock()
-            if self.use_threading:
+            self.retrain_executor = None
+            if self.use_threading and self.use_process_pool:
+                self._forecaster_template = self.forecaster.clone()
+                self.retrain_executor = RetrainExecutor(fit=fit_autoets, on_result=self._swap_model)
+            elif self.use_threading:
                 self._cond = threading.Condition(self._lock)
                 self._new_data = None
                 self._stop_worker = False
@@ -127,20 +152,21 @@ if using_sktime:
                 self.prev_t = t
 
                 if self.count == self.min_samples or (self.count > self.min_samples and self.count % self.train_model_frequency == 0):
-                    # Construct 'y' as an univariate serie
-                    y = np.array(self.last_observed_data)[-self.num_data_points_max:]
+                    # Construct 'y' as an univariate serie (a view, no copy)
+                    y = self.last_observed_data.view(self.num_data_points_max)
 
                     # Fit sktime model and variance prediction
-                    if self.use_threading:
-                        # Signal background thread
+                    if self.retrain_executor is not None:
+                        # Copied to shared memory; requests made during a fit are coalesced
+                        self.retrain_executor.submit(self._forecaster_template, y, fh=self.fh, version=self.count)
+                    elif self.use_threading:
+                        # Signal background thread, with its own copy as the buffer keeps changing
                         with self._cond:
-                            self._new_data = y
+                            self._new_data = y.copy()
                             self._cond.notify()
                     else:
-                        self._retrain_model_sync(y)
-
-                    # Update last observed data (to limit memory usage as it will be run on continuous live data)
-                    self.last_observed_data = self.last_observed_data[-(self.num_data_points_max + 2):]
+                        # A copy, as the forecaster keeps the series it was fitted on (sktime's `_y`)
+                        self._retrain_model_sync(y.copy())
 
                 self.count += 1
 
@@ -182,13 +208,7 @@ if using_sktime:
         # ------------------- Model training -------------------
         def _fit(self, y):
             # Fit a clone sktime model (at least a cloned model is required in case of asynchronous training)
-            new_forecaster = self.forecaster.clone()
-            new_forecaster.fit(y, fh=self.fh)
-            # Variance prediction
-            var = new_forecaster.predict_var(fh=self.fh)
-            scale = np.sqrt(var.values.flatten()[-1])
-
-            return new_forecaster, scale
+            return fit_autoets(self.forecaster, y, self.fh)
 
         def _retrain_model_sync(self, y):
             """Synchronous retraining"""
@@ -196,6 +216,16 @@ if using_sktime:
             self.forecaster, self.scale = self._fit(y)
             # print(f"Sync retrain time: {(time.perf_counter()- start_time)*1000:.2f} ms") # check training time
 
+        def _swap_model(self, result):
+            """Swap in a forecaster (and its scale) trained by the retrain executor."""
+            with self._lock:
+                self.forecaster, self.scale = result
+
+        def close(self):
+            """Wait for a retrain running in a worker process and free its shared memory."""
+            if self.retrain_executor is not None:
+                self.retrain_executor.close()
+
         def _worker_retrain_model_async(self):
             """Asynchronous retraining in a background worker"""
             while True:
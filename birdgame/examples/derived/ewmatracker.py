@@ -1,4 +1,5 @@
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.batch_recursions import CoreTailBatchMixin
 from birdgame import HORIZON
 from birdgame.datasources.livedata import live_data_generator
 from pprint import pprint
@@ -10,7 +11,7 @@ from birdgame.stats.fewvar import FEWVar
 class EMWAConstants:
     FADE_FACTOR = 0.0001
 
-class EMWAVarTracker(TrackerBase):
+class EMWAVarTracker(CoreTailBatchMixin, TrackerBase):
     """
     A model that fits a mixture of two Gaussian distributions, one capturing the core
     distribution and another with a larger variance to capture the tails.
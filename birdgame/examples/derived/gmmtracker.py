@@ -1,12 +1,18 @@
 from pprint import pprint
+import copy
+import logging
 import math
+import threading
+import weakref
 import numpy as np
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.stats.onlineem import OnlineEMMixture
 from birdgame import HORIZON
 from birdgame.datasources.livedata import live_data_generator
-from densitypdf import density_pdf
 from birdgame.examples.derived.mixturetracker import MixtureTracker
 
+bird_logger = logging.getLogger(__name__)
+
 # scikit-learn GMM
 try:
     from sklearn.mixture import GaussianMixture
@@ -14,6 +20,43 @@ try:
 except ImportError:
     using_sklearn = False
 
+
+def _refit_worker(tracker_ref, cond, stop):
+    """
+    Background refits of a GMMTracker, referenced weakly between refits so that an unused tracker can
+    be garbage collected. Exits once `stop` is set, by `GMMTracker.close` or when the tracker is collected.
+    """
+    def ready():
+        tracker = tracker_ref()
+        pending = tracker is None or tracker._new_data is not None
+        del tracker  # May drop the last reference, and then stop is set before we check it
+        return pending or stop.is_set()
+
+    while True:
+        with cond:
+            cond.wait_for(ready)
+            tracker = tracker_ref()
+            if tracker is None or stop.is_set():
+                return
+            X = tracker._new_data  # get the data to train on
+            tracker._new_data = None  # clear it (so next signal is new data)
+            tracker._fitting = True
+        try:
+            tracker._refit_gmm(X)
+        except Exception:
+            bird_logger.exception("GMM refit failed")
+        finally:
+            with cond:
+                tracker._fitting = False
+                cond.notify_all()
+        del tracker
+
+
+def _stop_refits(cond, stop):
+    with cond:
+        stop.set()
+        cond.notify_all()
+
 if using_sklearn:
 
 
@@ -28,8 +71,28 @@ if using_sklearn:
 
         We keep using MixtureTracker's distribution in predict() until 'burn_in' observations.
         After burn_in, we switch to the GMM's distribution.
+
+        How the GMM is kept up to date depends on `fit_mode`:
+          - 'sync' (default): every `batch_size` differences the GMM is refit on the latest
+            `window_len`, inside `tick`, so predictions depend only on the data.
+          - 'background': the same refit, handed to a worker thread, which swaps in the new
+            parameters in one assignment, so `tick` never waits for a fit. Requests made while a fit
+            is running are coalesced, so which refits happen depends on timing. The worker stops when
+            the tracker is closed or garbage collected; after `close()` refits are made in `tick`.
+          - 'online': stepwise EM (`OnlineEMMixture`). Each difference updates the per-component
+            sufficient statistics (weight, sum, sum of squares) with step size
+            max(1/n, online_fading_factor), in O(n_components) per tick and without scikit-learn fits.
+        With `warm_start` the batch refits start from the previous solution, so they converge
+        in a few EM iterations.
         """
 
+        FIT_MODES = ('sync', 'background', 'online')
+        # The sklearn model is pickled, so refits after a restore are warm started as before. Refits
+        # fit a copy and publish it with gmm_params under _cond, and snapshots are taken under it too,
+        # so a checkpoint never holds a model midway through a fit. A pending refit is not checkpointed
+        CHECKPOINT_EXCLUDE = TrackerBase.CHECKPOINT_EXCLUDE + ('_new_data', '_fitting')
+        CHECKPOINT_PICKLE = ('gmm',)
+
         def __init__(
             self,
             n_components=2,
@@ -37,7 +100,10 @@ if using_sklearn:
             batch_size=500,
             burn_in=2000,
             data_shrinkage=0.0,
-            window_len=10000
+            window_len=10000,
+            fit_mode='sync',
+            warm_start=True,
+            online_fading_factor=None
         ):
             """
             Args:
@@ -46,30 +112,85 @@ if using_sklearn:
                 batch_size (int): # of differences to accumulate before re-fitting GMM
                 burn_in (int): # observations until we switch to GMM predictions
                 data_shrinkage (float): fraction of the sample mean to remove from X before fitting
+                window_len (int): # of most recent differences used by each refit
+                fit_mode (str): 'sync', 'background' or 'online', see above
+                warm_start (bool): start each refit from the previous fit
+                online_fading_factor (float): smallest online EM step size, default 1 / window_len
             """
             super().__init__(horizon)
+            if fit_mode not in self.FIT_MODES:
+                raise ValueError(f"Unknown fit_mode '{fit_mode}', expected one of {list(self.FIT_MODES)}")
 
             # 1) Fallback tracker
             self.fallback = MixtureTracker(horizon=horizon)
             self.window_len = window_len
 
             # 2) GMM-based approach
+            self.n_components = n_components
+            self.fit_mode = fit_mode
             self.gmm = GaussianMixture(
                 n_components=n_components,
                 covariance_type='full',
                 random_state=42,
-                max_iter=200
+                max_iter=200,
+                warm_start=warm_start
             )
             self.is_fitted = False
+            self.gmm_params = None  # (weights, means, stds, shift) of the latest fit, replaced as a whole
             self.x_changes = []
             self.batch_size = batch_size
             self.data_shrinkage = data_shrinkage
+            self.refit_count = 0
+
+            # Online EM sufficient statistics per component
+            self.online_fading_factor = online_fading_factor if online_fading_factor is not None else 1.0 / window_len
+            self.online_em = OnlineEMMixture(n_components=n_components, fading_factor=self.online_fading_factor)
 
             # Misc
             self.count = 0
             self.current_x = None
             self.burn_in = burn_in
 
+            self._start_refits()
+
+        def _start_refits(self):
+            """ Background refits: the condition guarding requests and, in 'background' mode, the worker. """
+            self._cond = threading.Condition()
+            self._new_data = None
+            self._fitting = False
+            self._stop = threading.Event()
+            self._worker_thread = None
+            if self.fit_mode == 'background':
+                # The worker holds no reference to self, so the finalizer stops it once self is collected
+                self._finalizer = weakref.finalize(self, _stop_refits, self._cond, self._stop)
+                self._worker_thread = threading.Thread(target=_refit_worker, args=(weakref.ref(self), self._cond, self._stop),
+                                                       name='gmm-refit', daemon=True)
+                self._worker_thread.start()
+
+        def close(self, timeout=None):
+            """
+            Stop the background worker, after the refit it is running. A pending request is dropped,
+            and later refits are made in `tick`.
+            """
+            if self._worker_thread is not None:
+                self._finalizer()
+                self._worker_thread.join(timeout)
+                with self._cond:
+                    self._new_data = None
+
+        def __getstate__(self):
+            # The condition and the worker thread cannot be pickled (e.g. to play in an Arena worker
+            # process). They are recreated on unpickling, without any refit that was pending
+            with self._cond:
+                state = self.__dict__.copy()
+            for name in ('_cond', '_worker_thread', '_new_data', '_fitting', '_stop', '_finalizer'):
+                state.pop(name, None)
+            return state
+
+        def __setstate__(self, state):
+            self.__dict__.update(state)
+            self._start_refits()
+
         def tick(self, payload, performance_metrics):
             """
             Tick both the fallback MixtureTracker and also gather data for the GMM model.
@@ -88,19 +209,30 @@ if using_sklearn:
             # Once we pop from quarantine, we can form a difference
             if prev_x is not None:
                 x_change = x - prev_x
+                if self.fit_mode == 'online':
+                    self._online_update(x_change)
+                    return
                 self.x_changes.append(x_change)
 
                 # Fit GMM if we have enough new differences
                 if len(self.x_changes) % self.batch_size==0:
-                    self._refit_gmm()
+                    self._request_refit()
                     self.x_changes = self.x_changes[-self.window_len:]
 
-        def _refit_gmm(self):
+        def _request_refit(self):
+            X = np.array(self.x_changes[-self.window_len:], dtype=np.float32).reshape(-1, 1)
+            if self.fit_mode == 'background' and not self._stop.is_set():
+                with self._cond:
+                    self._new_data = X  # overwrite old requests
+                    self._cond.notify()
+            else:
+                self._refit_gmm(X)
+
+        def _refit_gmm(self, X):
             """
             Shift the data's mean by data_shrinkage * sample_mean => no variance scaling.
-            Then fit the GMM.
+            Then fit the GMM and publish its parameters.
             """
-            X = np.array(self.x_changes, dtype=np.float32).reshape(-1, 1)
             if X.shape[0] < 2:
                 return
 
@@ -111,10 +243,37 @@ if using_sklearn:
             # 3) X_shifted => X - shift_value
             X_shifted = X - shift_value
 
-            self.gmm.fit(X_shifted)
-            self.is_fitted = True
-            # Store the shift_value used for unshifting in predict
-            self.latest_shift_value = float(shift_value)
+            # Fit a copy (warm started from the published model), so self.gmm is never half fitted
+            gmm = copy.deepcopy(self.gmm)
+            gmm.fit(X_shifted)
+            stds = np.sqrt(np.maximum(gmm.covariances_.reshape(-1), 0.0))
+            params = (gmm.weights_.copy(), gmm.means_.ravel().copy(), np.where(stds > 0, stds, 1e-6),
+                      float(shift_value))
+            with self._cond:
+                # gmm_params is replaced with one assignment, so predict() sees either the old or the new fit
+                self.gmm, self.gmm_params = gmm, params
+                self.refit_count += 1
+                self.is_fitted = True
+
+        def checkpoint_state(self):
+            with self._cond:  # Not while a refit publishes its model and parameters
+                return super().checkpoint_state()
+
+        def wait_for_refit(self, timeout=None):
+            """ Block until no background refit is pending or running (useful in tests and benchmarks). """
+            with self._cond:
+                return self._cond.wait_for(lambda: self._new_data is None and not self._fitting, timeout=timeout)
+
+        def _online_update(self, x_change):
+            """
+            One stepwise EM step (see `OnlineEMMixture`), publishing the mixture once
+            batch_size differences have been seen.
+            """
+            self.online_em.update(x_change)
+            if self.online_em.count >= self.batch_size:
+                weights, means, stds = self.online_em.get()
+                self.gmm_params = (weights, means, stds, 0.0)
+                self.is_fitted = True
 
         def predict(self):
             """
@@ -130,47 +289,30 @@ if using_sklearn:
         def gmm_predict(self):
             """
             Return the GMM distribution in the original coordinate system.
-            Means are unshifted by 'latest_shift_value', then we add current_x
+            Means are unshifted by the shift used in the fit, then we add current_x
             to shift from difference domain -> absolute positions.
             """
-            if not self.is_fitted:
+            params = self.gmm_params  # read once, a refit may swap in new parameters at any time
+            if params is None:
                 # Something unexpected. Fallback.
                 return self.fallback.predict()
+            weights, means, stds, shift_val = params
 
-            means = self.gmm.means_.ravel()
-            covars = self.gmm.covariances_
-            weights = self.gmm.weights_
-
-            shift_val = getattr(self, "latest_shift_value", 0.0)
             mu_x = self.current_x if self.current_x is not None else 0.0
 
+            # GMM means are in the shifted domain => unshift, then from difference
+            # domain to absolute => + current_x (no scaling on var => unchanged)
             components = []
-            for k, w_k in enumerate(weights):
-                # GMM means are in the shifted domain => unshift
-                unshifted_mean = means[k] + shift_val
-
-                # No scaling on var => unchanged
-                var_k = covars[k][0, 0]
-                std_k = math.sqrt(var_k) if var_k > 0 else 1e-6
-
-                # Then from difference domain to absolute => + current_x
-                final_mean = float(mu_x + unshifted_mean)
-
+            for w_k, mean_k, std_k in zip(weights.tolist(), means.tolist(), stds.tolist()):
                 components.append({
                     "density": {
                         "type": "builtin",
                         "name": "norm",
-                        "params": {"loc": final_mean, "scale": float(std_k)}
+                        "params": {"loc": float(mu_x + mean_k + shift_val), "scale": std_k}
                     },
-                    "weight": float(w_k)
+                    "weight": w_k
                 })
-
-            mixture_dict = {
-                "type": "mixture",
-                "components": components
-            }
-            _ = density_pdf(mixture_dict, x=0.0)
-            return mixture_dict
+            return {"type": "mixture", "components": components}
 else:
     GMMTracker = None 
 
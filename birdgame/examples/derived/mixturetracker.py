@@ -1,16 +1,16 @@
 from pprint import pprint
 
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.batch_recursions import CoreTailBatchMixin
 from birdgame import HORIZON
 from birdgame.stats.fewvar import FEWVar
 import math
-from densitypdf import density_pdf
 import numpy as np
 from birdgame.datasources.livedata import live_data_generator
 from pprint import pprint
 
 
-class MixtureTracker(TrackerBase):
+class MixtureTracker(CoreTailBatchMixin, TrackerBase):
     """
     A model that fits a mixture of two Gaussian distributions, one capturing the core
     distribution and another with a larger variance to capture the tails.
@@ -78,15 +78,8 @@ class MixtureTracker(TrackerBase):
                 "weight": self.weights[i]
             })
 
-        prediction_rec = {
-            "type": "mixture",
-            "components": components
-        }
-
-        # Verify the generated density using density_pdf
-        _ = density_pdf(prediction_rec, x=0.0)  # Ensure the format is valid
-
-        return prediction_rec
+        # The layout is fixed, so it is not checked with density_pdf on every predict
+        return {"type": "mixture", "components": components}
 
 
 def example_of_testing_manually():
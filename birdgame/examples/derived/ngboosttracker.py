@@ -4,6 +4,8 @@ import time
 import pandas as pd
 import numpy as np
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.ring_buffer import RingBuffer
+from birdgame.trackers.retrain_executor import RetrainExecutor
 from birdgame import HORIZON
 import threading
 import warnings
@@ -18,6 +20,7 @@ class NGBoostConstants:
     WINDOW_SIZE = 5
     WARMUP_CUTOFF = 0
     USE_THREADING=True # Set this to True for live data streams where each `tick()` and `predict()` call must complete within ~50 ms
+    USE_PROCESS_POOL=False # Opt-in: with USE_THREADING, retrain in a worker process so that fitting does not hold the GIL
 
 try:
     from ngboost import NGBoost
@@ -31,6 +34,12 @@ except ImportError:
 
 if using_ngboost:
 
+    def fit_ngboost(model, X, y):
+        """Train a fresh clone of `model` (run by the RetrainExecutor in a worker process)."""
+        new_model = clone(model)
+        new_model.fit(X, y)
+        return new_model
+
     class NGBoostTracker(TrackerBase):
         """
         A model that tracks the dove location using NGBoost.
@@ -58,19 +67,32 @@ if using_ngboost:
             /!/ Set this to True for live data streams where each `tick()`  
             and `predict()` call must complete within ~50 ms.  
             When enabled, retraining happens in parallel without blocking predictions.
+        use_process_pool : bool
+            With `use_threading`, retrain in a worker process (see `RetrainExecutor`) rather than in a
+            thread, because NGBoost fitting is largely Python code that would hold the GIL
+            and delay `tick()` and `predict()`. Off by default (`NGBoostConstants.USE_PROCESS_POOL`).
         """
 
+        # Checkpoints pickle the fitted model; a pending background retrain is not checkpointed
+        CHECKPOINT_EXCLUDE = TrackerBase.CHECKPOINT_EXCLUDE + ('_new_data', '_stop_worker')
+        CHECKPOINT_PICKLE = ('model',)
+
         def __init__(self, horizon=HORIZON):
             super().__init__(horizon)
             self.current_x = None
-            self.last_observed_data = [] # Holds the last few observed data points
-            self.x_y_data = [] # Holds pairs of previous and current data points
 
             self.train_model_frequency = NGBoostConstants.TRAIN_MODEL_FREQUENCY
             self.num_data_points_max = NGBoostConstants.NUM_DATA_POINTS_MAX # (X.shape[0])
             self.window_size = NGBoostConstants.WINDOW_SIZE # (X.shape[1])
+
+            # Fixed size buffers (to limit memory usage as it will be run on continuous live data)
+            self.last_observed_data = RingBuffer(self.window_size + 1) # Holds the last few observed data points
+            data_capacity = self.num_data_points_max + self.window_size * 2
+            self.xi_data = RingBuffer(data_capacity) # Holds the previous data points (features)
+            self.yi_data = RingBuffer(data_capacity) # Holds the matching current data points (targets)
             self.warmup_cutoff = NGBoostConstants.WARMUP_CUTOFF
             self.use_threading = NGBoostConstants.USE_THREADING
+            self.use_process_pool = NGBoostConstants.USE_PROCESS_POOL
 
             # Initialize NGBoost model
             self.model = NGBoost(
@@ -96,7 +118,11 @@ if using_ngboost:
 
             # Threading tools
             self._lock = threading.Lock()
-            if self.use_threading:
+            self.retrain_executor = None
+            if self.use_threading and self.use_process_pool:
+                self._model_template = clone(self.model)
+                self.retrain_executor = RetrainExecutor(fit=fit_ngboost, on_result=self._swap_model)
+            elif self.use_threading:
                 self._cond = threading.Condition(self._lock)
                 self._new_data = None
                 self._stop_worker = False
@@ -134,38 +160,33 @@ if using_ngboost:
             prev_x = self.pop_from_quarantine(t)
 
             if prev_x is not None:
-                self.x_y_data.append((prev_x, x))
+                self.xi_data.append(prev_x)
+                self.yi_data.append(x)
 
                 # retraining condition
                 if self.count > self.window_size and self.count % self.train_model_frequency == 0:
-                    x_y_data = np.array(self.x_y_data)
-                    xi_values = x_y_data[:, 0]
-                    yi_values = x_y_data[:, 1]
-
                     # Determine the number of data points to use for training
-                    num_data_points = min(len(xi_values), self.num_data_points_max)
-                    if len(xi_values) < self.num_data_points_max + self.window_size:
+                    num_data_points = min(len(self.xi_data), self.num_data_points_max)
+                    if len(self.xi_data) < self.num_data_points_max + self.window_size:
                         num_data_points = max(0, num_data_points - (self.window_size + 3))
 
                     if num_data_points > self.window_size + 2:
-                        # Construct 'X' with fixed-size slices and 'y' as the values to predict
-                        X = np.lib.stride_tricks.sliding_window_view(
-                            xi_values[-(num_data_points + self.window_size - 1):],
-                            self.window_size,
-                        )
-                        y = yi_values[-num_data_points:]
+                        # 'X' rows are fixed-size slices and 'y' the values to predict (views, no copies)
+                        X = self.xi_data.windows(self.window_size)[-num_data_points:]
+                        y = self.yi_data.view(num_data_points)
 
                         # Fit a single NGBoost model (since we only need one model)
-                        if self.use_threading:
+                        if self.retrain_executor is not None:
+                            # Copied to shared memory; requests made during a fit are coalesced
+                            self.retrain_executor.submit(self._model_template, X, y, version=self.count)
+                        elif self.use_threading:
                             with self._cond:
-                                self._new_data = (X, y)  # overwrite old requests
+                                # The buffers keep changing, so the worker gets its own copy
+                                self._new_data = (X.copy(), y.copy())  # overwrite old requests
                                 self._cond.notify()
                         else:
-                            self._retrain_model_sync(X, y)
-
-                    # Keep only latest data (to limit memory usage as it will be run on continuous live data)
-                    self.x_y_data = self.x_y_data[-(self.num_data_points_max + self.window_size * 2):]
-                    self.last_observed_data = self.last_observed_data[-(self.window_size + 1):]
+                            # Copies, so the fitted model never refers to the buffers, which keep changing
+                            self._retrain_model_sync(X.copy(), y.copy())
 
                 self.count += 1
 
@@ -183,13 +204,11 @@ if using_ngboost:
                 # Check if the model is warming up
                 if self.tick_count < self.warmup_cutoff:
                     return None
-                
-                start_time = time.perf_counter()
 
                 # the central value (mean) of the gaussian distribution will be represented by the current value
                 x_mean = self.current_x
                 try:
-                    X_input = np.array([self.last_observed_data[-self.window_size:]])
+                    X_input = self.last_observed_data.view(self.window_size)[np.newaxis, :]
                     y_test_ngb = self.model.pred_dist(X_input)
                     loc = x_mean  # can use y_test_ngb.loc[0] if you prefer model mean
                     scale = max(y_test_ngb.scale[0], 1e-6) # get the parameter scale from ngboost normal distribution class
@@ -197,11 +216,6 @@ if using_ngboost:
                     loc = x_mean
                     scale = 1e-6
 
-                elapsed_ms = (time.perf_counter() - start_time) * 1000  # ms
-                # print(f"predict() took {elapsed_ms:.2f} ms")
-                if elapsed_ms > 50:
-                    print(f"predict() took {elapsed_ms:.2f} ms")
-
             # time.sleep(0.01)  # mimic short inference delay
 
             components = {
@@ -226,6 +240,16 @@ if using_ngboost:
             self.model = self._fit(X, y)
             # print(f"Sync retrain time: {(time.perf_counter()- start_time)*1000:.2f} ms") # check training time
 
+        def _swap_model(self, new_model):
+            """Swap in a model trained by the retrain executor."""
+            with self._lock:
+                self.model = new_model
+
+        def close(self):
+            """Wait for a retrain running in a worker process and free its shared memory."""
+            if self.retrain_executor is not None:
+                self.retrain_executor.close()
+
         def _worker_retrain_model_async(self):
             """Asynchronous retraining in a background worker"""
             while True:
@@ -0,0 +1,69 @@
+from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.stats.onlineem import OnlineEMMixture
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+from birdgame import HORIZON
+
+
+class OnlineEMMixtureTracker(TrackerBase):
+    """
+    A K-component normal mixture of horizon differences, kept up to date by stepwise EM
+    (see `OnlineEMMixture`) instead of batch refits on a window.
+
+    Every difference costs one E-step and one M-step over the exponentially forgotten
+    sufficient statistics, so tick time and memory are constant: there is no buffer of past
+    differences and nothing is ever refitted. Until `burn_in` differences have been seen the
+    prediction of a MixtureTracker is used instead.
+    """
+
+    def __init__(self, n_components=2, fading_factor=1e-4, horizon=HORIZON, burn_in=1000):
+        """
+        Args:
+            n_components (int): Number of Gaussian components in the mixture
+            fading_factor (float): smallest EM step size, roughly 1 / (differences remembered)
+            horizon (int): The prediction horizon in seconds
+            burn_in (int): # differences until we switch from the fallback to the mixture
+        """
+        super().__init__(horizon)
+        self.n_components = n_components
+        self.fading_factor = fading_factor
+        self.burn_in = burn_in
+        self.em = OnlineEMMixture(n_components=n_components, fading_factor=fading_factor)
+        self.fallback = MixtureTracker(horizon=horizon)
+        self.current_x = None
+
+    def tick(self, payload, performance_metrics):
+        """
+        Tick the fallback, then take one EM step on the horizon difference, if there is one.
+        """
+        self.fallback.tick(payload, performance_metrics)
+        x = payload['dove_location']
+        t = payload['time']
+        self.add_to_quarantine(t, x)
+        prev_x = self.pop_from_quarantine(t)
+        self.current_x = x
+        if prev_x is not None:
+            self.em.update(x - prev_x)
+            self.count += 1
+
+    def predict(self):
+        """
+        The fitted mixture of differences, shifted to the current location.
+        """
+        if self.count < self.burn_in:
+            return self.fallback.predict()
+        weights, means, stds = self.em.get()
+        components = []
+        for w_k, mean_k, std_k in zip(weights.tolist(), (self.current_x + means).tolist(), stds.tolist()):
+            components.append({
+                "density": {"type": "builtin", "name": "norm", "params": {"loc": mean_k, "scale": std_k}},
+                "weight": w_k
+            })
+        return {"type": "mixture", "components": components}
+
+
+if __name__ == '__main__':
+    tracker = OnlineEMMixtureTracker()
+    tracker.test_run(
+        live=False,  # Set to True to use live streaming data; set to False to use data from a CSV file
+        step_print=1000  # Print the score and progress every 1000 steps
+    )
@@ -1,11 +1,12 @@
 import math
 import numpy as np
 from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.batch_recursions import CoreTailBatchMixin
 from birdgame import HORIZON
 from birdgame.stats.fewvar import FEWVar
 
 
-class EMWAVarTracker(TrackerBase):
+class EMWAVarTracker(CoreTailBatchMixin, TrackerBase):
     """
     A model that fits a mixture of two Gaussian distributions, one capturing the core
     distribution and another with a larger variance to capture the tails.
@@ -95,4 +96,4 @@ class EMWAVarTracker(TrackerBase):
             "type": "mixture",
             "components": components
         }
-        return prediction_density
\ No newline at end of file
+        return prediction_density
@@ -0,0 +1,40 @@
+from itertools import accumulate
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+    using_scipy = True
+except ImportError:
+    using_scipy = False
+
+
+def ew_filter(x, decay, initial=0.0):
+    """
+    First order linear recursion y[t] = decay * y[t-1] + x[t], starting from y[-1] = initial.
+
+    This is the recursion behind the fading-factor estimators once they are written in terms of
+    weighted sums rather than averages. It runs in C via scipy.signal.lfilter when scipy is
+    installed, and falls back to itertools.accumulate otherwise.
+
+    Parameters
+    ----------
+    x : array-like
+        Inputs, one per step.
+    decay : float
+        Multiplier applied to the previous output, i.e. 1 - fading_factor.
+    initial : float
+        Output before the first step.
+
+    Returns
+    -------
+    numpy.ndarray
+        The outputs y[0], ..., y[n-1].
+    """
+    x = np.asarray(x, dtype=float)
+    if not len(x):
+        return np.empty(0)
+    if using_scipy:
+        y, _ = lfilter([1.0], [1.0, -decay], x, zi=[decay * initial])
+        return y
+    return np.fromiter(accumulate(x.tolist(), lambda y, xt: decay * y + xt, initial=initial),
+                       dtype=float, count=len(x) + 1)[1:]
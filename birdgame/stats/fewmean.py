@@ -1,4 +1,6 @@
 from river import stats
+import numpy as np
+from birdgame.stats.ewfilter import ew_filter
 
 class FEWMean(stats.base.Univariate):
 
@@ -22,6 +24,31 @@ class FEWMean(stats.base.Univariate):
     def tick(self, x):
         return self.update(x)
 
+    def update_many(self, xs):
+        """
+        Equivalent to calling `update` on each element of `xs`, returning the mean after each one.
+
+        With S = weight_sum * ewa the update is the linear recursion S <- (1 - fading_factor) * S + x,
+        and likewise for weight_sum, so the whole series is two `ew_filter` passes.
+        """
+        xs = np.asarray(xs, dtype=float)
+        if not len(xs):
+            return np.empty(0)
+        decay = 1 - self.fading_factor
+        started = self.ewa is not None
+        weight_sum = self.weight_sum if started else 0.0
+        weight_sums = ew_filter(np.ones(len(xs)), decay, initial=weight_sum)
+        means = ew_filter(xs, decay, initial=self.ewa * weight_sum if started else 0.0) / weight_sums
+        self.ewa = float(means[-1])
+        self.weight_sum = float(weight_sums[-1])
+        return means
+
+    def transform(self, xs):
+        """
+        Trajectory of means that `update_many` would return, leaving this instance unchanged.
+        """
+        return self.from_dict(self.to_dict()).update_many(xs)
+
     def get(self):
         # Return the current EWA
         return self.ewa if self.ewa is not None else 0
@@ -0,0 +1,102 @@
+import numpy as np
+from birdgame.stats.fewmean import FEWMean
+
+
+class FEWMeanBank:
+    """
+    Many FEWMean estimators held as NumPy arrays and updated in one vectorized step.
+
+    The bank tracks N fading factors, optionally for M independent streams, so state arrays have
+    shape (N,) or (M, N). Each entry follows exactly the same arithmetic as a separate FEWMean.
+
+    Parameters
+    ----------
+    fading_factors : array-like
+        The N fading factors.
+    n_streams : int, optional
+        Number of independent streams M. If None, a single stream is tracked.
+    """
+
+    def __init__(self, fading_factors, n_streams=None):
+        self.fading_factors = np.asarray(fading_factors, dtype=float)
+        self.n_streams = n_streams
+        shape = self.fading_factors.shape if n_streams is None else (n_streams,) + self.fading_factors.shape
+        # weight_sum == 0 marks an estimator that has not seen data yet (see FEWVarBank)
+        self.ewa = np.zeros(shape)
+        self.weight_sum = np.zeros(shape)
+
+    def update(self, x):
+        """
+        Update every estimator with x: a scalar, or one value per stream. NaN skips that stream.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.n_streams is not None:
+            x = x[..., None]
+        weight = (1 - self.fading_factors) * self.weight_sum
+        ewa = (weight * self.ewa + x) / (weight + 1)
+        weight_sum = weight + 1
+
+        skip = np.isnan(x)
+        if skip.any():
+            skip = np.broadcast_to(skip, ewa.shape)
+            ewa = np.where(skip, self.ewa, ewa)
+            weight_sum = np.where(skip, self.weight_sum, weight_sum)
+
+        self.ewa, self.weight_sum = ewa, weight_sum
+
+    def tick(self, x):
+        return self.update(x)
+
+    def get(self):
+        # Return the current EWAs
+        return self.ewa.copy()
+
+    def get_mean(self):
+        return self.get()
+
+    def to_dict(self):
+        """
+        Serializes the state of the FEWMeanBank object to a dictionary.
+        """
+        return {
+            'fading_factors': self.fading_factors.tolist(),
+            'n_streams': self.n_streams,
+            'ewa': self.ewa.tolist(),
+            'weight_sum': self.weight_sum.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Deserializes the state from a dictionary into a new FEWMeanBank instance.
+        """
+        instance = cls(fading_factors=data['fading_factors'], n_streams=data.get('n_streams'))
+        instance.ewa = np.array(data['ewa'], dtype=float)
+        instance.weight_sum = np.array(data['weight_sum'], dtype=float)
+        return instance
+
+    def to_fewmeans(self):
+        """
+        Returns the equivalent FEWMean instances, as a list (or a list of lists per stream).
+        """
+        def fewmean(i):
+            if self.weight_sum[i] == 0:
+                return FEWMean(fading_factor=float(self.fading_factors[i[-1]]))
+            return FEWMean.from_dict({'fading_factor': float(self.fading_factors[i[-1]]), 'ewa': float(self.ewa[i]),
+                                      'weight_sum': float(self.weight_sum[i])})
+
+        n = len(self.fading_factors)
+        if self.n_streams is None:
+            return [fewmean((j,)) for j in range(n)]
+        return [[fewmean((m, j)) for j in range(n)] for m in range(self.n_streams)]
+
+    @classmethod
+    def from_fewmeans(cls, fewmeans):
+        """
+        Builds a single-stream bank from FEWMean instances.
+        """
+        instance = cls(fading_factors=[m.fading_factor for m in fewmeans])
+        for j, m in enumerate(fewmeans):
+            if m.ewa is not None:
+                instance.ewa[j], instance.weight_sum[j] = m.ewa, m.weight_sum
+        return instance
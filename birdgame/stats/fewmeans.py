@@ -34,6 +34,7 @@ class FEWMeans:
 
     def __init__(self, fading_factors, var_fading_factor=0.01, buffer_size=5, epsilon=1e-9):
         self.fading_factors = fading_factors
+        self.buffer_size = buffer_size
         self.means = [FEWMean(f) for f in fading_factors]
         self.var = FEWVar(fading_factor=var_fading_factor)
         self.errors = [deque(maxlen=buffer_size) for _ in self.means]
@@ -108,7 +109,10 @@ class FEWMeans:
         """
         return {
             'fading_factors': self.fading_factors,
+            'buffer_size': self.buffer_size,
+            'epsilon': self.epsilon,
             'means': [m.to_dict() for m in self.means],
+            'var': self.var.to_dict(),
             'errors': [list(e) for e in self.errors],
             'current_estimate': self.current_estimate
         }
@@ -118,10 +122,14 @@ class FEWMeans:
         """
         Deserializes the state from a dictionary into a new FEWMeans instance.
         """
-        instance = cls(fading_factors=data['fading_factors'])
+        instance = cls(fading_factors=data['fading_factors'], buffer_size=data.get('buffer_size', 5),
+                       epsilon=data.get('epsilon', 1e-9))
         instance.current_estimate = data['current_estimate']
         # Restore each FEWMean
         instance.means = [FEWMean.from_dict(mdict) for mdict in data['means']]
+        # Restore the variance of the errors (absent from dicts made by older versions)
+        if 'var' in data:
+            instance.var = FEWVar.from_dict(data['var'])
         # Restore errors
-        instance.errors = [deque(e, maxlen=5) for e in data['errors']]
+        instance.errors = [deque(e, maxlen=instance.buffer_size) for e in data['errors']]
         return instance
\ No newline at end of file
@@ -1,47 +1,197 @@
 from river import stats
-from collections import deque
+from collections import deque, defaultdict
 import bisect
+import heapq
+import numpy as np
+
+
+def _interpolate(lower, upper, frac):
+    """ Linear interpolation between two adjacent order statistics (frac=0.5 gives their mean). """
+    if frac == 0:
+        return lower
+    return (1 - frac) * lower + frac * upper
+
+
+def _quantile_rank(n, quantile):
+    """ Rank k and fraction such that the quantile lies between order statistics k and k+1. """
+    position = (n - 1) * quantile
+    k = int(position)
+    return k, position - k
+
+
+class SortedListWindow:
+    """
+    Window kept as a sorted Python list (bisect.insort / list.pop).
+
+    Each update is O(window) because of the memmove, but that memmove is so cheap that this
+    is the fastest choice for small and medium windows.
+    """
+
+    def __init__(self, quantile=0.5):
+        self.quantile = quantile
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, x):
+        bisect.insort(self.values, x)
+
+    def remove(self, x):
+        idx = bisect.bisect_left(self.values, x)
+        self.values.pop(idx)
+
+    def get(self):
+        k, frac = _quantile_rank(len(self.values), self.quantile)
+        return _interpolate(self.values[k], self.values[k + 1] if frac else None, frac)
+
+
+class DualHeapWindow:
+    """
+    Window kept as two heaps with lazy deletion, split at the rank of the tracked quantile.
+
+    `lower` is a max-heap (stored negated) with the smallest k+1 values, `upper` a min-heap
+    with the rest, so the quantile only needs the two tops. Removed values are only recorded
+    and dropped once they reach the top of their heap, giving O(log window) updates. If stale
+    entries pile up the heaps are rebuilt, which is amortized O(1) per update.
+    """
+
+    def __init__(self, quantile=0.5):
+        self.quantile = quantile
+        self.lower, self.upper = [], []
+        self.lower_size = self.upper_size = 0  # Live entries in each heap
+        self.lower_removed, self.upper_removed = defaultdict(int), defaultdict(int)
+        self.n_removed = 0
+
+    def __len__(self):
+        return self.lower_size + self.upper_size
+
+    def _prune(self):
+        lower, upper = self.lower, self.upper
+        while lower and self.lower_removed.get(-lower[0]):
+            self._discard(self.lower_removed, -heapq.heappop(lower))
+        while upper and self.upper_removed.get(upper[0]):
+            self._discard(self.upper_removed, heapq.heappop(upper))
+
+    def _discard(self, removed, x):
+        removed[x] -= 1
+        if not removed[x]:
+            del removed[x]
+        self.n_removed -= 1
+
+    def _rebalance(self):
+        n = len(self)
+        target = _quantile_rank(n, self.quantile)[0] + 1 if n else 0
+        self._prune()
+        while self.lower_size > target:
+            heapq.heappush(self.upper, -heapq.heappop(self.lower))
+            self.lower_size -= 1
+            self.upper_size += 1
+            self._prune()
+        while self.lower_size < target:
+            heapq.heappush(self.lower, -heapq.heappop(self.upper))
+            self.upper_size -= 1
+            self.lower_size += 1
+            self._prune()
+
+    def add(self, x):
+        if self.lower_size and x <= -self.lower[0]:
+            heapq.heappush(self.lower, -x)
+            self.lower_size += 1
+        else:
+            heapq.heappush(self.upper, x)
+            self.upper_size += 1
+        self._rebalance()
+
+    def remove(self, x):
+        # Every live value in `lower` is <= every live value in `upper`, and the tops are live
+        if self.lower_size and x <= -self.lower[0]:
+            self.lower_removed[x] += 1
+            self.lower_size -= 1
+        else:
+            self.upper_removed[x] += 1
+            self.upper_size -= 1
+        self.n_removed += 1
+        self._rebalance()
+        if self.n_removed > len(self) + 16:
+            self._compact()
+
+    def _compact(self):
+        def live(heap, removed, sign):
+            kept = []
+            for v in heap:
+                if removed.get(sign * v):
+                    removed[sign * v] -= 1
+                else:
+                    kept.append(v)
+            heapq.heapify(kept)
+            return kept
+
+        self.lower = live(self.lower, self.lower_removed, -1)
+        self.upper = live(self.upper, self.upper_removed, 1)
+        self.lower_removed, self.upper_removed = defaultdict(int), defaultdict(int)
+        self.n_removed = 0
+
+    def get(self):
+        k, frac = _quantile_rank(len(self), self.quantile)
+        return _interpolate(-self.lower[0], self.upper[0] if frac else None, frac)
+
+
+BACKENDS = {'sorted': SortedListWindow, 'heaps': DualHeapWindow}
 
 
 class FEWMedian(stats.base.Univariate):
     """
     A regular sliding-window median filter.
-    
-    Stores up to 'window_size' of the most recent data points, 
+
+    Stores up to 'window_size' of the most recent data points,
     and returns the median of that window when .get() is called.
+
+    Any other rolling quantile can be tracked instead via `quantile`, interpolating linearly
+    between adjacent order statistics (as numpy.quantile does by default).
     """
 
-    def __init__(self, window_size=6):
+    def __init__(self, window_size=6, quantile=0.5, backend='sorted'):
         """
         Args:
-            window_size (int): Number of recent samples to keep 
+            window_size (int): Number of recent samples to keep
                                for median calculation.
+            quantile (float): The rolling quantile to track, 0.5 for the median.
+            backend (str): 'sorted' keeps a sorted list, the fastest for windows up to ~10k.
+                           'heaps' uses two heaps with lazy deletion, O(log n) per update,
+                           for large windows.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
         self.window_size = window_size
+        self.quantile = quantile
+        self.backend = backend
 
         # We'll keep both:
         # 1) A deque for easy popping of old samples
-        # 2) A sorted list for efficient median computation
+        # 2) An ordered structure for efficient quantile computation
         self._window = deque()
-        self._sorted_window = []
+        self._ordered = BACKENDS[backend](quantile=quantile)
+
+    @property
+    def _sorted_window(self):
+        return sorted(self._window) if self.backend != 'sorted' else self._ordered.values
 
     def update(self, x):
         """
-        Incorporates a new data point x into the sliding window 
+        Incorporates a new data point x into the sliding window
         and returns 'self' (River convention).
         """
         # 1) Add x to the right of the _window
         self._window.append(x)
 
-        # 2) Insert x into the _sorted_window (kept in sorted order via bisect)
-        bisect.insort(self._sorted_window, x)
+        # 2) Insert x into the ordered structure
+        self._ordered.add(x)
 
         # 3) If we've exceeded window_size, remove the oldest element from both structures
         if len(self._window) > self.window_size:
             oldest = self._window.popleft()
-            # Remove 'oldest' from the sorted list
-            idx = bisect.bisect_left(self._sorted_window, oldest)
-            self._sorted_window.pop(idx)
+            self._ordered.remove(oldest)
 
         return self
 
@@ -49,20 +199,24 @@ class FEWMedian(stats.base.Univariate):
         """Alias for update(), if you prefer that naming."""
         return self.update(x)
 
+    def update_many(self, xs):
+        """
+        Equivalent to calling update() on each element of xs, returning get() after each one.
+        """
+        values = []
+        for x in np.asarray(xs, dtype=float).tolist():
+            self.update(x)
+            values.append(self.get())
+        return np.array(values)
+
     def get(self):
         """
-        Returns the median of the current window. 
+        Returns the median (or tracked quantile) of the current window.
         If there are no samples yet, returns 0 by convention.
         """
-        n = len(self._sorted_window)
-        if n == 0:
+        if len(self._ordered) == 0:
             return 0
-        mid = n // 2
-        if n % 2 == 1:
-            return self._sorted_window[mid]
-        else:
-            # Average of the two middle values
-            return 0.5 * (self._sorted_window[mid - 1] + self._sorted_window[mid])
+        return self._ordered.get()
 
     def to_dict(self):
         """
@@ -71,8 +225,10 @@ class FEWMedian(stats.base.Univariate):
         """
         return {
             'window_size': self.window_size,
+            'quantile': self.quantile,
+            'backend': self.backend,
             'window': list(self._window),
-            'sorted_window': self._sorted_window
+            'sorted_window': list(self._sorted_window)
         }
 
     @classmethod
@@ -80,9 +236,11 @@ class FEWMedian(stats.base.Univariate):
         """
         Deserializes the state from a dictionary into a new FEWMedian instance.
         """
-        instance = cls(window_size=data['window_size'])
-        instance._window = deque(data['window'])
-        instance._sorted_window = data['sorted_window']
+        instance = cls(window_size=data['window_size'], quantile=data.get('quantile', 0.5),
+                       backend=data.get('backend', 'sorted'))
+        for x in data['window']:
+            instance._window.append(x)
+            instance._ordered.add(x)
         return instance
 
 
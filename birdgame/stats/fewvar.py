@@ -1,4 +1,6 @@
 from river import stats
+import numpy as np
+from birdgame.stats.ewfilter import ew_filter
 
 
 class FEWVar(stats.base.Univariate):
@@ -30,6 +32,44 @@ class FEWVar(stats.base.Univariate):
     def tick(self, x):
         return self.update(x=x)
 
+    def update_many(self, xs):
+        """
+        Equivalent to calling `update` on each element of `xs`.
+
+        Both the weighted sum of x and the weighted sum of squared deviations follow linear
+        recursions (the latter once the means are known), so this is three `ew_filter` passes.
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            The mean and the variance after each update.
+        """
+        xs = np.asarray(xs, dtype=float)
+        if not len(xs):
+            return np.empty(0), np.empty(0)
+        decay = 1 - self.fading_factor
+        started = self.ewa is not None
+        weight_sum = self.weight_sum if started else 0.0
+        weight_sums = ew_filter(np.ones(len(xs)), decay, initial=weight_sum)
+        means = ew_filter(xs, decay, initial=self.ewa * weight_sum if started else 0.0) / weight_sums
+
+        previous_means = np.empty_like(means)
+        previous_means[1:] = means[:-1]
+        previous_means[0] = self.ewa if started else xs[0]  # The first sample has zero deviation
+        deviations = (xs - previous_means) * (xs - means)
+        variances = ew_filter(deviations, decay, initial=self.ewv * weight_sum if started else 0.0) / weight_sums
+
+        self.ewa = float(means[-1])
+        self.ewv = float(variances[-1])
+        self.weight_sum = float(weight_sums[-1])
+        return means, variances
+
+    def transform(self, xs):
+        """
+        The (means, variances) that `update_many` would return, leaving this instance unchanged.
+        """
+        return self.from_dict(self.to_dict()).update_many(xs)
+
     def get(self):
         # Return the current exponentially weighted variance
         return self.ewv if self.ewv is not None else 0
@@ -0,0 +1,114 @@
+import numpy as np
+from birdgame.stats.fewvar import FEWVar
+
+
+class FEWVarBank:
+    """
+    Many FEWVar estimators held as NumPy arrays and updated in one vectorized step.
+
+    The bank tracks N fading factors, optionally for M independent streams, so state arrays have
+    shape (N,) or (M, N). Each entry follows exactly the same arithmetic as a separate FEWVar, so
+    results agree bit for bit. This pays off for hyperparameter sweeps over many fading factors;
+    for two or three estimators separate FEWVar instances are cheaper.
+
+    Parameters
+    ----------
+    fading_factors : array-like
+        The N fading factors.
+    n_streams : int, optional
+        Number of independent streams M. If None, a single stream is tracked.
+    """
+
+    def __init__(self, fading_factors, n_streams=None):
+        self.fading_factors = np.asarray(fading_factors, dtype=float)
+        self.n_streams = n_streams
+        shape = self.fading_factors.shape if n_streams is None else (n_streams,) + self.fading_factors.shape
+        # weight_sum == 0 marks an estimator that has not seen data yet. With ewa = ewv = 0 the first
+        # update then reduces to ewa = x, ewv = 0, weight_sum = 1, just as in FEWVar.
+        self.ewa = np.zeros(shape)
+        self.ewv = np.zeros(shape)
+        self.weight_sum = np.zeros(shape)
+
+    def update(self, x):
+        """
+        Update every estimator with x: a scalar, or one value per stream. NaN skips that stream.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.n_streams is not None:
+            x = x[..., None]
+        weight = (1 - self.fading_factors) * self.weight_sum
+        previous_ewa = self.ewa
+        ewa = (weight * self.ewa + x) / (weight + 1)
+        ewv = (weight * self.ewv + (x - previous_ewa) * (x - ewa)) / (weight + 1)
+        weight_sum = weight + 1
+
+        skip = np.isnan(x)
+        if skip.any():
+            skip = np.broadcast_to(skip, ewa.shape)
+            ewa = np.where(skip, self.ewa, ewa)
+            ewv = np.where(skip, self.ewv, ewv)
+            weight_sum = np.where(skip, self.weight_sum, weight_sum)
+
+        self.ewa, self.ewv, self.weight_sum = ewa, ewv, weight_sum
+
+    def tick(self, x):
+        return self.update(x=x)
+
+    def get(self):
+        # Return the current exponentially weighted variances
+        return self.ewv.copy()
+
+    def get_var(self):
+        return self.get()
+
+    def get_mean(self):
+        return self.ewa.copy()
+
+    def to_dict(self):
+        """
+        Serializes the state of the FEWVarBank object to a dictionary.
+        """
+        return {
+            'fading_factors': self.fading_factors.tolist(),
+            'n_streams': self.n_streams,
+            'ewa': self.ewa.tolist(),
+            'ewv': self.ewv.tolist(),
+            'weight_sum': self.weight_sum.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Deserializes the state from a dictionary into a new FEWVarBank instance.
+        """
+        instance = cls(fading_factors=data['fading_factors'], n_streams=data.get('n_streams'))
+        instance.ewa = np.array(data['ewa'], dtype=float)
+        instance.ewv = np.array(data['ewv'], dtype=float)
+        instance.weight_sum = np.array(data['weight_sum'], dtype=float)
+        return instance
+
+    def to_fewvars(self):
+        """
+        Returns the equivalent FEWVar instances, as a list (or a list of lists per stream).
+        """
+        def fewvar(i):
+            if self.weight_sum[i] == 0:
+                return FEWVar(fading_factor=float(self.fading_factors[i[-1]]))
+            return FEWVar.from_dict({'fading_factor': float(self.fading_factors[i[-1]]), 'ewa': float(self.ewa[i]),
+                                     'ewv': float(self.ewv[i]), 'weight_sum': float(self.weight_sum[i])})
+
+        n = len(self.fading_factors)
+        if self.n_streams is None:
+            return [fewvar((j,)) for j in range(n)]
+        return [[fewvar((m, j)) for j in range(n)] for m in range(self.n_streams)]
+
+    @classmethod
+    def from_fewvars(cls, fewvars):
+        """
+        Builds a single-stream bank from FEWVar instances.
+        """
+        instance = cls(fading_factors=[v.fading_factor for v in fewvars])
+        for j, v in enumerate(fewvars):
+            if v.ewa is not None:
+                instance.ewa[j], instance.ewv[j], instance.weight_sum[j] = v.ewa, v.ewv, v.weight_sum
+        return instance
@@ -1,11 +1,14 @@
+import math
 import random
 import numpy as np
-import math
 
 
 # Just here for testing purposes
 
-def jump_diffusion(n_sim, jump_rate, jump_size, drift=0.0, sigma=0.1, epsilon=0.1, vega=2.0):
+N_STREAMS = 7  # Independent random streams, one per kind of draw
+
+
+def jump_diffusion(n_sim, jump_rate, jump_size, drift=0.0, sigma=0.1, epsilon=0.1, vega=2.0, seed=None):
     """
     Simulate a Brownian motion with two-sided jumps and fat-tailed measurement noise.
 
@@ -25,12 +28,25 @@ def jump_diffusion(n_sim, jump_rate, jump_size, drift=0.0, sigma=0.1, epsilon=0.
         Noise scale for the gaussian measurement noise.
     vega:  float
         Noise scale for exponential measurement error.
+    seed : int, numpy.random.Generator or None
+        Seed for a reproducible series, simulated with `jump_diffusion_paths`. If None, the series is
+        drawn step by step from the global `random` and `numpy.random` state, as it always was, so
+        callers that seed those globally keep getting the same series.
 
     Returns
     -------
     series : list of floats
         Simulated time series.
     """
+    if seed is None:
+        return _jump_diffusion_global_state(n_sim, jump_rate=jump_rate, jump_size=jump_size, drift=drift,
+                                            sigma=sigma, epsilon=epsilon, vega=vega)
+    return jump_diffusion_paths(n_sim, jump_rate=jump_rate, jump_size=jump_size, drift=drift, sigma=sigma,
+                                epsilon=epsilon, vega=vega, seed=seed)[0].tolist()
+
+
+def _jump_diffusion_global_state(n_sim, jump_rate, jump_size, drift=0.0, sigma=0.1, epsilon=0.1, vega=2.0):
+    """ The original scalar loop of `jump_diffusion`, drawing from the global random states. """
     series = []
     x = 0.0
     for _ in range(n_sim):
@@ -50,4 +66,114 @@ def jump_diffusion(n_sim, jump_rate, jump_size, drift=0.0, sigma=0.1, epsilon=0.
         y = x + epsilon * gauss_noise + vega * tail_noise
         series.append(y)
 
-    return series
\ No newline at end of file
+    return series
+
+
+def jump_diffusion_paths(n_steps, n_paths=1, jump_rate=0.01, jump_size=1.0, drift=0.0, sigma=0.1, epsilon=0.1,
+                         vega=2.0, seed=None, dt=None, x0=0.0, return_latent=False):
+    """
+    Simulate `n_paths` independent jump diffusions at once, as an array of shape (n_paths, n_steps).
+
+    The model is that of `jump_diffusion`: Brownian increments with drift, jumps of exponential size
+    and random sign, then gaussian plus sqrt-exponential measurement noise on top of the latent path.
+
+    Parameters
+    ----------
+    n_steps : int
+        Number of steps per path.
+    n_paths : int
+        Number of paths.
+    jump_rate, jump_size, drift, sigma, epsilon, vega : float
+        As for `jump_diffusion`. Drift, variance and jump probability are per unit of time.
+    seed : int, numpy.random.SeedSequence, numpy.random.Generator or None
+        Seed. The same seed gives the same paths, whatever the chunking (see `jump_diffusion_chunks`).
+    dt : float, array-like or None
+        Time elapsed before each step, broadcast to (n_paths, n_steps). Defaults to 1.
+    x0 : float or array-like
+        Starting latent value of each path.
+    return_latent : bool
+        If True, return (observed, latent) where latent is the path before measurement noise.
+    """
+    dt = None if dt is None else np.broadcast_to(np.asarray(dt, dtype=float), (n_paths, n_steps))
+    chunks = jump_diffusion_chunks(n_steps, chunk_size=max(n_steps, 1), n_paths=n_paths, jump_rate=jump_rate,
+                                   jump_size=jump_size, drift=drift, sigma=sigma, epsilon=epsilon, vega=vega,
+                                   seed=seed, dt=dt, x0=x0, return_latent=return_latent)
+    chunk = next(chunks, None)
+    if chunk is None:
+        empty = np.empty((n_paths, 0))
+        return (empty, empty.copy()) if return_latent else empty
+    return chunk
+
+
+def jump_diffusion_chunks(n_steps, chunk_size=100_000, n_paths=1, jump_rate=0.01, jump_size=1.0, drift=0.0,
+                          sigma=0.1, epsilon=0.1, vega=2.0, seed=None, dt=None, x0=0.0, return_latent=False):
+    """
+    Streaming version of `jump_diffusion_paths` for paths too long to hold in memory, yielding
+    arrays of shape (n_paths, chunk_size) (the last one possibly shorter) and carrying the latent
+    state across chunks.
+
+    Every kind of draw has its own random stream, consumed step by step, so concatenating the chunks
+    gives exactly `jump_diffusion_paths` with the same seed.
+
+    Parameters
+    ----------
+    dt : float, array-like or None
+        Time elapsed before each step, either a scalar or an array of shape (n_paths, n_steps)
+        or (n_steps,). Only the current chunk is read from it, so a memory-mapped array works.
+    """
+    streams = jump_diffusion_streams(seed)
+    x = np.array(np.broadcast_to(np.asarray(x0, dtype=float), (n_paths,)))
+
+    for start in range(0, n_steps, chunk_size):
+        n = min(chunk_size, n_steps - start)
+        if dt is None or np.ndim(dt) == 0:
+            step_dt = 1.0 if dt is None else float(dt)
+        else:
+            step_dt = np.asarray(dt, dtype=float)
+            step_dt = step_dt[start:start + n, None] if step_dt.ndim == 1 else step_dt[:, start:start + n].T
+        observed, latent = simulate_chunk(streams, x, n, step_dt=step_dt, jump_rate=jump_rate, jump_size=jump_size,
+                                          drift=drift, sigma=sigma, epsilon=epsilon, vega=vega)
+        x = latent[-1]
+        yield (observed.T.copy(), latent.T.copy()) if return_latent else observed.T.copy()
+
+
+def jump_diffusion_streams(seed=None):
+    """ One independent Generator per kind of draw, derived from `seed`. """
+    return np.random.default_rng(seed).spawn(N_STREAMS)
+
+
+def simulate_chunk(streams, x, n, step_dt=1.0, jump_rate=0.01, jump_size=1.0, drift=0.0, sigma=0.1, epsilon=0.1,
+                   vega=2.0):
+    """
+    Advance paths currently at latent values `x` (shape (n_paths,)) by `n` steps.
+
+    Arrays are step-major, shape (n, n_paths), so that each stream is consumed in step order and
+    the draws do not depend on how a long path is split into chunks. `step_dt` is a scalar or
+    broadcasts to (n, n_paths).
+
+    Returns
+    -------
+    (observed, latent) : (numpy.ndarray, numpy.ndarray)
+    """
+    increment_rng, jump_rng, sign_rng, size_rng, gauss_rng, tail_rng, tail_sign_rng = streams
+    shape = (n, len(x))
+
+    # Brownian increments and jumps
+    increments = drift * step_dt + sigma * np.sqrt(step_dt) * increment_rng.standard_normal(shape)
+    jumps = jump_rng.random(shape) < np.minimum(jump_rate * np.asarray(step_dt), 1.0)
+    jump_signs = np.where(sign_rng.random(shape) < 0.5, 1.0, -1.0)
+    increments += jumps * jump_signs * jump_size * size_rng.standard_exponential(shape)
+    latent = np.cumsum(np.vstack([x, increments]), axis=0)[1:]  # Summed in the same order across chunks
+
+    # Fat-tailed noise
+    tail_signs = np.where(tail_sign_rng.random(shape) < 0.5, 1.0, -1.0)
+    tail_noise = np.sqrt(tail_rng.standard_exponential(shape)) * tail_signs
+    observed = latent + epsilon * gauss_rng.standard_normal(shape) + vega * tail_noise
+    return observed, latent
+
+
+if __name__ == '__main__':
+    import time
+    start = time.perf_counter()
+    paths = jump_diffusion_paths(100_000, n_paths=100, jump_rate=0.01, jump_size=20, seed=0)
+    print(f"{paths.shape} in {time.perf_counter() - start:.2f}s")
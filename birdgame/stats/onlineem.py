@@ -0,0 +1,125 @@
+import math
+import numpy as np
+
+
+class OnlineEMMixture:
+    """
+    One dimensional mixture of K normals fitted by stepwise (online) EM.
+
+    The state is the exponentially forgotten sufficient statistics of each component: the
+    responsibility weight s0, the weighted sum s1 and the weighted sum of squares s2. Each `update`
+    is one E-step for the new observation followed by the M-step implied by moving the statistics
+    toward it with step size max(1/n, fading_factor). Cost and memory are O(K) per observation,
+    whatever the length of the history.
+
+        em = OnlineEMMixture(n_components=2, fading_factor=1e-4)
+        for x in xs:
+            em.update(x)
+        weights, means, stds = em.get()
+
+    Parameters
+    ----------
+    n_components : int
+        Number of normal components K.
+    fading_factor : float
+        Smallest step size, so roughly 1 / (effective number of observations remembered).
+    min_var : float
+        Floor applied to component variances, so a component cannot collapse onto one value.
+    """
+
+    def __init__(self, n_components=2, fading_factor=1e-4, min_var=1e-12):
+        if n_components < 1:
+            raise ValueError("A mixture needs at least one component")
+        if not 0 < fading_factor <= 1:
+            raise ValueError(f"fading_factor must be in (0, 1], got {fading_factor}")
+        self.n_components = n_components
+        self.fading_factor = fading_factor
+        self.min_var = min_var
+        self.count = 0
+        self.stats = None  # Rows s0, s1, s2, one column per component
+        self._powers = np.ones(3)  # (1, x, x**2), reused by every update
+
+    def update(self, x):
+        """ Absorb one observation. """
+        K = self.n_components
+        self.count += 1
+        if self.stats is None:
+            # Components share the first observation's location and get increasingly wide scales
+            scale = max(abs(x), 1e-3)
+            self.stats = np.empty((3, K))
+            self.stats[0] = 1.0 / K
+            self.stats[1] = x / K
+            self.stats[2] = (x * x + (scale * 2.0 ** np.arange(K)) ** 2) / K
+            return
+
+        # E-step: responsibilities of each component for x
+        s0, s1, s2 = self.stats
+        means = s1 / s0
+        variances = np.maximum(s2 / s0 - means * means, self.min_var)
+        z = x - means
+        log_p = np.log(s0 * s0 / variances) - z * z / variances  # Twice the log likelihood, up to a constant
+        p = np.exp(0.5 * (log_p - log_p.max()))
+        step = max(1.0 / self.count, self.fading_factor)
+
+        # M-step: move the sufficient statistics toward x, all three rows at once
+        self.stats *= 1.0 - step
+        powers = self._powers
+        powers[1] = x
+        powers[2] = x * x
+        self.stats += np.multiply.outer(powers, p * (step / p.sum()))
+        np.maximum(s0, 1e-300, out=s0)  # A component nobody claims fades, but never to exactly zero
+
+    def tick(self, x):
+        return self.update(x=x)
+
+    def update_many(self, xs):
+        """ Equivalent to calling `update` on each element of `xs`. """
+        for x in np.asarray(xs, dtype=float).tolist():
+            self.update(x)
+
+    def get(self):
+        """
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+            The component weights (summing to one), means and standard deviations,
+            or None before the first observation.
+        """
+        if self.stats is None:
+            return None
+        s0, s1, s2 = self.stats
+        means = s1 / s0
+        stds = np.sqrt(np.maximum(s2 / s0 - means * means, self.min_var))
+        return s0 / s0.sum(), means, stds
+
+    def log_pdf(self, x):
+        """ Log density of the current mixture at x. """
+        weights, means, stds = self.get()
+        z = (x - means) / stds
+        log_p = np.log(weights) - np.log(stds) - 0.5 * z * z
+        max_log_p = log_p.max()
+        return float(max_log_p + math.log(np.exp(log_p - max_log_p).sum()) - 0.5 * math.log(2 * math.pi))
+
+    def to_dict(self):
+        """
+        Serializes the state of the OnlineEMMixture object to a dictionary.
+        """
+        return {
+            'n_components': self.n_components,
+            'fading_factor': self.fading_factor,
+            'min_var': self.min_var,
+            'count': self.count,
+            'stats': None if self.stats is None else self.stats.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Deserializes the state from a dictionary into a new OnlineEMMixture instance.
+        """
+        instance = cls(n_components=data['n_components'], fading_factor=data['fading_factor'],
+                       min_var=data['min_var'])
+        instance.count = data['count']
+        if data['stats'] is not None:
+            instance.stats = np.array(data['stats'], dtype=float)
+        return instance
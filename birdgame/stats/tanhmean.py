@@ -3,7 +3,7 @@ import numpy as np
 
 from birdgame.stats.fewmean import FEWMean
 from birdgame.stats.fewvar import FEWVar
-from jumpdiffusion import jump_diffusion
+from birdgame.stats.jumpdiffusion import jump_diffusion
 
 
 # Just messin' around use at your peril
@@ -20,6 +20,15 @@ def tanh_scale(x, alpha=2.0):
     return 2*alpha ** (x / alpha)
 
 
+def _fewvar_step(ewa, ewv, weight_sum, fading_factor, x):
+    """ FEWVar.update on plain floats, returning the new (ewa, ewv, weight_sum). """
+    if ewa is None:
+        return x, 0, 1
+    weight = (1 - fading_factor) * weight_sum
+    new_ewa = (weight * ewa + x) / (weight + 1)
+    return new_ewa, (weight * ewv + (x - ewa) * (x - new_ewa)) / (weight + 1), weight + 1
+
+
 class TanhMean:
     """
     Sublinear FEWMean estimator with reaction to running mean of outlier indicator.
@@ -83,6 +92,66 @@ class TanhMean:
         self._mean.update(x_synthetic)
         self._var.update(x_synthetic-x_mean)
 
+    def update_many(self, xs, chunk_size=65536):
+        """
+        Equivalent to calling `update` on each element of `xs`.
+
+        The outlier reaction makes the recursion nonlinear, so this is still a sequential loop,
+        but one over plain floats with the three inner estimators held in local variables rather
+        than per-element method calls. `xs` is converted to Python floats `chunk_size` at a time.
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            The mean and the variance after each update.
+        """
+        xs = np.asarray(xs, dtype=float)
+        means, variances = np.empty(len(xs)), np.empty(len(xs))
+
+        mean, var, outlier = self._mean, self._var, self._outlier_ewa
+        m_ewa, m_ewv, m_ws, m_f = mean.ewa, mean.ewv, mean.weight_sum, mean.fading_factor
+        v_ewa, v_ewv, v_ws, v_f = var.ewa, var.ewv, var.weight_sum, var.fading_factor
+        o_ewa, o_ws, o_f = outlier.ewa, outlier.weight_sum, outlier.fading_factor
+        alpha = self.alpha
+
+        for start in range(0, len(xs), chunk_size):
+            chunk_means, chunk_variances = [], []
+            for x in xs[start:start + chunk_size].tolist():
+                x_mean = m_ewa if m_ewa is not None else 0
+                x_var = v_ewv if v_ewv is not None else 0
+
+                if x_var == 0:
+                    x_synthetic = x
+                else:
+                    z_score = (x - x_mean) / math.sqrt(x_var)
+                    sign = 1.0 if z_score > 0 else (-1.0 if z_score < 0 else 0.0)
+                    outlier_ternary_indicator = int(abs(z_score) > 0.5) * sign
+                    weight = (1 - o_f) * o_ws
+                    o_ewa = (weight * o_ewa + outlier_ternary_indicator) / (weight + 1)
+                    o_ws = weight + 1
+                    signed_outlier_mean = o_ewa * sign
+                    scale = tanh_scale(signed_outlier_mean, alpha=alpha)
+                    z_ratio = math.tanh(abs(z_score) / scale) / math.tanh(1 / scale)
+                    x_synthetic = x_mean + z_ratio * (x - x_mean)
+
+                    # Catch up
+                    for threshold in (0.25, 0.4, 0.6):
+                        if signed_outlier_mean > threshold:
+                            m_ewa, m_ewv, m_ws = _fewvar_step(m_ewa, m_ewv, m_ws, m_f, x_synthetic)
+
+                m_ewa, m_ewv, m_ws = _fewvar_step(m_ewa, m_ewv, m_ws, m_f, x_synthetic)
+                v_ewa, v_ewv, v_ws = _fewvar_step(v_ewa, v_ewv, v_ws, v_f, x_synthetic - x_mean)
+                chunk_means.append(m_ewa)
+                chunk_variances.append(v_ewv)
+            means[start:start + len(chunk_means)] = chunk_means
+            variances[start:start + len(chunk_variances)] = chunk_variances
+
+        mean.ewa, mean.ewv, mean.weight_sum = m_ewa, m_ewv, m_ws
+        var.ewa, var.ewv, var.weight_sum = v_ewa, v_ewv, v_ws
+        outlier.ewa, outlier.weight_sum = o_ewa, o_ws
+        self.n += len(xs)
+        return means, variances
+
     def apply_series(self, series, burn_in=100):
         """
         Apply the estimator to a given series and return a performance metric.
@@ -92,28 +161,22 @@ class TanhMean:
         You should adjust it to suit your actual evaluation criterion.
         """
         # Reset internal state
-        self.__init__(
-            mean_fading_factor=self.mean_fading_factor,
-            outlier_fading_factor=self.outlier_fading_factor,
-            alpha=self.alpha
-        )
-
-        residuals = []
-        for i, x in enumerate(series):
-            self.update(x)
-            if i >= burn_in:
-                residual = self.get_mean() - x
-                residuals.append(residual)
+        self.__init__(**self.get_params())
+
+        series = np.asarray(series, dtype=float)
+        means, _ = self.update_many(series)
+        residuals = means[burn_in:] - series[burn_in:]
 
         # Example metric: sum of squared residuals
-        return sum(r ** 2 for r in residuals) if residuals else float('inf')
+        return float(np.sum(residuals ** 2)) if len(residuals) else float('inf')
 
     def get_params(self):
         """
         Return current parameters of the estimator.
         """
         return {
-            "fading_factor": self.mean_fading_factor,
+            "mean_fading_factor": self.mean_fading_factor,
+            "var_fading_factor": self.var_fading_factor,
             "outlier_fading_factor": self.outlier_fading_factor,
             "alpha": self.alpha
         }
@@ -124,10 +187,15 @@ class TanhMean:
                           jump_size=1.0,
                           param_grids=None,
                           epsilon=0.3,
-                          vega=1.0):
+                          vega=1.0,
+                          halving_rounds=0,
+                          max_workers=None):
         """
         Fit parameters by simulating data and optimizing a performance metric.
 
+        The grid search itself is `tune_tanhmean`, which spreads combinations over worker
+        processes; its ranked results table is kept as `self.tuning_results`.
+
         Parameters
         ----------
         n_sim : int
@@ -142,66 +210,32 @@ class TanhMean:
             Noise scale for the measurement noise.
         vega : float
             Noise scale for exponential measurement error.
+        halving_rounds : int
+            Rounds of successive halving, 0 to score every combination on the full series.
+        max_workers : int or None
+            Number of worker processes, 1 to run in this process.
 
         Returns
         -------
         best_params : dict
             Dictionary of parameters that yield the best metric.
         """
-
-        if param_grids is None:
-            param_grids = {
-                "alpha": [0.1, 0.2, 0.3],
-                "outlier_fading_factor": [0.1, 0.2, 0.3, 0.4, 0.5],
-                "mean_fading_factor": [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5],
-                "var_fading_factor": [0.01, 0.02, 0.05, 0.1, 0.2, 0.5]
-            }
+        from birdgame.stats.tanhmeantuning import tune_tanhmean
 
         # Simulate the series
         series = jump_diffusion(n_sim, jump_rate=jump_rate, jump_size=jump_size, epsilon=epsilon, vega=vega)
 
-        best_metric = float('inf')
-        best_params = self.get_params()
-
-        from itertools import product
-        keys = list(param_grids.keys())
-        value_combinations = product(*param_grids.values())
-
-        for values in value_combinations:
-            trial_params = {k: v for k, v in zip(keys, values)}
-
-            # Temporarily set these parameters
-            self.alpha = trial_params["alpha"]
-            self.outlier_fading_factor = trial_params["outlier_fading_factor"]
-            self.mean_fading_factor = trial_params["mean_fading_factor"]
-            self.var_fading_factor = trial_params["var_fading_factor"]
-
-            # Re-initialize internal state as needed
-            self.__init__(
-                mean_fading_factor=self.mean_fading_factor,
-                outlier_fading_factor=self.outlier_fading_factor,
-                alpha=self.alpha
-            )
-
-            metric = self.apply_series(series)
-
-            if metric < best_metric:
-                best_metric = metric
-                best_params = {
-                    "mean_fading_factor": self.mean_fading_factor,
-                    "var_fading_factor": self.var_fading_factor,
-                    "outlier_fading_factor": self.outlier_fading_factor,
-                    "alpha": self.alpha
-                }
+        results = tune_tanhmean(series, param_grids=param_grids, base_params=self.get_params(),
+                                halving_rounds=halving_rounds, max_workers=max_workers)
+        best_params = {k: float(results.loc[0, k]) for k in self.get_params()}
 
         # Restore best found params
         self.__init__(**best_params)
+        self.tuning_results = results
 
         return best_params
 
 
-
-
 if __name__ == '__main__':
     from pprint import pprint
     tm = TanhMean(mean_fading_factor=0.05)
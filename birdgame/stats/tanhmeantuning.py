@@ -0,0 +1,144 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from birdgame.stats.tanhmean import TanhMean
+
+DEFAULT_PARAM_GRIDS = {
+    "alpha": [0.1, 0.2, 0.3],
+    "outlier_fading_factor": [0.1, 0.2, 0.3, 0.4, 0.5],
+    "mean_fading_factor": [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5],
+    "var_fading_factor": [0.01, 0.02, 0.05, 0.1, 0.2, 0.5]
+}
+
+# Set in each worker process by _attach_series
+_series = None
+_series_shm = None
+
+
+def _attach_series(name, length):
+    """ Pool initializer: map the shared series into this worker without copying it. """
+    global _series, _series_shm
+    # Pool workers share the parent's resource tracker, which unlinks the block if the parent dies
+    _series_shm = shared_memory.SharedMemory(name=name)
+    _series = np.ndarray((length,), dtype=float, buffer=_series_shm.buf)
+
+
+def _evaluate(params, length, burn_in, series=None):
+    """ Metric of one parameter combination on the first `length` points, and the time it took. """
+    series = _series if series is None else series
+    start = time.perf_counter()
+    metric = TanhMean(**params).apply_series(series[:length], burn_in=burn_in)
+    return metric, time.perf_counter() - start
+
+
+def _evaluate_chunk(tasks):
+    return [_evaluate(params, length, burn_in) for params, length, burn_in in tasks]
+
+
+def rung_lengths(n, halving_rounds=0, eta=3, burn_in=100):
+    """
+    Series lengths used by successive halving: the full series for the last rung, and `eta` times
+    shorter for each earlier one (but always leaving some points after the burn-in).
+    """
+    return [max(n // eta ** (halving_rounds - rung), min(n, 2 * burn_in)) for rung in range(halving_rounds + 1)]
+
+
+def tune_tanhmean(series, param_grids=None, base_params=None, burn_in=100, halving_rounds=0, eta=3,
+                  max_workers=None, chunksize=None):
+    """
+    Grid search over TanhMean parameters, scored by `TanhMean.apply_series`.
+
+    Combinations are spread over a ProcessPoolExecutor. The series is copied once into shared
+    memory, and workers read it from there instead of receiving a pickled copy per task.
+
+    With `halving_rounds` > 0 the search uses successive halving. All combinations are first
+    scored on a prefix that is eta**halving_rounds times shorter than the series. Only the best
+    1/eta of them go on to the next, eta times longer prefix, and the last rung uses the full
+    series.
+
+    Parameters
+    ----------
+    series : array-like
+        Series to fit to.
+    param_grids : dict or None
+        Lists of values to try for each parameter, see DEFAULT_PARAM_GRIDS.
+    base_params : dict or None
+        Values for TanhMean parameters missing from `param_grids`.
+    burn_in : int
+        Number of initial points excluded from the metric.
+    halving_rounds : int
+        Number of pruning rounds, 0 for an exhaustive search.
+    eta : int
+        Pruning factor per round.
+    max_workers : int or None
+        Worker processes (default os.cpu_count()). With 1 everything runs in this process.
+    chunksize : int or None
+        Combinations sent to a worker at a time (default spreads each rung evenly).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per combination, best first: the parameters, `metric` at the last rung it reached,
+        `rung`, `length` (points scored at that rung) and `seconds` (evaluation time, all rungs).
+    """
+    series = np.ascontiguousarray(series, dtype=float)
+    param_grids = param_grids or DEFAULT_PARAM_GRIDS
+    keys = list(param_grids)
+    combinations = [{**(base_params or {}), **dict(zip(keys, values))} for values in product(*param_grids.values())]
+    max_workers = max_workers or os.cpu_count() or 1
+    lengths = rung_lengths(len(series), halving_rounds=halving_rounds, eta=eta, burn_in=burn_in)
+
+    records = [dict(params, metric=float('inf'), rung=0, length=0, seconds=0.0) for params in combinations]
+    survivors = list(range(len(combinations)))
+
+    shm, executor = None, None
+    try:
+        if max_workers > 1:
+            shm = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+            np.ndarray(series.shape, dtype=float, buffer=shm.buf)[:] = series
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_series,
+                                           initargs=(shm.name, len(series)))
+
+        for rung, length in enumerate(lengths):
+            if executor is None:
+                outcomes = [_evaluate(combinations[i], length, burn_in, series=series) for i in survivors]
+            else:
+                tasks = [(combinations[i], length, burn_in) for i in survivors]
+                size = chunksize or max(1, math.ceil(len(tasks) / (4 * max_workers)))
+                chunks = [tasks[k:k + size] for k in range(0, len(tasks), size)]
+                outcomes = [outcome for chunk in executor.map(_evaluate_chunk, chunks) for outcome in chunk]
+
+            for i, (metric, seconds) in zip(survivors, outcomes):
+                records[i].update(metric=metric, rung=rung, length=length, seconds=records[i]['seconds'] + seconds)
+
+            if rung < len(lengths) - 1:
+                # Stable sort, so ties keep grid order as in the sequential search
+                survivors = sorted(survivors, key=lambda i: records[i]['metric'])
+                survivors = sorted(survivors[:max(1, math.ceil(len(survivors) / eta))])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame.from_records(records)
+    results['grid_index'] = range(len(results))
+    results = results.sort_values(['rung', 'metric', 'grid_index'], ascending=[False, True, True], kind='stable')
+    return results.drop(columns='grid_index').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    from birdgame.stats.jumpdiffusion import jump_diffusion
+    series = jump_diffusion(10000, jump_rate=0.01, jump_size=20, epsilon=0.3, vega=2.0)
+    start = time.perf_counter()
+    results = tune_tanhmean(series, halving_rounds=2)
+    print(results.head(10))
+    print(f"{len(results)} combinations in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,207 @@
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from birdgame import GAME_PARAMS
+from birdgame.datasources.feedrecorder import RECORD_DTYPE, payload_to_record, records_to_payloads
+from birdgame.trackers.latency_monitor import DEFAULT_BUDGET
+from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+from birdgame.wealth.wealth_mechanism import update_wealth
+
+
+def tracker_names(trackers):
+    """ Names for a list of trackers: class names, numbered when a class appears more than once. """
+    totals = Counter(type(tracker).__name__ for tracker in trackers)
+    seen = Counter()
+    names = []
+    for tracker in trackers:
+        name = type(tracker).__name__
+        seen[name] += 1
+        names.append(f'{name}_{seen[name]}' if totals[name] > 1 else name)
+    return names
+
+
+def _play(evaluators, payload):
+    """ Tick every tracker on one payload (timed by its evaluator) and return the likelihoods. """
+    likelihoods = {}
+    for name, evaluator in evaluators.items():
+        evaluator.tick_and_predict(payload, {})
+        likelihoods[name] = evaluator.last_score
+    return likelihoods
+
+
+def _play_shard(shm_name, n_rows, evaluators):
+    """ Process pool task: play one shard of trackers over the shared records. """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    records = np.ndarray((n_rows,), dtype=RECORD_DTYPE, buffer=shm.buf)
+    likelihoods = np.full((n_rows, len(evaluators)), np.nan)
+    try:
+        for i, payload in enumerate(records_to_payloads(records)):
+            for j, likelihood in enumerate(_play(evaluators, payload).values()):
+                if likelihood is not None:
+                    likelihoods[i, j] = likelihood
+    finally:
+        del records
+        shm.close()
+    return evaluators, likelihoods
+
+
+class Arena:
+    """
+    Plays many trackers against each other on one pass over the data, as the game would.
+
+    On each payload every tracker is ticked and asked for a prediction, which is scored by its own
+    `TrackerEvaluator` once the horizon has passed. The likelihoods of all trackers then go through
+    `update_wealth` together, so wealth is won and lost between them as in the real game.
+    `leaderboard()` reports, per tracker, the mean log-likelihood, final wealth and the latency
+    percentiles of `tick` and `predict` (from the evaluator's LatencyMonitor), and
+    `wealth_trajectory()` the wealth over time.
+
+        arena = Arena([EMWAVarTracker(), QuantileRegressionRiverTracker()])
+        arena.run(data=remote_test_data_generator(max_rows=10_000))
+        print(arena.leaderboard())
+
+    Parameters
+    ----------
+    trackers : list of TrackerBase or dict
+        The players, or a dict mapping player names to trackers.
+    params : dict
+        Game parameters passed to `update_wealth`, see `GAME_PARAMS`.
+    initial_wealth : float, optional
+        Starting wealth of every player. Defaults to params["initial_wealth"].
+    warmup : int
+        Number of ticks during which the EWMA statistics are updated but no wealth changes hands.
+    record_every : int
+        Ticks between snapshots of the wealth trajectory.
+    score_window_size : int
+        Window of `TrackerEvaluator.recent_likelihood_score`.
+    latency_budget : float
+        Seconds allowed for tick plus predict, see `TrackerEvaluator`.
+    fallback_to_last_prediction : bool
+        Score the last on-time prediction of a tracker that overruns the budget, see `TrackerEvaluator`.
+    """
+
+    def __init__(self, trackers, params=GAME_PARAMS, initial_wealth=None, warmup=0, record_every=100,
+                 score_window_size=100, latency_budget=DEFAULT_BUDGET, fallback_to_last_prediction=False):
+        if not isinstance(trackers, dict):
+            trackers = dict(zip(tracker_names(trackers), trackers))
+        if not trackers:
+            raise ValueError("An arena needs at least one tracker")
+        self.params = params
+        self.warmup = warmup
+        self.record_every = record_every
+        self.names = list(trackers)
+        self.evaluators = {name: TrackerEvaluator(tracker, score_window_size=score_window_size,
+                                                  latency_budget=latency_budget,
+                                                  fallback_to_last_prediction=fallback_to_last_prediction)
+                           for name, tracker in trackers.items()}
+        initial_wealth = params["initial_wealth"] if initial_wealth is None else initial_wealth
+        self.players = {name: {"wealth": float(initial_wealth)} for name in self.names}
+        self.wealth_times = []
+        self.wealth_history = []
+        self.count = 0
+
+    @property
+    def trackers(self):
+        return {name: evaluator.tracker for name, evaluator in self.evaluators.items()}
+
+    def _settle(self, current_time, likelihoods):
+        """ Redistribute wealth for one tick and record the trajectory. """
+        update_wealth(self.players, likelihoods, params=self.params, wealth_update=self.count >= self.warmup)
+        self.count += 1
+        if self.count % self.record_every == 0:
+            self.wealth_times.append(current_time)
+            self.wealth_history.append([self.players[name]["wealth"] for name in self.names])
+
+    def run(self, data=None, live=True, max_rows=None, max_workers=None, step_print=None):
+        """
+        Play every tracker on each payload of `data` (by default the live or remote test feed, see
+        `TrackerBase.test_run`). Can be called again to continue on more data.
+
+        With `max_workers` > 1 the trackers are split into that many shards, each played in a
+        process pool worker. The data is then read to the end first and copied once into shared
+        memory as feed records, so it must be finite, and payloads carry only the feed columns,
+        with times as floats. The trained trackers are brought back from the workers and wealth is
+        settled tick by tick afterwards, exactly as it would have been in a single process.
+
+        Returns the leaderboard.
+        """
+        gen = TrackerBase._test_data(live=live, max_rows=max_rows, data=data)
+        if max_workers is not None and max_workers > 1 and len(self.names) > 1:
+            self._run_sharded(gen, max_workers)
+            return self.leaderboard()
+
+        try:
+            for payload in gen:
+                likelihoods = _play(self.evaluators, payload)
+                self._settle(payload['time'], likelihoods)
+                if step_print and self.count % step_print == 0:
+                    print(self.leaderboard())
+        except KeyboardInterrupt:
+            print("Interrupted")
+        return self.leaderboard()
+
+    def _run_sharded(self, gen, max_workers):
+        records = np.array([payload_to_record(payload) for payload in gen], dtype=RECORD_DTYPE)
+        n_rows = len(records)
+        if not n_rows:
+            return
+        shards = [self.names[i::max_workers] for i in range(min(max_workers, len(self.names)))]
+
+        shm = shared_memory.SharedMemory(create=True, size=records.nbytes)
+        try:
+            np.ndarray(records.shape, dtype=RECORD_DTYPE, buffer=shm.buf)[:] = records
+            with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                futures = [pool.submit(_play_shard, shm.name, n_rows, {name: self.evaluators[name] for name in shard})
+                           for shard in shards]
+                results = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        columns = {}
+        for shard, (evaluators, likelihoods) in zip(shards, results):
+            self.evaluators.update(evaluators)
+            for j, name in enumerate(shard):
+                columns[name] = likelihoods[:, j]
+
+        likelihoods = np.column_stack([columns[name] for name in self.names])
+        for current_time, row in zip(records['time'].tolist(), likelihoods.tolist()):
+            self._settle(current_time, {name: None if math.isnan(x) else x for name, x in zip(self.names, row)})
+
+    def leaderboard(self, percentiles=(50, 90, 99)):
+        """
+        One row per tracker, richest first: number of scored predictions, mean log-likelihood
+        (overall and over the recent window), wealth, ticks over the latency budget, and tick/predict
+        latency percentiles and maxima in milliseconds.
+        """
+        rows = []
+        for name in self.names:
+            evaluator = self.evaluators[name]
+            row = {'name': name, 'scores': evaluator.score_count,
+                   'log_likelihood': evaluator.overall_likelihood_score() if evaluator.score_count else np.nan,
+                   'recent_log_likelihood': evaluator.recent_likelihood_score() if evaluator.score_count else np.nan,
+                   'wealth': self.players[name]['wealth'], 'violations': evaluator.latency.violations}
+            for kind in ('tick', 'predict'):
+                row.update(getattr(evaluator.latency, kind).summary(percentiles, prefix=f'{kind}_'))
+            rows.append(row)
+        return pd.DataFrame(rows).sort_values('wealth', ascending=False, kind='stable').set_index('name')
+
+    def wealth_trajectory(self):
+        """ Wealth of every tracker every `record_every` ticks, indexed by time. """
+        return pd.DataFrame(self.wealth_history, index=pd.Index(self.wealth_times, name='time'), columns=self.names)
+
+
+if __name__ == '__main__':
+    from birdgame.datasources.simulateddata import simulated_data_generator
+    from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+
+    arena = Arena({'fast': EMWAVarTracker(fading_factor=0.01), 'default': EMWAVarTracker(),
+                   'slow': EMWAVarTracker(fading_factor=0.00001)})
+    print(arena.run(data=simulated_data_generator(20_000, seed=0)))
+    print(arena.wealth_trajectory().tail())
@@ -0,0 +1,108 @@
+import math
+import numpy as np
+
+
+def core_tail_batch(tracker, times, dove_locations, predict=False):
+    """
+    Vectorized `tick` (and optionally `predict`) for the two-Gaussian core/tail trackers
+    (EMWAVarTracker, MixtureTracker).
+
+    Those trackers feed the horizon-lagged change `x - prev_x` into two FEWVar estimators:
+    `ewa_dx_core`, winsorized at twice the current core std, and `ewa_dx_tail` with double the
+    change. Here the lagged values come from one `searchsorted` (`add_and_pop_batch`), and the
+    two EW recursions run in a single loop over plain floats instead of per-tick method calls.
+    The winsorization threshold depends on the previous core variance, so that loop is inherently
+    sequential.
+
+    Returns the per-tick predictions as arrays (see `TrackerBase.predict_batch`) if `predict`.
+    """
+    times = np.asarray(times, dtype=float)
+    dove_locations = np.asarray(dove_locations, dtype=float)
+    n = len(times)
+
+    prev_x, released = tracker.add_and_pop_batch(times, dove_locations)
+    x_changes = (dove_locations[released] - prev_x[released]).tolist()
+
+    core, tail = tracker.ewa_dx_core, tracker.ewa_dx_tail
+    core_f, tail_f = core.fading_factor, tail.fading_factor
+    core_ewa, core_ewv, core_ws = core.ewa, core.ewv, core.weight_sum
+    tail_ewa, tail_ewv, tail_ws = tail.ewa, tail.ewv, tail.weight_sum
+    count = tracker.count
+
+    core_vars, tail_vars = [], []
+    for x_change in x_changes:
+        # Winsorize the update for the core estimator to avoid tail effects
+        threshold = 2.0 * math.sqrt((core_ewv or 0) if count > 0 else 1.0)
+        x = min(max(x_change, -threshold), threshold) if threshold > 0 else x_change
+        if core_ewa is None:
+            core_ewa, core_ewv, core_ws = x, 0, 1
+        else:
+            weight = (1 - core_f) * core_ws
+            previous_ewa = core_ewa
+            core_ewa = (weight * core_ewa + x) / (weight + 1)
+            core_ws = weight + 1
+            core_ewv = (weight * core_ewv + (x - previous_ewa) * (x - core_ewa)) / (weight + 1)
+
+        # Feed the tail estimator with double the real change magnitude
+        x = 2.0 * x_change
+        if tail_ewa is None:
+            tail_ewa, tail_ewv, tail_ws = x, 0, 1
+        else:
+            weight = (1 - tail_f) * tail_ws
+            previous_ewa = tail_ewa
+            tail_ewa = (weight * tail_ewa + x) / (weight + 1)
+            tail_ws = weight + 1
+            tail_ewv = (weight * tail_ewv + (x - previous_ewa) * (x - tail_ewa)) / (weight + 1)
+
+        count += 1
+        if predict:
+            core_vars.append(core_ewv)
+            tail_vars.append(tail_ewv)
+
+    initial_vars = (core.get(), tail.get())
+    core.ewa, core.ewv, core.weight_sum = core_ewa, core_ewv, core_ws
+    tail.ewa, tail.ewv, tail.weight_sum = tail_ewa, tail_ewv, tail_ws
+    tracker.count = count
+    if n:
+        tracker.current_x = float(dove_locations[-1])
+
+    if not predict:
+        return None
+
+    # Variance in force after each tick: that of the latest released change, if any
+    latest = np.cumsum(released) - 1
+    scales = []
+    for initial_var, variances in zip(initial_vars, [core_vars, tail_vars]):
+        var = np.where(latest >= 0, np.asarray(variances, dtype=float)[np.maximum(latest, 0)]
+                       if variances else initial_var, initial_var)
+        std = np.sqrt(np.where(var >= 0, var, 1.0))
+        scales.append(np.maximum(std, 1e-6))
+
+    weights = np.asarray(tracker.weights, dtype=float)
+    return {
+        "weight": np.tile(weights / weights.sum(), (n, 1)),
+        "loc": np.repeat(dove_locations[:, None], 2, axis=1),
+        "scale": np.column_stack(scales),
+    }
+
+
+class CoreTailBatchMixin:
+    """
+    `tick_batch` and `predict_batch` of the core/tail trackers, via `core_tail_batch`. List it before
+    TrackerBase among the bases of a tracker with `ewa_dx_core`, `ewa_dx_tail`, `weights` and `current_x`.
+    """
+
+    def tick_batch(self, times, dove_locations, falcon_locations=None, falcon_ids=None, falcon_wingspans=None,
+                   performance_metrics=None):
+        """
+        Vectorized equivalent of calling `tick` on each row (see `core_tail_batch`).
+        """
+        core_tail_batch(self, times, dove_locations)
+
+    def predict_batch(self, times, dove_locations, falcon_locations=None, falcon_ids=None, falcon_wingspans=None,
+                      performance_metrics=None):
+        """
+        Vectorized equivalent of calling `tick_and_predict` on each row, returning the per-tick
+        mixture parameters as arrays (see `core_tail_batch`).
+        """
+        return core_tail_batch(self, times, dove_locations, predict=True)
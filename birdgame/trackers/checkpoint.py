@@ -0,0 +1,241 @@
+import base64
+import importlib
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import orjson
+
+bird_logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+def class_path(obj_or_cls):
+    cls = obj_or_cls if isinstance(obj_or_cls, type) else type(obj_or_cls)
+    return f'{cls.__module__}:{cls.__qualname__}'
+
+
+def _import_class(path):
+    module, qualname = path.split(':')
+    cls = importlib.import_module(module)
+    for name in qualname.split('.'):
+        cls = getattr(cls, name)
+    return cls
+
+
+def _is_stateful(value):
+    """ Objects saved by their to_dict/from_dict (birdgame.stats estimators, RingBuffer, ...). """
+    return callable(getattr(value, 'to_dict', None)) and callable(getattr(type(value), 'from_dict', None))
+
+
+def encode_state(value):
+    """
+    Convert a value to plain JSON types, tagging what JSON cannot express, or raise TypeError.
+
+    NumPy arrays keep their dtype and exact bytes (base64). Tuples, deques (with their maxlen),
+    dicts with non-string keys and non-finite floats are tagged. Trackers are encoded with
+    `checkpoint_state`, objects with to_dict/from_dict by their dict, and other birdgame objects by
+    their attributes. Anything else (threads, locks, third party models) raises TypeError.
+    """
+    if value is None or isinstance(value, (bool, str, int)):
+        return value
+    if isinstance(value, float):
+        return float(value) if math.isfinite(value) else {'__float__': repr(float(value))}  # float() for np.float64
+    if isinstance(value, np.generic):
+        return encode_state(value.item())
+    if isinstance(value, list):
+        return [encode_state(v) for v in value]
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode_state(v) for v in value]}
+    if isinstance(value, deque):
+        return {'__deque__': [encode_state(v) for v in value], 'maxlen': value.maxlen}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) and not k.startswith('__') for k in value):
+            return {k: encode_state(v) for k, v in value.items()}
+        return {'__items__': [[encode_state(k), encode_state(v)] for k, v in value.items()]}
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("Object arrays cannot be checkpointed")
+        return {'__ndarray__': base64.b64encode(np.ascontiguousarray(value).tobytes()).decode('ascii'),
+                'dtype': value.dtype.str, 'shape': list(value.shape)}
+    if callable(getattr(value, 'checkpoint_state', None)):
+        return {'__tracker__': class_path(value), 'state': value.checkpoint_state()}
+    if _is_stateful(value):
+        return {'__object__': class_path(value), 'state': encode_state(value.to_dict())}
+    if type(value).__module__.startswith('birdgame.') and hasattr(value, '__dict__'):
+        return {'__object__': class_path(value), 'attributes': {k: encode_state(v) for k, v in vars(value).items()}}
+    raise TypeError(f"Cannot checkpoint a {type(value).__name__}")
+
+
+def encode_pickled(value):
+    """ Tag a value (e.g. a fitted third party model) to be saved with pickle, base64 encoded. """
+    return {'__pickle__': base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode('ascii')}
+
+
+def decode_state(value, current=None):
+    """
+    Inverse of `encode_state`. A tracker (or birdgame object) is restored into `current`, the
+    object already held in its place, when that has the same class, so that its threads, locks
+    and anything else not checkpointed are kept.
+    """
+    if isinstance(value, list):
+        return [decode_state(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '__float__' in value:
+        return float(value['__float__'])
+    if '__pickle__' in value:
+        return pickle.loads(base64.b64decode(value['__pickle__']))
+    if '__tuple__' in value:
+        return tuple(decode_state(v) for v in value['__tuple__'])
+    if '__deque__' in value:
+        return deque((decode_state(v) for v in value['__deque__']), maxlen=value['maxlen'])
+    if '__items__' in value:
+        return {decode_state(k): decode_state(v) for k, v in value['__items__']}
+    if '__ndarray__' in value:
+        data = base64.b64decode(value['__ndarray__'])
+        return np.frombuffer(data, dtype=np.dtype(value['dtype'])).reshape(value['shape']).copy()
+    if '__tracker__' in value:
+        cls = _import_class(value['__tracker__'])
+        tracker = current if type(current) is cls else cls.__new__(cls)
+        tracker.restore_state(value['state'])
+        return tracker
+    if '__object__' in value:
+        cls = _import_class(value['__object__'])
+        if 'state' in value:
+            return cls.from_dict(decode_state(value['state']))
+        instance = current if type(current) is cls else cls.__new__(cls)
+        for name, attribute in value['attributes'].items():
+            setattr(instance, name, decode_state(attribute, getattr(instance, name, None)))
+        return instance
+    return {k: decode_state(v) for k, v in value.items()}
+
+
+def dumps(tracker):
+    """ Checkpoint of a tracker as compact bytes (orjson). """
+    return orjson.dumps({'version': CHECKPOINT_VERSION, 'class': class_path(tracker),
+                         'state': tracker.checkpoint_state()})
+
+
+def loads(tracker, data):
+    """ Restore a checkpoint made by `dumps` into `tracker`, which must be of the same class. Returns it. """
+    checkpoint = orjson.loads(data)
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {checkpoint.get('version')}")
+    if checkpoint['class'] != class_path(tracker):
+        raise ValueError(f"Checkpoint of a {checkpoint['class']} cannot be restored into a {class_path(tracker)}")
+    tracker.restore_state(checkpoint['state'])
+    return tracker
+
+
+def write_atomically(path, data):
+    """ Write bytes to path via a temporary file, so readers only ever see a complete checkpoint. """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a tracker, written in the background.
+
+    `poll()` is called after every tick_and_predict (by TrackerBase and TrackerEvaluator once
+    `tracker.checkpoint_every` is used). Once `interval` seconds have passed it captures the
+    tracker's state on the calling thread, between ticks, so the snapshot is consistent. Encoding
+    to bytes and the atomic file write happen on a daemon thread. If the writer is still busy the
+    newer snapshot replaces the waiting one.
+
+    Parameters
+    ----------
+    tracker : TrackerBase
+    path : str
+        File to (over)write.
+    interval : float
+        Seconds between snapshots.
+    """
+
+    def __init__(self, tracker, path, interval=60.0):
+        self.tracker = tracker
+        self.path = path
+        self.interval = interval
+        self.next_due = time.perf_counter() + interval
+        self.snapshots = 0
+        self.written = 0
+        self.errors = 0
+        self.coalesced = 0  # Snapshots replaced by a newer one before the writer got to them
+        self._done = 0  # Number of the latest snapshot the writer has finished with
+        self.capture_ms = None  # Time taken from the tick thread by the last capture
+        self.write_ms = None
+        self.bytes = None
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._write_loop, name='checkpointer', daemon=True)
+        self._thread.start()
+
+    def poll(self):
+        """ Snapshot if `interval` seconds have passed since the last one. """
+        if time.perf_counter() >= self.next_due:
+            self.snapshot()
+
+    def snapshot(self):
+        """ Capture the tracker's state now and queue it for writing. """
+        start = time.perf_counter()
+        state = {'version': CHECKPOINT_VERSION, 'class': class_path(self.tracker),
+                 'state': self.tracker.checkpoint_state()}
+        self.capture_ms = 1e3 * (time.perf_counter() - start)
+        self.next_due = time.perf_counter() + self.interval
+        self.snapshots += 1
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (self.snapshots, state)
+            self._condition.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    return
+            number, state = pending
+            start = time.perf_counter()
+            try:
+                data = orjson.dumps(state)
+                write_atomically(self.path, data)
+                self.bytes = len(data)
+                self.written += 1
+            except Exception:
+                self.errors += 1
+                bird_logger.exception(f"Checkpoint to {self.path} failed")
+            self.write_ms = 1e3 * (time.perf_counter() - start)
+            with self._condition:
+                self._done = number
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """ Block until the latest snapshot has been written. """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._done >= self.snapshots, timeout=timeout)
+
+    def metrics(self):
+        return {'snapshots': self.snapshots, 'written': self.written, 'coalesced': self.coalesced, 'errors': self.errors,
+                'capture_ms': self.capture_ms, 'write_ms': self.write_ms, 'bytes': self.bytes}
+
+    def close(self, final_snapshot=True, timeout=None):
+        """ Take a last snapshot (by default), write it and stop the writer thread. """
+        if final_snapshot:
+            self.snapshot()
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
@@ -0,0 +1,250 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+
+from birdgame.trackers.latency_monitor import DEFAULT_BUDGET
+from birdgame.trackers.trackerbase import TrackerBase
+
+bird_logger = logging.getLogger(__name__)
+
+
+def _catch_up(tracker, jobs):
+    """
+    Tick the tracker on every pending (seq, payload, performance_metrics) and predict once, after
+    the latest. Returns (seq, prediction, failed), where a failure is logged and predicts None.
+    """
+    seq = jobs[-1][0]
+    try:
+        for _, payload, performance_metrics in jobs:
+            tracker.tick(payload, performance_metrics)
+        return seq, tracker.predict(), False
+    except Exception:
+        bird_logger.exception(f"{type(tracker).__name__} failed at tick {seq}")
+        return seq, None, True
+
+
+class ThreadWorker:
+    """ Runs a tracker on a daemon thread. Fine unless the tracker holds the GIL for long stretches. """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.jobs = deque()
+        self.condition = threading.Condition()
+        self.result = (0, None)
+        self.errors = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._serve, name=f'deadline-{type(tracker).__name__}', daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.jobs or self.closed)
+                if not self.jobs:
+                    return
+                jobs, self.jobs = list(self.jobs), deque()
+            seq, prediction, failed = _catch_up(self.tracker, jobs)
+            with self.condition:
+                self.result = (seq, prediction)
+                self.errors += failed
+                self.condition.notify_all()
+
+    def submit(self, seq, payload, performance_metrics):
+        with self.condition:
+            self.jobs.append((seq, payload, performance_metrics))
+            self.condition.notify_all()
+
+    def wait(self, seq, timeout):
+        """ The latest (seq, prediction), once it is for `seq` or after `timeout` seconds. """
+        with self.condition:
+            self.condition.wait_for(lambda: self.result[0] >= seq, timeout=timeout)
+            return self.result
+
+    def close(self, timeout=None):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+
+def _serve_process(conn, tracker):
+    errors = 0
+    while True:
+        jobs = [conn.recv()]
+        while jobs[-1] is not None and conn.poll():
+            jobs.append(conn.recv())
+        if jobs[-1] is None:
+            jobs.pop()
+            if jobs:
+                _catch_up(tracker, jobs)
+            conn.send(('closed', errors))
+            return
+        seq, prediction, failed = _catch_up(tracker, jobs)
+        errors += failed
+        conn.send((seq, prediction))
+
+
+class ProcessWorker:
+    """
+    Runs a tracker in a child process, so that neither its computation nor a background retrain
+    holding the GIL can stall the caller. Payloads and predictions are pickled over a pipe, and the
+    tracker's state stays in the child.
+    """
+
+    def __init__(self, tracker):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.result = (0, None)
+        self.errors = 0
+        self.process = multiprocessing.Process(target=_serve_process, args=(child_conn, tracker),
+                                               name=f'deadline-{type(tracker).__name__}', daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def submit(self, seq, payload, performance_metrics):
+        self.conn.send((seq, payload, performance_metrics))
+
+    def wait(self, seq, timeout):
+        """ The latest (seq, prediction), once it is for `seq` or after `timeout` seconds. """
+        deadline = time.perf_counter() + timeout
+        while self.result[0] < seq:
+            if not self.conn.poll(max(0.0, deadline - time.perf_counter())):
+                break
+            self.result = self.conn.recv()
+        while self.conn.poll():  # Anything newer that is already there
+            self.result = self.conn.recv()
+        return self.result
+
+    def close(self, timeout=None):
+        try:
+            self.conn.send(None)
+            while self.conn.poll(timeout):
+                message = self.conn.recv()
+                if message[0] == 'closed':
+                    self.errors = message[1]
+                    break
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+        self.process.join(timeout)
+        self.conn.close()
+
+
+WORKERS = {'thread': ThreadWorker, 'process': ProcessWorker}
+
+
+class DeadlineTracker(TrackerBase):
+    """
+    Wraps a slow tracker so that every tick still gets a prediction within `deadline` seconds.
+
+    The wrapped tracker ticks and predicts on a worker (a thread, or a process for trackers that
+    hold the GIL). `tick` hands the payload to the worker, and `predict` waits for the prediction
+    until `deadline` seconds after `tick` was called. If it is late, `predict` returns the most
+    recent prediction the worker did deliver, or, if there is none or it is more than
+    `max_stale_ticks` ticks old, the prediction of a cheap fallback tracker that is ticked on every
+    payload. A worker that falls behind catches up by ticking on all the payloads it missed and
+    predicting only after the latest, so it never sees a gap in the data.
+
+        tracker = DeadlineTracker(NGBoostTracker(), deadline=0.04)
+        tracker.test_run(live=True)
+        print(tracker.metrics())
+
+    Parameters
+    ----------
+    tracker : TrackerBase
+        The tracker to wrap. With worker='process' it is moved to the child process.
+    deadline : float
+        Seconds from `tick` by which `predict` returns.
+    fallback : TrackerBase, optional
+        Fallback tracker. Defaults to a MixtureTracker with the same horizon.
+    max_stale_ticks : int, optional
+        Oldest cached prediction, in ticks, to prefer over the fallback tracker. None for any age.
+    worker : str
+        'thread' or 'process'.
+    """
+
+    # The wrapped tracker is ticked by the worker at any time, so it cannot be snapshotted consistently
+    # from here: checkpoints hold the fallback tracker and the counters, and the wrapped tracker restarts cold
+    CHECKPOINT_EXCLUDE = TrackerBase.CHECKPOINT_EXCLUDE + ('tracker', 'worker', 'due')
+
+    def __init__(self, tracker, deadline=DEFAULT_BUDGET, fallback=None, max_stale_ticks=None, worker='thread'):
+        super().__init__(tracker.horizon)
+        if worker not in WORKERS:
+            raise ValueError(f"Unknown worker '{worker}', expected one of {list(WORKERS)}")
+        if fallback is None:
+            from birdgame.examples.derived.mixturetracker import MixtureTracker
+            fallback = MixtureTracker(horizon=tracker.horizon)
+        self.tracker = tracker
+        self.deadline = deadline
+        self.fallback = fallback
+        self.max_stale_ticks = max_stale_ticks
+        self.worker = WORKERS[worker](tracker)
+
+        self.seq = 0
+        self.due = None
+        self.cached_prediction = None
+        self.cached_seq = 0
+        self.on_time = 0
+        self.cached_fallbacks = 0
+        self.tracker_fallbacks = 0
+
+    def tick(self, payload, performance_metrics):
+        """ Start the clock, hand the payload to the worker and tick the fallback tracker. """
+        self.due = time.perf_counter() + self.deadline
+        self.seq += 1
+        self.count = self.seq
+        self.worker.submit(self.seq, payload, performance_metrics)
+        self.fallback.tick(payload, performance_metrics)
+
+    def predict(self):
+        """ The wrapped tracker's prediction if it arrives in time, otherwise a fallback. """
+        timeout = max(0.0, self.due - time.perf_counter()) if self.due is not None else 0.0
+        seq, prediction = self.worker.wait(self.seq, timeout)
+        if prediction is not None and seq > self.cached_seq:
+            self.cached_prediction, self.cached_seq = prediction, seq
+        if seq >= self.seq and prediction is not None:
+            self.on_time += 1
+            return prediction
+
+        stale = self.max_stale_ticks is not None and self.seq - self.cached_seq > self.max_stale_ticks
+        if self.cached_prediction is not None and not stale:
+            self.cached_fallbacks += 1
+            return self.cached_prediction
+        self.tracker_fallbacks += 1
+        return self.fallback.predict()
+
+    @property
+    def fallbacks(self):
+        return self.cached_fallbacks + self.tracker_fallbacks
+
+    def metrics(self):
+        """ Counts of predictions that were on time, replaced by the cached one or by the fallback tracker. """
+        predictions = self.on_time + self.fallbacks
+        return {'predictions': predictions, 'on_time': self.on_time, 'cached_fallbacks': self.cached_fallbacks,
+                'tracker_fallbacks': self.tracker_fallbacks, 'errors': self.worker.errors,
+                'fallback_rate': self.fallbacks / predictions if predictions else 0.0}
+
+    def close(self, timeout=None):
+        """ Stop the worker once it has ticked on every payload. """
+        self.worker.close(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    from birdgame.datasources.simulateddata import simulated_data_generator
+    from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+
+    class SlowTracker(EMWAVarTracker):
+        def predict(self):
+            if self.count % 50 == 0:
+                time.sleep(0.1)  # An occasional slow predict, like a synchronous refit
+            return super().predict()
+
+    with DeadlineTracker(SlowTracker(), deadline=0.02) as tracker:
+        tracker.test_run(data=simulated_data_generator(2000, seed=0), step_print=1000)
+        print(tracker.metrics())
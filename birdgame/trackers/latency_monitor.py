@@ -0,0 +1,202 @@
+import time
+import numpy as np
+
+DEFAULT_BUDGET = 0.05  # Seconds allowed for each tick and predict in live play
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory histogram of latencies in integer nanoseconds, in the style of HdrHistogram.
+
+    Values below 2**sub_bucket_bits get a bucket each. Above that, every power of two is split into
+    2**(sub_bucket_bits - 1) equal buckets. The relative error of any percentile is therefore at most
+    2**(1 - sub_bucket_bits), 0.8% by default, and the memory is a few thousand counts however many
+    values are recorded. Values above `max_value` are counted in the last bucket, while `min`, `max`
+    and `total` are tracked exactly.
+
+    Parameters
+    ----------
+    sub_bucket_bits : int
+        Precision, see above.
+    max_value : int
+        Largest value, in nanoseconds, with its own bucket (default one minute).
+    """
+
+    def __init__(self, sub_bucket_bits=8, max_value=60 * 10 ** 9):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self._offset = self.sub_bucket_count - self.half_count
+        self.max_value = max_value
+        self.n_buckets = self._index(max_value) + 1
+        self.counts = [0] * self.n_buckets  # A list, as incrementing it is much cheaper than a NumPy array
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self.sub_bucket_count:
+            return max(value, 0)
+        exponent = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (exponent - 1) * self.half_count + (value >> exponent) - self.half_count
+
+    def bucket_bounds(self, index):
+        """ Smallest and largest value counted in a bucket. """
+        if index < self.sub_bucket_count:
+            return index, index
+        exponent, offset = divmod(index - self.sub_bucket_count, self.half_count)
+        exponent += 1
+        mantissa = offset + self.half_count
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value):
+        """ Add one latency in nanoseconds (an int). """
+        if value < self.sub_bucket_count:  # _index, inlined as this runs on every tick
+            index = value if value > 0 else 0
+        else:
+            exponent = value.bit_length() - self.sub_bucket_bits
+            index = self._offset + (exponent - 1) * self.half_count + (value >> exponent)
+            if index >= self.n_buckets:
+                index = self.n_buckets - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.count == 1:
+            self.min = self.max = value
+        elif value > self.max:
+            self.max = value
+        elif value < self.min:
+            self.min = value
+
+    def record_many(self, values):
+        """ Add an array of latencies in nanoseconds. """
+        values = np.maximum(np.asarray(values, dtype=np.int64), 0)
+        if not len(values):
+            return
+        _, bit_lengths = np.frexp(values.astype(float))  # Exact bit lengths below 2**53
+        exponents = np.maximum(bit_lengths - self.sub_bucket_bits, 1)
+        index = np.where(values < self.sub_bucket_count, values,
+                         self.sub_bucket_count + (exponents - 1) * self.half_count
+                         + (values >> exponents) - self.half_count)
+        added = np.bincount(np.minimum(index, self.n_buckets - 1), minlength=self.n_buckets)
+        self.counts = (np.asarray(self.counts) + added).tolist()
+        self.count += len(values)
+        self.total += int(values.sum())
+        self.max = int(values.max()) if self.max is None else max(self.max, int(values.max()))
+        self.min = int(values.min()) if self.min is None else min(self.min, int(values.min()))
+
+    def percentile(self, q):
+        """ Latency in nanoseconds below which `q` percent of the recorded values fall, or NaN if empty. """
+        if not self.count:
+            return float('nan')
+        if q >= 100:
+            return float(self.max)
+        rank = max(1, int(np.ceil(q / 100 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        low, high = self.bucket_bounds(index)
+        return float(min(max((low + high) / 2, self.min), self.max))
+
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def merge(self, other):
+        """ Add the counts of another histogram with the same layout. """
+        if (other.sub_bucket_bits, other.max_value) != (self.sub_bucket_bits, self.max_value):
+            raise ValueError("Can only merge histograms with the same sub_bucket_bits and max_value")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        for bound, pick in (('min', min), ('max', max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+        return self
+
+    def summary(self, percentiles=(50, 99), prefix=''):
+        """ Percentiles and maximum in milliseconds, e.g. {'p50_ms': 0.01, 'p99_ms': 0.2, 'max_ms': 3.1}. """
+        result = {f'{prefix}p{q}_ms': self.percentile(q) / 1e6 for q in percentiles}
+        result[f'{prefix}max_ms'] = self.max / 1e6 if self.count else float('nan')
+        return result
+
+    def to_dict(self):
+        nonzero = [i for i, n in enumerate(self.counts) if n]
+        return {'sub_bucket_bits': self.sub_bucket_bits, 'max_value': self.max_value,
+                'buckets': nonzero, 'counts': [self.counts[i] for i in nonzero],
+                'count': self.count, 'total': self.total, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        instance = cls(sub_bucket_bits=data['sub_bucket_bits'], max_value=data['max_value'])
+        for i, n in zip(data['buckets'], data['counts']):
+            instance.counts[i] = n
+        instance.count = data['count']
+        instance.total = data['total']
+        instance.min = data['min']
+        instance.max = data['max']
+        return instance
+
+
+class LatencyMonitor:
+    """
+    Times `tick` and `predict` of a tracker on every call, into LatencyHistograms, and counts
+    the calls whose tick plus predict took longer than `budget`.
+
+    With `fallback_to_last_prediction`, an overrunning call returns the last prediction that was
+    made within budget instead of the late one, as the game would have had nothing newer in time.
+    Such substitutions are counted in `fallbacks`.
+
+    Parameters
+    ----------
+    budget : float
+        Seconds allowed for tick plus predict.
+    fallback_to_last_prediction : bool
+        Return the last on-time prediction when a call overruns (if there is one).
+    sub_bucket_bits : int
+        Histogram precision, see `LatencyHistogram`.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, fallback_to_last_prediction=False, sub_bucket_bits=8):
+        self.budget = budget
+        self.budget_ns = int(budget * 1e9)
+        self.fallback_to_last_prediction = fallback_to_last_prediction
+        self.tick = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.predict = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.total = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.violations = 0
+        self.fallbacks = 0
+        self.last_good_prediction = None
+
+    def tick_and_predict(self, tracker, payload, performance_metrics):
+        """ `tracker.tick` then `tracker.predict`, timed. Returns the prediction to use. """
+        start = time.perf_counter_ns()
+        tracker.tick(payload, performance_metrics)
+        ticked = time.perf_counter_ns()
+        prediction = tracker.predict()
+        elapsed = time.perf_counter_ns() - start
+        self.tick.record(ticked - start)
+        self.predict.record(elapsed - (ticked - start))
+        self.total.record(elapsed)
+
+        if elapsed > self.budget_ns:
+            self.violations += 1
+            if self.fallback_to_last_prediction and self.last_good_prediction is not None:
+                self.fallbacks += 1
+                return self.last_good_prediction
+        elif prediction is not None:
+            self.last_good_prediction = prediction
+        return prediction
+
+    def summary(self, percentiles=(50, 99)):
+        """ Call count, violations, fallbacks and latency percentiles of tick, predict and their total. """
+        result = {'calls': self.total.count, 'violations': self.violations, 'fallbacks': self.fallbacks}
+        for kind in ('tick', 'predict', 'total'):
+            result.update(getattr(self, kind).summary(percentiles, prefix=f'{kind}_'))
+        return result
+
+    def report(self):
+        if not self.total.count:
+            return
+        s = self.summary()
+        print(f"Latency per tick (ms): p50 {s['total_p50_ms']:.3f}, p99 {s['total_p99_ms']:.3f}, "
+              f"max {s['total_max_ms']:.3f}. Over the {1000 * self.budget:.0f} ms budget: "
+              f"{self.violations} of {self.total.count}")
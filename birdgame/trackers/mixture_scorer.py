@@ -0,0 +1,204 @@
+import math
+import numpy as np
+
+from densitypdf import density_pdf
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+# Fast scoring of the mixture-of-normals predictions emitted by the bundled trackers:
+#
+#   {"type": "mixture",
+#    "components": [{"density": {"type": "builtin", "name": "norm", "params": {"loc": .., "scale": ..}},
+#                    "weight": ..}, ...]}
+#
+# Anything else (other densities, nested mixtures, invalid scales) is handed to density_pdf so that
+# results and errors are exactly the same as the generic path.
+
+
+def _is_builtin_norm(density):
+    return density.get("type") == "builtin" and density.get("name") == "norm"
+
+
+def _normal_mixture_pdf(density_dict, x):
+    """ Closed-form pdf in a single pass over the dict, or None if the shape is not recognised. """
+    dist_type = density_dict.get("type")
+    if dist_type == "mixture":
+        total_pdf = 0.0
+        weights_sum = 0.0
+        for comp in density_dict["components"]:
+            density = comp["density"]
+            if not _is_builtin_norm(density):
+                return None
+            params = density["params"]
+            scale = params["scale"]
+            if not scale > 0:
+                return None
+            weight = abs(comp["weight"])
+            z = (x - params["loc"]) / scale
+            total_pdf += weight * (_INV_SQRT_2PI / scale) * math.exp(-0.5 * z * z)
+            weights_sum += weight
+        if weights_sum == 0:
+            return 0.0
+        return total_pdf / weights_sum
+
+    if dist_type == "builtin" and density_dict.get("name") == "norm":
+        params = density_dict["params"]
+        scale = params["scale"]
+        if not scale > 0:
+            return None
+        z = (x - params["loc"]) / scale
+        return (_INV_SQRT_2PI / scale) * math.exp(-0.5 * z * z)
+
+    return None
+
+
+def mixture_pdf(density_dict: dict, x: float) -> float:
+    """
+    Drop-in replacement for `density_pdf(density_dict, x)`.
+
+    Mixtures of builtin normals are evaluated in closed form in one pass; for the usual two or
+    three components this is cheaper than building arrays, so it is what TrackerEvaluator uses
+    on every tick. Any other specification falls back to `density_pdf`.
+    """
+    try:
+        value = _normal_mixture_pdf(density_dict, x)
+    except (KeyError, TypeError, AttributeError):
+        value = None
+    if value is None:
+        return density_pdf(density_dict=density_dict, x=x)
+    return value
+
+
+class NormalMixture:
+    """
+    A mixture of normals compiled once into NumPy arrays of (weight, loc, scale).
+
+    Weights are normalised by the sum of their absolute values, as in `density_pdf`.
+    Use this when the same prediction is evaluated at many points (grids, plots) or,
+    via `batch_mixture_pdf`, when many predictions are scored at once.
+
+    Parameters
+    ----------
+    weights, locs, scales : array-like
+        Component parameters. Scales must be positive.
+    """
+
+    def __init__(self, weights, locs, scales):
+        weights = np.abs(np.asarray(weights, dtype=float))
+        self.locs = np.asarray(locs, dtype=float)
+        self.scales = np.asarray(scales, dtype=float)
+        if np.any(~(self.scales > 0)):
+            raise ValueError("scale must be positive for Normal.")
+        weights_sum = weights.sum()
+        self.weights = weights / weights_sum if weights_sum > 0 else weights
+
+    def pdf(self, x):
+        """ Evaluate the pdf at a scalar or an array of points. """
+        x = np.asarray(x, dtype=float)
+        z = (x[..., None] - self.locs) / self.scales
+        values = np.exp(-0.5 * z * z) @ (self.weights / self.scales) * _INV_SQRT_2PI
+        return float(values) if values.ndim == 0 else values
+
+    def to_dict(self):
+        """
+        Serializes the mixture to the prediction dict format.
+        """
+        return {
+            "type": "mixture",
+            "components": [
+                {
+                    "density": {"type": "builtin", "name": "norm",
+                                "params": {"loc": float(loc), "scale": float(scale)}},
+                    "weight": float(weight)
+                }
+                for weight, loc, scale in zip(self.weights, self.locs, self.scales)
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, density_dict):
+        """
+        Compiles a prediction dict. Raises ValueError if it is not a mixture of builtin normals.
+        """
+        components = _normal_components(density_dict)
+        if components is None:
+            raise ValueError(f"Not a mixture of builtin normals with positive scales: {density_dict}")
+        weights, locs, scales = zip(*components)
+        return cls(weights, locs, scales)
+
+
+def compile_mixture(density_dict):
+    """ Returns a NormalMixture for a recognised prediction, otherwise None. """
+    components = _normal_components(density_dict)
+    if components is None:
+        return None
+    weights, locs, scales = zip(*components)
+    return NormalMixture(weights, locs, scales)
+
+
+def _normal_components(density_dict):
+    """ List of (weight, loc, scale) for a recognised prediction, otherwise None. """
+    try:
+        if density_dict.get("type") == "mixture":
+            components = []
+            for comp in density_dict["components"]:
+                density = comp["density"]
+                if not _is_builtin_norm(density):
+                    return None
+                params = density["params"]
+                components.append((abs(comp["weight"]), params["loc"], params["scale"]))
+        elif _is_builtin_norm(density_dict):
+            params = density_dict["params"]
+            components = [(1.0, params["loc"], params["scale"])]
+        else:
+            return None
+    except (KeyError, TypeError, AttributeError):
+        return None
+    if not components or not all(scale > 0 for _, _, scale in components):
+        return None
+    return components
+
+
+def pack_mixtures(predictions):
+    """
+    Pack predictions into a dict of (n, max_components) arrays "weight", "loc" and "scale".
+
+    Weights are normalised per row and padding components have zero weight. Rows for predictions
+    that are not mixtures of builtin normals (including None) are NaN.
+    """
+    parsed = [_normal_components(prediction) if prediction is not None else None for prediction in predictions]
+    k = max((len(components) for components in parsed if components is not None), default=1)
+    padding = (0.0, 0.0, 1.0)  # zero weight, unit scale
+    missing = [(np.nan, np.nan, np.nan)] * k
+    packed = np.array([components + [padding] * (k - len(components)) if components is not None else missing
+                       for components in parsed], dtype=float).reshape(len(parsed), k, 3)
+    weights = packed[:, :, 0]
+    weights_sum = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, weights_sum, out=np.zeros_like(weights), where=weights_sum != 0)
+    weights[np.isnan(weights_sum[:, 0])] = np.nan
+    return {"weight": weights, "loc": packed[:, :, 1], "scale": packed[:, :, 2]}
+
+
+def packed_mixture_pdf(packed, xs):
+    """
+    Evaluate packed mixtures (see `pack_mixtures`), row i at xs[i], in one vectorized step.
+    """
+    xs = np.asarray(xs, dtype=float)
+    weights, locs, scales = packed["weight"], packed["loc"], packed["scale"]
+    z = (xs[:, None] - locs) / scales
+    return np.sum(weights / scales * np.exp(-0.5 * z * z), axis=1) * _INV_SQRT_2PI
+
+
+def batch_mixture_pdf(predictions, xs):
+    """
+    Score many predictions at once: returns an array with `pdf_i(xs[i])` for each prediction.
+
+    Recognised predictions are packed into padded (n, max_components) arrays and evaluated in a
+    single vectorized step. Others fall back to `density_pdf` one at a time.
+    """
+    xs = np.asarray(xs, dtype=float)
+    values = packed_mixture_pdf(pack_mixtures(predictions), xs)
+    for i in np.flatnonzero(np.isnan(values)):
+        values[i] = density_pdf(density_dict=predictions[i], x=float(xs[i]))
+    return values
@@ -0,0 +1,262 @@
+import logging
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from birdgame.trackers.latency_monitor import LatencyHistogram
+
+bird_logger = logging.getLogger(__name__)
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def shared_pool(max_workers=1):
+    """ The process pool shared by every RetrainExecutor asking for `max_workers`, created on first use. """
+    with _shared_pools_lock:
+        pool = _shared_pools.get(max_workers)
+        if pool is None:
+            # Workers must share this process's resource tracker, or theirs would report the blocks
+            # they attached to as leaked when they exit
+            resource_tracker.ensure_running()
+            pool = _shared_pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return pool
+
+
+def _discard_shared_pool(pool):
+    """ Forget a broken pool, so that the next `shared_pool` call starts a fresh one. """
+    with _shared_pools_lock:
+        for max_workers, shared in list(_shared_pools.items()):
+            if shared is pool:
+                del _shared_pools[max_workers]
+
+
+def _layout(arrays):
+    """ (offset, shape, dtype) of each array packed into one block (16 byte aligned), and the block size. """
+    layout, offset = [], 0
+    for array in arrays:
+        offset = -(-offset // 16) * 16
+        layout.append((offset, array.shape, array.dtype.str))
+        offset += array.nbytes
+    return layout, max(offset, 1)
+
+
+def _fit_in_worker(fit, model, shm_name, layout, kwargs):
+    """ Process pool task: fit on the arrays in shared memory and return (pickled fitted model, seconds). """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = [np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset) for offset, shape, dtype in layout]
+        start = time.perf_counter()
+        fitted = fit(model, *arrays, **kwargs)
+        seconds = time.perf_counter() - start
+        result = pickle.dumps(fitted, protocol=pickle.HIGHEST_PROTOCOL)
+        del arrays, fitted
+        return result, seconds
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # The fitted model kept a view of the training data; the mapping goes when it is collected
+
+
+class RetrainExecutor:
+    """
+    Retrains a model in a worker process, so fitting never competes with tick and predict for the GIL.
+
+    `submit(model, *arrays)` copies the training arrays into a shared memory block and hands
+    `fit(model, *arrays, **kwargs)` to a process pool, which by default is shared by every executor.
+    `fit` must be a module level function (it is pickled by reference). The fitted model comes back
+    pickled, is unpickled on the pool's callback thread, stored in `self.model` with one assignment,
+    and passed to `on_result` (e.g. to swap it into the tracker under its lock).
+
+    At most one fit is in flight. Requests made meanwhile are coalesced: only the latest is kept,
+    and it starts when the running fit finishes. Shared memory blocks are reused while requests keep
+    coming, and all of them are freed whenever the executor goes idle, so one that is never closed
+    leaves nothing behind when the process exits.
+
+    `metrics()` reports counts, fit durations (in the worker) and round trips (submit to swap),
+    plus staleness: how many submitted versions the current model is behind, and how old its data is.
+
+        executor = RetrainExecutor(fit=fit_clone, on_result=self._swap_model)
+        ...
+        executor.submit(self.model_template, X, y)   # Returns at once
+
+    Parameters
+    ----------
+    fit : callable
+        Module level function fit(model, *arrays, **kwargs) returning the fitted model.
+    on_result : callable, optional
+        Called with each fitted model, on a pool thread.
+    max_workers : int
+        Size of the shared pool to use, if `pool` is not given.
+    pool : concurrent.futures.ProcessPoolExecutor, optional
+        A pool of its own, instead of the shared one.
+    """
+
+    def __init__(self, fit, on_result=None, max_workers=1, pool=None):
+        self.fit = fit
+        self.on_result = on_result
+        self.max_workers = max_workers
+        self.pool = pool
+        self.model = None
+        self._condition = threading.Condition(threading.RLock())
+        self._in_flight = None  # The job being fitted
+        self._pending = None  # The latest job submitted while another was in flight
+        self._spare = None  # A shared memory block free for reuse
+        self.closed = False
+        resource_tracker.ensure_running()  # Before `pool` starts any worker (see shared_pool)
+
+        self.submitted = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.model_version = None  # Version of the data behind self.model
+        self.model_submitted_at = None
+        self.latest_version = None
+        self.fit_latency = LatencyHistogram()  # Time spent fitting in the worker, in ns
+        self.round_trip_latency = LatencyHistogram()  # From submit to swap, in ns
+        self.model_bytes = 0
+
+    def submit(self, model, *arrays, version=None, **kwargs):
+        """
+        Ask for `fit(model, *arrays, **kwargs)` to run in a worker. The arrays are copied before this
+        returns, so they may be views of buffers that keep changing. `version` labels the data (e.g.
+        the tick count) for the staleness metrics, and defaults to the number of submissions.
+        """
+        arrays = [np.asarray(array) for array in arrays]
+        with self._condition:
+            if self.closed:
+                raise RuntimeError("RetrainExecutor is closed")
+            self.submitted += 1
+            version = self.submitted if version is None else version
+            self.latest_version = version
+            layout, size = _layout(arrays)
+            shm = self._block(size)
+            for array, (offset, shape, dtype) in zip(arrays, layout):
+                np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+            job = {'model': model, 'shm': shm, 'layout': layout, 'kwargs': kwargs,
+                   'version': version, 'submitted_at': time.time()}
+            if self._in_flight is not None:
+                if self._pending is not None:
+                    self.coalesced += 1
+                    self._release(self._pending['shm'])
+                self._pending = job
+                return
+            self._in_flight = job
+        self._start(job)
+
+    def _block(self, size):
+        spare, self._spare = self._spare, None
+        if spare is not None:
+            if spare.size >= size:
+                return spare
+            self._release(spare, reuse=False)
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    def _release(self, shm, reuse=True):
+        if reuse and self._spare is None and not self.closed:
+            self._spare = shm
+            return
+        shm.close()
+        shm.unlink()
+
+    def _start(self, job):
+        pool = self.pool if self.pool is not None else shared_pool(self.max_workers)
+        try:
+            future = pool.submit(_fit_in_worker, self.fit, job['model'], job['shm'].name, job['layout'], job['kwargs'])
+        except (BrokenProcessPool, RuntimeError) as e:
+            if self.pool is None:
+                _discard_shared_pool(pool)
+            bird_logger.error(f"Could not start a retrain: {e}")
+            self._finish(job, None)
+            return
+        future.add_done_callback(lambda f: self._done(f, job, pool))
+
+    def _done(self, future, job, pool):
+        try:
+            pickled, seconds = future.result()
+            model = pickle.loads(pickled)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self.pool is None:
+                _discard_shared_pool(pool)
+            bird_logger.error(f"Retrain with {getattr(self.fit, '__name__', self.fit)} failed: {e!r}")
+            self._finish(job, None)
+            return
+
+        self.model = model  # One assignment, so readers see the old model or the new one
+        with self._condition:
+            self.model_version = job['version']
+            self.model_submitted_at = job['submitted_at']
+            self.model_bytes = len(pickled)
+            self.fit_latency.record(int(1e9 * seconds))
+            self.round_trip_latency.record(int(1e9 * (time.time() - job['submitted_at'])))
+        if self.on_result is not None:
+            try:
+                self.on_result(model)
+            except Exception:
+                bird_logger.exception("on_result failed")
+        self._finish(job, model)
+
+    def _finish(self, job, model):
+        with self._condition:
+            if model is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._release(job['shm'], reuse=self._pending is not None)
+            job, self._pending = self._pending, None
+            self._in_flight = job
+            if job is None and self._spare is not None:
+                self._release(self._spare, reuse=False)
+                self._spare = None
+            self._condition.notify_all()
+        if job is not None:
+            self._start(job)
+
+    def wait(self, timeout=None):
+        """ Block until no retrain is running or pending. Returns False on timeout. """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight is None, timeout=timeout)
+
+    def metrics(self, percentiles=(50, 99)):
+        """ Counts, fit and round trip durations in ms, and staleness of the current model. """
+        with self._condition:
+            metrics = {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'in_flight': self._in_flight is not None,
+                'model_bytes': self.model_bytes,
+                'versions_behind': (self.latest_version - self.model_version
+                                    if self.model_version is not None and self.latest_version is not None else None),
+                'model_age_s': time.time() - self.model_submitted_at if self.model_submitted_at is not None else None,
+            }
+            metrics.update(self.fit_latency.summary(percentiles, prefix='fit_'))
+            metrics.update(self.round_trip_latency.summary(percentiles, prefix='round_trip_'))
+        return metrics
+
+    def close(self, timeout=None):
+        """ Wait for the running retrain (dropping any pending one) and free the shared memory. """
+        with self._condition:
+            if self._pending is not None:
+                self._release(self._pending['shm'], reuse=False)
+                self._pending = None
+                self.coalesced += 1
+        self.wait(timeout)
+        with self._condition:
+            self.closed = True
+            if self._spare is not None:
+                self._release(self._spare, reuse=False)
+                self._spare = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
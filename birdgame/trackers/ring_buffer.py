@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed capacity buffer of the most recent values (or rows), held in one preallocated NumPy array.
+
+    Each value is written twice, at i and at i + capacity of a backing array of length
+    2 * capacity. So the latest n values are always one contiguous slice, and `view` returns them
+    without copying, whatever the write position. Appending is O(1) and never allocates.
+
+    Views are read-only and share memory with the buffer. A later append may overwrite the
+    oldest value of a view taken before it, so copy a view (`view().copy()`) before handing it
+    to another thread.
+
+        buffer = RingBuffer(capacity=1000)
+        buffer.append(x)
+        y = buffer.view(100)              # The latest 100 values, zero-copy
+        X = buffer.windows(5)             # Rows are the consecutive windows of 5 values
+
+    Parameters
+    ----------
+    capacity : int
+        Maximum number of values held. Older values are overwritten.
+    width : int, optional
+        If given each value is a row of `width` numbers, and views are 2-D.
+    dtype : numpy dtype
+        Type of the stored values.
+    """
+
+    def __init__(self, capacity, width=None, dtype=float):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.width = width
+        shape = (2 * capacity,) if width is None else (2 * capacity, width)
+        self._data = np.zeros(shape, dtype=dtype)
+        self.count = 0  # Total number of values appended
+        self._end = capacity  # One past the newest value, always in [capacity, 2 * capacity]
+        self._windows = None  # (window_size, count, windows) of the last `windows` call
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, value):
+        """ Add a value, overwriting the oldest one if the buffer is full. """
+        capacity = self.capacity
+        i = self._end - capacity  # Next write position in [0, capacity]
+        if i == capacity:
+            i = 0
+        self._data[i] = value
+        self._data[i + capacity] = value
+        self._end = i + capacity + 1
+        self.count += 1
+
+    def extend(self, values):
+        """ Equivalent to calling `append` on each of `values`. """
+        values = np.asarray(values, dtype=self._data.dtype)
+        n = len(values)
+        if not n:
+            return
+        if n > self.capacity:
+            self.count += n - self.capacity
+            values = values[-self.capacity:]
+            n = self.capacity
+        capacity = self.capacity
+        positions = (self._end - capacity + np.arange(n)) % capacity
+        self._data[positions] = values
+        self._data[positions + capacity] = values
+        self._end = int(positions[-1]) + capacity + 1
+        self.count += n
+
+    def view(self, n=None):
+        """
+        The latest `n` values (all of them if None), oldest first, as a read-only view.
+        Fewer are returned if fewer have been appended.
+        """
+        size = len(self)
+        n = size if n is None else min(n, size)
+        values = self._data[self._end - n:self._end]
+        values.flags.writeable = False
+        return values
+
+    def windows(self, window_size):
+        """
+        Read-only view whose rows are the consecutive windows of `window_size` values in the
+        buffer, oldest first (`numpy.lib.stride_tricks.sliding_window_view` of `view()`).
+        The view is cached until the next append, so asking again costs nothing.
+        """
+        cached = self._windows
+        if cached is not None and cached[0] == window_size and cached[1] == self.count:
+            return cached[2]
+        values = self.view()
+        if len(values) < window_size:
+            windows = np.empty((0, window_size) + values.shape[1:], dtype=values.dtype)
+        else:
+            windows = np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0)
+        self._windows = (window_size, self.count, windows)
+        return windows
+
+    def clear(self):
+        self.count = 0
+        self._end = self.capacity
+        self._windows = None
+
+    def to_dict(self):
+        """
+        Serializes the state of the RingBuffer object to a dictionary.
+        """
+        return {
+            'capacity': self.capacity,
+            'width': self.width,
+            'dtype': self._data.dtype.str,
+            'count': self.count,
+            'values': self.view().tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Deserializes the state from a dictionary into a new RingBuffer instance.
+        """
+        instance = cls(capacity=data['capacity'], width=data['width'], dtype=np.dtype(data['dtype']))
+        instance.extend(data['values'])
+        instance.count = data['count']
+        return instance
@@ -1,9 +1,15 @@
+import math
 import numpy as np
+from array import array
 from collections import deque
 
-from densitypdf import density_pdf
-
+from birdgame.trackers.latency_monitor import DEFAULT_BUDGET
 from birdgame.trackers.trackerbase import Quarantine, TrackerBase
+from birdgame.trackers.mixture_scorer import mixture_pdf
+
+
+def robust_log_like(score):
+    return math.log(1e-10 + score)
 
 
 def robust_mean_log_like(scores):
@@ -11,64 +17,145 @@ def robust_mean_log_like(scores):
     return np.mean(log_scores)
 
 
+class KahanSum:
+    """
+    Running sum with Kahan compensation, so that long runs of small log-likelihood
+    increments do not accumulate rounding error.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, x):
+        y = x - self.compensation
+        t = self.total + y
+        self.compensation = (t - self.total) - y
+        self.total = t
+
+    def reset(self, total=0.0):
+        self.total = total
+        self.compensation = 0.0
+
+    def get(self):
+        return self.total
+
+
 class TrackerEvaluator(Quarantine):
-    def __init__(self, tracker: TrackerBase, score_window_size: int = 100):
+    def __init__(self, tracker: TrackerBase, score_window_size: int = 100, keep_scores: bool = True,
+                 latency_budget: float = DEFAULT_BUDGET, fallback_to_last_prediction: bool = False):
         """
         Evaluates a given tracker by comparing its predictions to the actual dove locations.
 
+        Log-likelihoods are accumulated as running sums, so `overall_likelihood_score` and
+        `recent_likelihood_score` are O(1), and with `keep_scores=False` memory does not grow with
+        the length of the run.
+
         Parameters
         ----------
         tracker : TrackerBase
             The tracker instance to evaluate.
         score_window_size : int, optional
             The number of most recent scores to retain for computing the median latest score.
+        keep_scores : bool, optional
+            If True (the default), also retain every score in `self.scores`, a compact array('d') that
+            reads like the list it used to be. Pass False for long runs, to keep memory constant
+            (`self.scores` is then None).
+        latency_budget : float, optional
+            Seconds allowed for tick plus predict. Unless the tracker already monitors its latency, the
+            evaluator calls `tracker.monitor_latency` with this budget. `self.latency` is the tracker's
+            LatencyMonitor, which records every `tracker.tick_and_predict` and counts the ticks over budget.
+        fallback_to_last_prediction : bool, optional
+            If True, score the last prediction made within budget in place of one that came too late.
+            Only used if the evaluator creates the tracker's monitor.
         """
-        
+
         super().__init__(tracker.horizon)
         self.tracker = tracker
-        self.scores = []
+        self.keep_scores = keep_scores
+        self.scores = array('d') if keep_scores else None
+        self.score_count = 0
         self.score_window_size = score_window_size
         self.latest_scores = deque(maxlen=score_window_size)  # Keeps only the last `score_window_size` scores
         self.last_score = None
 
+        # Running sums of log(1e-10 + score), overall and over `latest_scores`
+        self._log_score_sum = KahanSum()
+        self._recent_log_score_sum = KahanSum()
+        self._evictions = 0
+
         self.time = None
         self.dove_location = None
         self.latest_valid_prediction = None
+        if tracker.latency_monitor is None:
+            tracker.monitor_latency(budget=latency_budget, fallback_to_last_prediction=fallback_to_last_prediction)
+
+    @property
+    def latency(self):
+        """ The tracker's LatencyMonitor. """
+        return self.tracker.latency_monitor
 
     def tick_and_predict(self, payload: dict, performance_metrics: dict = None):
         """
-        Process a new data point, make a prediction and evaluate it.
+        Process a new data point through `tracker.tick_and_predict` (which times it and polls the
+        tracker's checkpointer) and evaluate the prediction.
         """
-        self.tracker.tick(payload, performance_metrics)
-        prediction = self.tracker.predict()
+        prediction = self.tracker.tick_and_predict(payload, performance_metrics)
+        self.score_prediction(payload, prediction)
 
+    def score_prediction(self, payload: dict, prediction: dict):
+        """
+        Quarantine a prediction made after `payload` and score the one released at its time, for
+        callers that tick the tracker themselves. Returns the likelihood, or None if nothing was released.
+        """
         current_time = payload['time']
         self.add_to_quarantine(current_time, prediction)
         prev_prediction = self.pop_from_quarantine(current_time)
 
         if not prev_prediction:
             self.last_score = None
-            return
+            return None
 
-        density = density_pdf(density_dict=prev_prediction, x=payload['dove_location'])
-        self.scores.append(density)
-        self.latest_scores.append(density) # Maintain a rolling window of recent scores
+        density = mixture_pdf(prev_prediction, x=payload['dove_location'])
+        self._record_score(density)
         self.last_score = density
         self.latest_valid_prediction = prev_prediction
 
         self.time = current_time
         self.dove_location = payload['dove_location']
+        return density
+
+    def _record_score(self, density):
+        log_like = robust_log_like(density)
+        self.score_count += 1
+        self._log_score_sum.add(log_like)
+        if self.keep_scores:
+            self.scores.append(density)
+
+        # Maintain a rolling window of recent scores
+        if self.latest_scores.maxlen == 0:
+            return
+        if len(self.latest_scores) == self.latest_scores.maxlen:
+            self._recent_log_score_sum.add(-robust_log_like(self.latest_scores[0]))
+            self._evictions += 1
+        self.latest_scores.append(density)
+        self._recent_log_score_sum.add(log_like)
+
+        # Once per full window, re-sum exactly to stop add/subtract drift (amortized O(1))
+        if self._evictions and self._evictions >= self.latest_scores.maxlen:
+            self._evictions = 0
+            self._recent_log_score_sum.reset(math.fsum(robust_log_like(s) for s in self.latest_scores))
 
     def overall_likelihood_score(self):
         """
         Return the mean log-likelihood score over all recorded scores.
         """
-        if not self.scores:
+        if not self.score_count:
             print("No scores to average")
             return 0.0
 
-        return float(robust_mean_log_like(self.scores))
-    
+        return self._log_score_sum.get() / self.score_count
+
     def recent_likelihood_score(self):
         """
         Return the mean log-likelihood score of the most recent `score_window_size` scores.
@@ -76,5 +163,5 @@ class TrackerEvaluator(Quarantine):
         if not self.latest_scores:
             print("No recent scores available.")
             return 0.0
-        
-        return float(robust_mean_log_like(self.latest_scores))
\ No newline at end of file
+
+        return self._recent_log_score_sum.get() / len(self.latest_scores)
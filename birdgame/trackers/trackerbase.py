@@ -1,9 +1,23 @@
 import abc
+import numpy as np
+from collections import deque
+
+from birdgame.trackers.checkpoint import (Checkpointer, decode_state, dumps, encode_pickled, encode_state, loads,
+                                         write_atomically)
+from birdgame.trackers.latency_monitor import DEFAULT_BUDGET, LatencyMonitor
+from birdgame.trackers.mixture_scorer import pack_mixtures
+
 
 class Quarantine:
     """
     Base class that handles quarantining of data points before they are eligible for processing.
 
+    Pending entries are held in a deque. As long as release times are non-decreasing (the usual case,
+    since `time` only moves forward) the released entries always form a prefix of the deque, so
+    `pop_from_quarantine` just advances past them from the left in amortized O(1). If an out-of-order
+    time is added we fall back to scanning the whole deque, which reproduces the original list-based
+    semantics exactly, and return to the fast path once the out-of-order entries have been trimmed.
+
     Parameters
     ----------
     horizon : int
@@ -12,23 +26,86 @@ class Quarantine:
 
     def __init__(self, horizon: int):
         self.horizon = horizon
-        self.quarantine = [] # Stores tuples of (release_time, value)
+        self.quarantine = deque()  # Stores tuples of (release_time, value)
+        self._descents = 0  # Number of adjacent entries whose release time decreases
 
     def add_to_quarantine(self, time, value):
         """ 
         Adds a new value to the quarantine list. 
         The value will become available for prediction processing at `time + self.horizon`.
         """
-        self.quarantine.append((time + self.horizon, value))
+        release_time = time + self.horizon
+        if self.quarantine and release_time < self.quarantine[-1][0]:
+            self._descents += 1
+        self.quarantine.append((release_time, value))
 
     def pop_from_quarantine(self, current_time):
         """ Returns the most recent valid data point from quarantine, if available. """
-        valid = [(j, (ti, xi)) for (j, (ti, xi)) in enumerate(self.quarantine) if ti <= current_time]
-        if valid:
-            prev_ndx, (ti, prev_x) = valid[-1]
-            self.quarantine = self.quarantine[prev_ndx:]  # Trim the quarantine list
-            return prev_x
-        return None
+        quarantine = self.quarantine
+        if not quarantine:
+            return None
+
+        if self._descents == 0:
+            # Monotone release times: everything released is a prefix, keep only its last entry
+            while len(quarantine) > 1 and quarantine[1][0] <= current_time:
+                quarantine.popleft()
+            ti, prev_x = quarantine[0]
+            return prev_x if ti <= current_time else None
+
+        # Out-of-order release times: find the last released entry anywhere in the deque
+        prev_ndx = None
+        for j, (ti, _) in enumerate(quarantine):
+            if ti <= current_time:
+                prev_ndx = j
+        if prev_ndx is None:
+            return None
+        for _ in range(prev_ndx):  # Trim the quarantine, keeping the descent count in step
+            ti, _ = quarantine.popleft()
+            if ti > quarantine[0][0]:
+                self._descents -= 1
+        return quarantine[0][1]
+
+    def add_and_pop_batch(self, times, values):
+        """
+        Equivalent to calling `add_to_quarantine(t, x)` then `pop_from_quarantine(t)` for each row.
+
+        Returns an array of the popped values (NaN where nothing was released) and the boolean
+        mask of rows where a value was released. Values must be numeric. When times are
+        non-decreasing the lagged index of every row is found with one `searchsorted`,
+        otherwise this falls back to the row-by-row loop.
+        """
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        release_times = times + self.horizon
+        n = len(times)
+
+        pending = list(self.quarantine)
+        monotone = (self._descents == 0 and self.horizon > 0 and np.all(np.diff(times) >= 0)
+                    and (not pending or n == 0 or release_times[0] >= pending[-1][0]))
+        try:
+            pending_values = np.array([v for _, v in pending], dtype=float)
+        except (TypeError, ValueError):
+            monotone = False
+
+        if not monotone:
+            popped, released = np.full(n, np.nan), np.zeros(n, dtype=bool)
+            for i, (t, x) in enumerate(zip(times.tolist(), values.tolist())):
+                self.add_to_quarantine(t, x)
+                prev_x = self.pop_from_quarantine(t)
+                if prev_x is not None:
+                    popped[i], released[i] = prev_x, True
+            return popped, released
+
+        all_release_times = np.concatenate([np.array([r for r, _ in pending], dtype=float), release_times])
+        all_values = np.concatenate([pending_values, values])
+        # Last entry released by each row (the row's own entry is never released, as horizon > 0)
+        ndx = np.searchsorted(all_release_times, times, side='right') - 1
+        released = ndx >= 0
+        popped = np.where(released, all_values[np.maximum(ndx, 0)], np.nan)
+
+        start = int(ndx[-1]) if n and released[-1] else 0  # Trim the quarantine, as the last pop would
+        self.quarantine = deque(zip(all_release_times[start:].tolist(), all_values[start:].tolist()))
+        return popped, released
 
 
 class TrackerBase(Quarantine):
@@ -42,9 +119,15 @@ class TrackerBase(Quarantine):
         The look ahead time for tracker predictions. Trackers try to predict the horizon.
     """
 
+    # Attributes left out of checkpoints, and attributes (e.g. third party models) saved with pickle
+    CHECKPOINT_EXCLUDE = ('latency_monitor', 'checkpointer')
+    CHECKPOINT_PICKLE = ()
+
     def __init__(self, horizon: int):
         super().__init__(horizon)
         self.count = 0 # Keeps track of the number of processed dove locations
+        self.latency_monitor = None # See `monitor_latency`
+        self.checkpointer = None # See `checkpoint_every`
 
     @abc.abstractmethod
     def tick(self, payload: dict, performance_metrics: dict):
@@ -62,10 +145,121 @@ class TrackerBase(Quarantine):
 
     def tick_and_predict(self, payload: dict, performance_metrics: dict) -> dict:
         """
-        Combines the `tick` and `predict` methods.
+        Combines the `tick` and `predict` methods, timing them if `monitor_latency` was called.
+        """
+        if self.latency_monitor is not None:
+            prediction = self.latency_monitor.tick_and_predict(self, payload, performance_metrics)
+        else:
+            self.tick(payload, performance_metrics)
+            prediction = self.predict()
+        if self.checkpointer is not None:
+            self.checkpointer.poll()
+        return prediction
+
+    def monitor_latency(self, budget=DEFAULT_BUDGET, fallback_to_last_prediction=False):
+        """
+        Record the latency of every `tick_and_predict` from now on, and count the calls that take
+        longer than `budget` seconds (see `LatencyMonitor`). Returns the monitor.
+        """
+        self.latency_monitor = LatencyMonitor(budget=budget, fallback_to_last_prediction=fallback_to_last_prediction)
+        return self.latency_monitor
+
+    def checkpoint_state(self) -> dict:
+        """
+        The tracker's attributes as plain JSON types (see `encode_state`): the quarantine, counters,
+        NumPy arrays, nested stats estimators and nested trackers. Attributes that cannot be
+        encoded (threads, locks, third party models not in CHECKPOINT_PICKLE) are left out and
+        listed under '__skipped__'. A restored tracker keeps its own values for those.
+        """
+        state, skipped = {}, []
+        for name, value in vars(self).items():
+            if name in self.CHECKPOINT_EXCLUDE:
+                continue
+            if name in self.CHECKPOINT_PICKLE:
+                state[name] = encode_pickled(value)
+                continue
+            try:
+                state[name] = encode_state(value)
+            except TypeError:
+                skipped.append(name)
+        state['__skipped__'] = skipped
+        return state
+
+    def restore_state(self, state: dict):
+        """ Set the attributes saved by `checkpoint_state`. Returns self. """
+        for name, value in state.items():
+            if name != '__skipped__':
+                setattr(self, name, decode_state(value, getattr(self, name, None)))
+        return self
+
+    def checkpoint(self) -> bytes:
+        """ The tracker's state as compact bytes (orjson), for `restore`. """
+        return dumps(self)
+
+    def restore(self, data: bytes):
+        """
+        Resume from a `checkpoint`. Construct the tracker as the checkpointed one was (same class and
+        parameters), then restore, so that it carries on hot instead of warming up again:
+
+            tracker = MixtureTracker().restore(checkpoint)
         """
-        self.tick(payload, performance_metrics)
-        return self.predict()
+        return loads(self, data)
+
+    def save_checkpoint(self, path):
+        """ Write a checkpoint to `path`, atomically. """
+        write_atomically(path, self.checkpoint())
+
+    def load_checkpoint(self, path):
+        """ Restore from a checkpoint file written by `save_checkpoint` or `checkpoint_every`. Returns self. """
+        with open(path, 'rb') as f:
+            return self.restore(f.read())
+
+    def checkpoint_every(self, path, interval=60.0):
+        """
+        From now on, snapshot the tracker every `interval` seconds and write it to `path` in the
+        background (see `Checkpointer`). Returns the checkpointer, whose `close()` writes a last one.
+        """
+        self.checkpointer = Checkpointer(self, path, interval=interval)
+        return self.checkpointer
+
+    @staticmethod
+    def _batch_payloads(times, dove_locations, falcon_locations=None, falcon_ids=None, falcon_wingspans=None):
+        """ Rebuild per-tick payload dicts from column arrays. """
+        columns = {'time': times, 'falcon_location': falcon_locations, 'dove_location': dove_locations,
+                   'falcon_id': falcon_ids, 'falcon_wingspan': falcon_wingspans}
+        columns = {k: np.asarray(v).tolist() for k, v in columns.items() if v is not None}
+        names = list(columns)
+        for row in zip(*columns.values()):
+            yield dict(zip(names, row))
+
+    def tick_batch(self, times, dove_locations, falcon_locations=None, falcon_ids=None, falcon_wingspans=None,
+                   performance_metrics=None):
+        """
+        Ingest a block of records given as NumPy arrays, equivalent to calling `tick` on each row.
+
+        The default implementation loops over `tick`. Trackers can override it with a vectorized version.
+        """
+        for payload in self._batch_payloads(times, dove_locations, falcon_locations, falcon_ids, falcon_wingspans):
+            self.tick(payload, performance_metrics)
+
+    def predict_batch(self, times, dove_locations, falcon_locations=None, falcon_ids=None, falcon_wingspans=None,
+                      performance_metrics=None) -> dict:
+        """
+        Ingest a block of records and return the prediction made after each one, equivalent to calling
+        `tick_and_predict` on each row.
+
+        Predictions are returned as a dict of (n_rows, n_components) arrays "weight", "loc" and "scale"
+        (see `pack_mixtures`). Rows whose prediction is not a mixture of normals (e.g. None during
+        warmup) are NaN.
+
+        The default implementation loops over `tick` and `predict`. Trackers can override it with a
+        vectorized version.
+        """
+        predictions = []
+        for payload in self._batch_payloads(times, dove_locations, falcon_locations, falcon_ids, falcon_wingspans):
+            self.tick(payload, performance_metrics)
+            predictions.append(self.predict())
+        return pack_mixtures(predictions)
 
     @staticmethod
     def report_relative_likelihood(log_like, bmark_log_like):
@@ -82,21 +276,32 @@ class TrackerBase(Quarantine):
                 f'     .... and mine is worse. Ratio is {log_like / bmark_log_like:.5f}'
             )
 
-    def test_run(self, live=True, step_print=1000, max_rows=None):
+    @staticmethod
+    def _test_data(live=True, max_rows=None, data=None):
+        """ Payloads for a test run: `data` if given, otherwise the live or remote test feed. """
+        from itertools import islice
+        from birdgame.datasources.livedata import live_data_generator
+        from birdgame.datasources.remotetestdata import remote_test_data_generator
+
+        if data is not None:
+            return islice(data, max_rows)
+        return live_data_generator(max_rows=max_rows) if live else remote_test_data_generator(max_rows=max_rows)
+
+    def test_run(self, live=True, step_print=1000, max_rows=None, data=None):
         """
         Run a test simulation using either live or static remote test data.
         Compare the performance of the current tracker with a benchmark model.
+
+        Any other iterable of payloads, such as `recorded_feed_generator`, can be passed as `data`.
         """
         from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
         from birdgame.trackers.tracker_evaluator import TrackerEvaluator
-        from birdgame.datasources.livedata import live_data_generator
-        from birdgame.datasources.remotetestdata import remote_test_data_generator
         from tqdm.auto import tqdm
         
         benchmark_tracker = EMWAVarTracker(horizon=self.horizon)
         my_run, bmark_run = TrackerEvaluator(self), TrackerEvaluator(benchmark_tracker)
 
-        gen = live_data_generator(max_rows=max_rows) if live else remote_test_data_generator(max_rows=max_rows)
+        gen = self._test_data(live=live, max_rows=max_rows, data=data)
         try:
             for i, payload in enumerate(tqdm(gen)):
 
@@ -108,25 +313,24 @@ class TrackerBase(Quarantine):
                                                     bmark_log_like=bmark_run.overall_likelihood_score())
             self.report_relative_likelihood(log_like=my_run.overall_likelihood_score(),
                                             bmark_log_like=bmark_run.overall_likelihood_score())
+            my_run.latency.report()
 
 
         except KeyboardInterrupt:
             print("Interrupted")
 
-    def test_run_animated(self, live=True, n_data_points=50, recent_score_window_size=100, interval_animation=100, from_notebook=False, max_rows=None):
+    def test_run_animated(self, live=True, n_data_points=50, recent_score_window_size=100, interval_animation=100, from_notebook=False, max_rows=None, data=None):
         """
         Run a test simulation with an animated visualization of predictions.
         """
         from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
         from birdgame.trackers.tracker_evaluator import TrackerEvaluator
         from birdgame.visualization.animated_viz_predictions import animated_predictions_graph
-        from birdgame.datasources.livedata import live_data_generator
-        from birdgame.datasources.remotetestdata import remote_test_data_generator
 
         benchmark_tracker = EMWAVarTracker(horizon=self.horizon)
         my_run, bmark_run = TrackerEvaluator(self, recent_score_window_size), TrackerEvaluator(benchmark_tracker, recent_score_window_size)
 
-        gen = live_data_generator(max_rows=max_rows) if live else remote_test_data_generator(max_rows=max_rows)
+        gen = self._test_data(live=live, max_rows=max_rows, data=data)
 
         use_plt_show = True if not from_notebook else False
         animated = animated_predictions_graph(gen, my_run, bmark_run, n_data_points=n_data_points, 
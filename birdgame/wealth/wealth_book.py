@@ -0,0 +1,166 @@
+import numpy as np
+from birdgame import GAME_PARAMS
+
+
+class WealthBook:
+    """
+    Array-backed version of `update_wealth` for simulating many players at once.
+
+    Wealth, the short/long/blend EWMA log-likelihoods and participation masks are held as
+    contiguous NumPy arrays indexed by player, and each tick updates every player in one
+    vectorized step. The arithmetic is the same as `update_wealth`, so results agree with
+    the dict version up to floating point summation order of the pot and totals.
+
+    Parameters
+    ----------
+    names : list or int
+        Player names, or the number of players (names are then 0..n-1).
+    params : dict
+        Game parameters, see `GAME_PARAMS`.
+    initial_wealth : float or array-like, optional
+        Starting wealth per player. Defaults to params["initial_wealth"].
+    """
+
+    def __init__(self, names, params=GAME_PARAMS, initial_wealth=None):
+        self.names = list(range(names)) if isinstance(names, int) else list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.params = params
+        n = len(self.names)
+
+        if initial_wealth is None:
+            initial_wealth = params["initial_wealth"]
+        self.wealth = np.array(np.broadcast_to(initial_wealth, (n,)), dtype=float)
+        self.ewma_short_logL = np.full(n, np.nan)
+        self.ewma_long_logL = np.full(n, np.nan)
+        self.ewma_blend_logL = np.full(n, np.nan)
+        self.initialized = np.zeros(n, dtype=bool)  # Has the player ever had a valid likelihood
+        self.participating = np.zeros(n, dtype=bool)  # Valid likelihood on the latest tick
+
+    def __len__(self):
+        return len(self.names)
+
+    def update(self, likelihoods, wealth_update=True):
+        """
+        Update every player for one tick.
+
+        Parameters
+        ----------
+        likelihoods : array-like or dict
+            Instantaneous likelihood per player, NaN (or None, or missing from a dict) for players
+            that did not predict this tick.
+        wealth_update : bool
+            If False, skip the wealth redistribution (used for warming up the EWMA statistics).
+        """
+        likelihoods = self._as_array(likelihoods)
+        valid = ~np.isnan(likelihoods)
+        self.participating = valid
+        if not valid.any():
+            return
+
+        params = self.params
+        idx = np.flatnonzero(valid)
+        likelihood = likelihoods[idx]
+        log_likelihood = np.log(np.maximum(likelihood, 1e-12))
+
+        # --- Update EWMA log-likelihood for each player ---
+        # New players are initialized with their first log-likelihood
+        new = ~self.initialized[idx]
+        short = np.where(new, log_likelihood,
+                         params["alpha_short"] * log_likelihood + (1 - params["alpha_short"]) * self.ewma_short_logL[idx])
+        long = np.where(new, log_likelihood,
+                        params["alpha_long"] * log_likelihood + (1 - params["alpha_long"]) * self.ewma_long_logL[idx])
+        blend = params["w_short"] * short + (1 - params["w_short"]) * long
+        self.ewma_short_logL[idx] = short
+        self.ewma_long_logL[idx] = long
+        self.ewma_blend_logL[idx] = blend
+        self.initialized[idx] = True
+
+        rel_ewma = np.exp(blend)
+        total_likelihood = likelihood.sum()
+        total_rel_ewma = rel_ewma.sum()
+
+        # Skip wealth redistribution if still warming up
+        if total_likelihood == 0 or total_rel_ewma == 0 or not wealth_update:
+            return
+
+        # Investment phase (wealth never goes below 0)
+        wealth = self.wealth[idx]
+        investment = params["investment_fraction"] * wealth
+        wealth = np.maximum(0.0, wealth - investment)
+
+        # Inflation adjustment
+        pot = investment.sum() * (1 + params["inflation_bps"] / 10000.0)
+
+        # Redistribution phase
+        share = (1 - params["ewma_weight"]) * (likelihood / total_likelihood) \
+            + params["ewma_weight"] * (rel_ewma / total_rel_ewma)
+        self.wealth[idx] = wealth + pot * share
+
+    def update_block(self, likelihoods, wealth_update=True, record=False):
+        """
+        Apply a block of ticks, one row of `likelihoods` (shape (n_ticks, n_players)) per tick.
+
+        Ticks depend on each other through wealth, so rows are applied in order, but each is a
+        single vectorized step over all players.
+
+        Parameters
+        ----------
+        likelihoods : array-like
+            2-D array of likelihoods, NaN where a player did not predict.
+        wealth_update : bool or array-like
+            Either one flag for the whole block or one flag per tick.
+        record : bool
+            If True, return the (n_ticks, n_players) wealth trajectory.
+        """
+        likelihoods = np.asarray(likelihoods, dtype=float)
+        n_ticks = likelihoods.shape[0]
+        wealth_update = np.broadcast_to(wealth_update, (n_ticks,))
+        trajectory = np.empty((n_ticks, len(self))) if record else None
+
+        for k in range(n_ticks):
+            self.update(likelihoods[k], wealth_update=bool(wealth_update[k]))
+            if record:
+                trajectory[k] = self.wealth
+
+        return trajectory
+
+    def _as_array(self, likelihoods):
+        if isinstance(likelihoods, dict):
+            values = np.full(len(self), np.nan)
+            for name, likelihood in likelihoods.items():
+                if likelihood is not None:
+                    values[self.index[name]] = likelihood
+            return values
+        if isinstance(likelihoods, (list, tuple)):
+            likelihoods = [np.nan if v is None else v for v in likelihoods]
+        return np.asarray(likelihoods, dtype=float)
+
+    def to_players(self):
+        """
+        Returns the dict-of-dicts representation used by `update_wealth`.
+        """
+        players = {}
+        for i, name in enumerate(self.names):
+            player = {"wealth": float(self.wealth[i])}
+            if self.initialized[i]:
+                player["ewma_short_logL"] = float(self.ewma_short_logL[i])
+                player["ewma_long_logL"] = float(self.ewma_long_logL[i])
+                player["ewma_blend_logL"] = float(self.ewma_blend_logL[i])
+            players[name] = player
+        return players
+
+    @classmethod
+    def from_players(cls, players, params=GAME_PARAMS):
+        """
+        Builds a WealthBook from the dict-of-dicts representation used by `update_wealth`.
+        """
+        names = list(players)
+        book = cls(names, params=params, initial_wealth=[players[name]["wealth"] for name in names])
+        for i, name in enumerate(names):
+            player = players[name]
+            if "ewma_long_logL" in player:
+                book.initialized[i] = True
+                book.ewma_short_logL[i] = player["ewma_short_logL"]
+                book.ewma_long_logL[i] = player["ewma_long_logL"]
+                book.ewma_blend_logL[i] = player.get("ewma_blend_logL", np.nan)
+        return book
@@ -0,0 +1,84 @@
+import asyncio
+import orjson
+import redis
+from birdgame.datasources import asynclivedata
+from birdgame.datasources.asynclivedata import async_live_data_generator
+
+
+def message(i):
+    payload = {'time': float(i), 'falcon_location': 1.0 + i, 'dove_location': 2.0 + i, 'falcon_id': i % 3,
+               'falcon_wingspan': 0.5}
+    return f'{i}-0'.encode(), {b'bird_payload': orjson.dumps(payload)}
+
+
+class FakeClient:
+    """ Serves scripted XREAD responses (or raises scripted errors), recording the ids asked for. """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requested_ids = []
+        self.closed = False
+
+    async def xread(self, streams, count=None, block=None):
+        (last_id,) = streams.values()
+        self.requested_ids.append(last_id)
+        await asyncio.sleep(0)
+        if not self.responses:
+            await asyncio.sleep(3600)  # Like a blocking read with no new messages
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return [(b'prod_bird_game_public', response)] if response else []
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def collect(generator):
+    return [item async for item in generator]
+
+
+def test_yields_parsed_payloads_and_keeps_next_read_in_flight():
+    client = FakeClient([[message(0), message(1)], [], [message(2)]])
+
+    async def consume():
+        seen = []
+        async for payload in async_live_data_generator(start_from_latest=False, max_rows=3, client=client):
+            await asyncio.sleep(0)  # A consumer that awaits something while handling the payload
+            seen.append((payload, len(client.requested_ids)))
+        return seen
+
+    seen = asyncio.run(consume())
+    assert [payload['time'] for payload, _ in seen] == [0.0, 1.0, 2.0]
+    assert list(seen[0][0]) == asynclivedata.FEED_COLUMNS
+    # The read following the first batch was issued while its first payload was being handled
+    assert seen[0][1] == 2
+    assert client.requested_ids == ['0-0', b'1-0', b'1-0']  # No read after the last row
+    assert not client.closed  # Clients passed in are left open
+
+
+def test_columnar_batches():
+    client = FakeClient([[message(0), message(1)], [message(2), message(3)]])
+    batches = asyncio.run(collect(async_live_data_generator(max_rows=3, batch=True, client=client)))
+    assert [len(b['time']) for b in batches] == [2, 1]
+    assert batches[0]['falcon_id'].tolist() == [0, 1]
+    assert batches[1]['dove_location'].tolist() == [4.0]
+
+
+def test_retries_after_connection_errors(monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        if seconds:
+            sleeps.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asynclivedata.asyncio, 'sleep', fake_sleep)
+    client = FakeClient([redis.exceptions.ConnectionError('down'), ConnectionError('down'), [message(5)]])
+    payloads = asyncio.run(collect(async_live_data_generator(max_rows=1, client=client)))
+    assert [p['time'] for p in payloads] == [5.0]
+    assert sleeps == [2, 4]
+
+    client = FakeClient([ConnectionError('down')] * 3)
+    assert asyncio.run(collect(async_live_data_generator(client=client, max_retries=2))) == []
@@ -0,0 +1,60 @@
+import math
+import numpy as np
+import pandas as pd
+from birdgame.datasources.cachedtestdata import load_test_data_columns, cached_test_data_batches
+from birdgame.datasources.remotetestdata import remote_test_data_generator
+
+
+def write_feed_csv(path, n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    time = math.pi * (80 + np.cumsum(rng.choice([0.0, 0.01, 0.05], size=n)) + rng.normal(scale=0.02, size=n))
+    pd.DataFrame({
+        'time': time,
+        'falcon_location': rng.normal(size=n),
+        'dove_location': np.cumsum(rng.normal(size=n)),
+        'falcon_id': rng.integers(0, 12, size=n),
+    }).to_csv(path, index=False)
+
+
+def iterrows_reference(path, start_time, max_rows=None, chunksize=1000):
+    """ The original iterrows-based generator, reading from a local file. """
+    prev_time = start_time
+    row_count = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for k, row in chunk.iterrows():
+            if max_rows is not None and row_count >= max_rows:
+                return
+            if k > 500:
+                row['time'] = row['time'] / math.pi
+                if row['time'] > prev_time:
+                    prev_time = row['time']
+                    row_count += 1
+                    yield row.to_dict()
+
+
+def test_cached_generator_matches_iterrows(tmp_path):
+    path = str(tmp_path / 'bird_feed_data.csv')
+    write_feed_csv(path)
+    for start_time, max_rows in [(0, None), (85, None), (85, 100)]:
+        expected = list(iterrows_reference(path, start_time, max_rows))
+        for _ in range(2):  # second pass reads the memory-mapped cache
+            got = list(remote_test_data_generator(start_time=start_time, max_rows=max_rows, path=path))
+            assert len(got) == len(expected) > 0
+            for a, b in zip(got, expected):
+                assert list(a) == list(b)
+                assert all(a[k] == b[k] for k in a)
+
+
+def test_batches_and_cache_invalidation(tmp_path):
+    path = str(tmp_path / 'bird_feed_data.csv')
+    write_feed_csv(path)
+    columns = load_test_data_columns(path, start_time=0)
+    assert isinstance(columns['time'], np.memmap)
+    assert np.all(np.diff(columns['time']) > 0)
+
+    batches = list(cached_test_data_batches(path, batch_size=64, start_time=0))
+    assert all(len(b['time']) <= 64 for b in batches)
+    assert np.array_equal(np.concatenate([b['dove_location'] for b in batches]), columns['dove_location'])
+
+    write_feed_csv(path, n=3000, seed=1)
+    assert len(load_test_data_columns(path, start_time=0)['time']) != len(columns['time'])
@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from birdgame.datasources.feedhub import FeedHub, SharedRing, Subscription
+from birdgame.datasources.feedrecorder import payload_to_record
+from birdgame.datasources.simulateddata import simulated_data_generator
+
+
+def _count_payloads(payloads, results):
+    results.put([payload['time'] for payload in payloads])
+
+
+def test_callbacks_and_queue_see_every_payload():
+    payloads = list(simulated_data_generator(500, seed=0))
+    hub = FeedHub(iter(payloads))
+    seen = []
+    hub.subscribe_callback(seen.append, name='callback')
+    hub.subscribe_callback(lambda payload: 1 / 0, name='broken')
+    queue = hub.subscribe_queue(maxsize=10, policy='block', name='queue')
+
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(queue))
+    consumer.start()
+    hub.run()
+    consumer.join(5)
+
+    assert seen == payloads
+    assert received == payloads
+    metrics = hub.metrics()
+    assert metrics['broken']['errors'] == 500
+    assert metrics['queue']['delivered'] == 500 and metrics['queue']['lag'] == 0
+    assert metrics['queue']['max_lag'] <= 10
+
+
+@pytest.mark.parametrize('policy', ['drop', 'conflate'])
+def test_slow_queue_consumer_does_not_block_the_hub(policy):
+    payloads = list(simulated_data_generator(100, seed=1))
+    hub = FeedHub(iter(payloads))
+    queue = hub.subscribe_queue(maxsize=10, policy=policy)
+    hub.run()  # Nobody consumes, so the queue fills up
+
+    received = list(queue)
+    metrics = hub.metrics()['subscriber-0']
+    assert len(received) == 10
+    # Dropping keeps the oldest payloads, conflating keeps the latest
+    assert received == (payloads[:10] if policy == 'drop' else payloads[-10:])
+    assert metrics['published'] == 100 and metrics['delivered'] == 10 and metrics['lag'] == 0
+    assert metrics['dropped' if policy == 'drop' else 'conflated'] == 90
+
+
+def test_process_subscriber():
+    import multiprocessing
+    payloads = list(simulated_data_generator(3000, seed=2))
+    results = multiprocessing.Queue()
+    hub = FeedHub(iter(payloads))
+    hub.subscribe_process(_count_payloads, args=(results,), capacity=256, name='worker')
+    hub.start()
+    hub.join(30)
+    times = results.get(timeout=30)
+    hub.release()
+
+    assert times == [payload['time'] for payload in payloads]
+    metrics = hub.metrics()['worker']
+    assert metrics['published'] == 3000 and metrics['delivered'] == 3000 and metrics['lag'] == 0
+
+
+def test_ring_conflation_skips_to_latest():
+    payloads = list(simulated_data_generator(50, seed=3))
+    ring = SharedRing(8, overwrite=True)
+    for payload in payloads:
+        ring.put(payload_to_record(payload))
+    ring.close_writer()
+    received = list(ring.payloads())
+    skipped = int(ring.header[3])
+    ring.release()
+
+    assert received == payloads[-8:]
+    assert skipped == 42
+
+
+def test_stop_and_duplicate_names():
+    def endless():
+        t = 0
+        while True:
+            t += 1
+            time.sleep(0.001)
+            yield {'time': t, 'dove_location': 0.0}
+
+    hub = FeedHub(endless())
+    queue = hub.subscribe_queue(policy='conflate', name='queue')
+    with pytest.raises(ValueError):
+        hub.subscribe_queue(name='queue')
+    with pytest.raises(ValueError):
+        hub.subscribe_queue(policy='sometimes')
+    hub.start()
+    assert queue.get(timeout=5)['time'] == 1
+    hub.stop()
+    hub.join(5)
+    assert not hub.thread.is_alive()
+    assert queue.closed
+
+
+def test_incomplete_subscription_cannot_be_created():
+    class Incomplete(Subscription):
+        def publish(self, payload):
+            self.published += 1
+
+    with pytest.raises(TypeError):
+        Incomplete('incomplete')
@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pytest
+from birdgame.datasources import feedrecorder
+from birdgame.datasources.feedrecorder import (FeedRecorder, RECORD_DTYPE, load_segment, record_feed,
+                                               recorded_feed_batches, recorded_feed_generator, segment_paths)
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+
+
+def test_round_trip_with_rotation(tmp_path):
+    payloads = list(simulated_data_generator(1000, seed=0))
+    segment_bytes = 16 + 300 * RECORD_DTYPE.itemsize
+    passed = list(record_feed(iter(payloads), str(tmp_path), max_segment_bytes=segment_bytes, buffer_size=64))
+    assert passed == payloads
+
+    paths = segment_paths(str(tmp_path))
+    assert [len(load_segment(path)) for path in paths] == [300, 300, 300, 100]
+    assert list(recorded_feed_generator(str(tmp_path))) == payloads
+
+    batches = list(recorded_feed_batches(str(tmp_path), batch_size=128, max_rows=500))
+    assert sum(len(b['time']) for b in batches) == 500
+    assert isinstance(batches[0]['time'], np.memmap)  # Views into the segment, not copies
+    assert np.array_equal(np.concatenate([b['falcon_id'] for b in batches]),
+                          [p['falcon_id'] for p in payloads[:500]])
+
+
+def test_missing_fields_and_partial_record(tmp_path):
+    directory = str(tmp_path)
+    with FeedRecorder(directory) as recorder:
+        recorder.write({'time': 1, 'dove_location': 2.0, 'falcon_location': 3.0, 'falcon_id': 4})
+        recorder.write({'time': 2, 'dove_location': 2.5})
+    # A crash in the middle of a record leaves a partial record at the end of the segment
+    with open(segment_paths(directory)[0], 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    assert list(recorded_feed_generator(directory)) == [
+        {'time': 1.0, 'falcon_location': 3.0, 'dove_location': 2.0, 'falcon_id': 4},
+        {'time': 2.0, 'dove_location': 2.5},
+    ]
+
+
+def test_recording_resumes_numbering_and_closes_early(tmp_path):
+    directory = str(tmp_path)
+    gen = record_feed(simulated_data_generator(100, seed=1), directory)
+    first = [next(gen) for _ in range(10)]
+    gen.close()  # The consumer stops early, the recording is still complete
+    list(record_feed(simulated_data_generator(5, seed=2), directory))
+
+    paths = segment_paths(directory)
+    assert [os.path.basename(p) for p in paths] == ['feed-000000.bin', 'feed-000001.bin']
+    assert list(recorded_feed_generator(directory, max_rows=10)) == first
+
+
+def test_slow_feed_reaches_disk_before_the_buffer_fills(tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(feedrecorder.time, 'monotonic', lambda: clock[0])
+    payloads = list(simulated_data_generator(10, seed=0))
+    recorder = FeedRecorder(str(tmp_path), buffer_size=1000, fsync_interval=5.0)
+    for payload in payloads[:5]:
+        recorder.write(payload)
+    assert recorder.file is None and len(recorder.buffer) == 5  # Buffered, no fsync due yet
+
+    clock[0] += 5.0
+    recorder.write(payloads[5])
+    assert recorder.buffer == [] and recorder.last_fsync == clock[0]
+    assert list(recorded_feed_generator(str(tmp_path))) == payloads[:6]
+    recorder.close()
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'feed-000000.bin'
+    path.write_bytes(b'not a segment at all')
+    with pytest.raises(ValueError):
+        load_segment(str(path))
+
+
+def test_replay_into_test_run(tmp_path, capsys):
+    list(record_feed(simulated_data_generator(300, seed=3), str(tmp_path)))
+    EMWAVarTracker(horizon=3).test_run(data=recorded_feed_generator(str(tmp_path)), step_print=100)
+    assert 'Ratio' in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import time
+import pytest
+import redis
+from birdgame.config.getredisconfig import get_redis_config, set_redis_config
+from birdgame.datasources.livedata import live_data_generator
+from birdgame.datasources.replayserver import ReplayServer
+from birdgame.datasources.simulateddata import simulated_data_generator
+
+
+@pytest.fixture
+def server():
+    with ReplayServer() as server:
+        set_redis_config(server.redis_config())
+        try:
+            yield server
+        finally:
+            set_redis_config(None)
+
+
+def test_live_data_generator_reads_replay(server):
+    payloads = list(simulated_data_generator(500, seed=0))
+    assert server.replay(iter(payloads), rate=None).result() == 500
+    assert list(live_data_generator(start_from_latest=False, max_rows=500)) == payloads
+
+
+def test_replay_rate(server):
+    payloads = list(simulated_data_generator(21, seed=1, irregular=False, mean_dt=0.1))
+    start = time.monotonic()
+    server.replay(iter(payloads), rate=5).result()
+    assert 0.35 <= time.monotonic() - start < 2.0  # 2 seconds of feed time at 5x
+
+
+def test_reconnects_after_dropped_connections(server):
+    payloads = list(simulated_data_generator(300, seed=2))
+    server.replay(iter(payloads[:100]), rate=None).result()
+    gen = live_data_generator(start_from_latest=False, max_rows=300)
+    received = [next(gen) for _ in range(100)]
+
+    server.drop_connections()
+    server.replay(iter(payloads[100:]), rate=None).result()
+    received += list(gen)
+    assert received == payloads
+
+
+def test_stream_commands(server):
+    client = redis.Redis(**server.redis_config())
+    assert client.ping()
+    assert client.xadd('other', {'a': 1}, id='5-1') == '5-1'
+    with pytest.raises(redis.exceptions.ResponseError):
+        client.xadd('other', {'a': 2}, id='5-1')
+    for i in range(10):
+        client.xadd('other', {'a': i}, maxlen=4, approximate=False)
+    assert client.xlen('other') == 4
+    assert [fields['a'] for _, fields in client.xrange('other')] == ['6', '7', '8', '9']
+    assert client.xread({'other': '$'}, block=50) == []
+    with pytest.raises(redis.exceptions.ResponseError):
+        redis.Redis(host=server.host, port=server.port, protocol=3).ping()
+
+
+def test_live_data_generator_reads_replay_configured_by_environment(monkeypatch):
+    with ReplayServer() as server:
+        monkeypatch.setenv('BIRDGAME_REDIS_HOST', server.host)
+        monkeypatch.setenv('BIRDGAME_REDIS_PORT', str(server.port))
+        payloads = list(simulated_data_generator(200, seed=3))
+        server.replay(iter(payloads), rate=None).result()
+        assert list(live_data_generator(start_from_latest=False, max_rows=200)) == payloads
+
+
+def test_config_override(monkeypatch):
+    assert get_redis_config()['port'] == 6381
+    monkeypatch.setenv('BIRDGAME_REDIS_HOST', 'localhost')
+    assert get_redis_config() == {'host': 'localhost', 'port': 6379, 'decode_responses': True, 'protocol': 2}
+    set_redis_config({'host': 'elsewhere', 'port': 1})
+    try:
+        assert get_redis_config() == {'host': 'elsewhere', 'port': 1}
+    finally:
+        set_redis_config(None)
@@ -0,0 +1,44 @@
+import numpy as np
+from birdgame.datasources.simulateddata import FEED_COLUMNS, simulated_data_batches, simulated_data_generator
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+
+
+def concatenate(batches):
+    batches = list(batches)
+    return {name: np.concatenate([b[name] for b in batches]) for name in batches[0]}
+
+
+def test_batches_match_feed_layout():
+    data = concatenate(simulated_data_batches(2500, batch_size=300, seed=2, start_time=90.0, n_falcons=5))
+    assert list(data) == FEED_COLUMNS
+    assert all(len(values) == 2500 for values in data.values())
+    assert data['time'][0] > 90.0 and (np.diff(data['time']) > 0).all()
+    assert set(data['falcon_id'].tolist()) == set(range(5))
+    for falcon_id in range(5):
+        assert len(set(data['falcon_wingspan'][data['falcon_id'] == falcon_id].tolist())) == 1
+
+
+def test_reproducible_for_any_batch_size():
+    one = concatenate(simulated_data_batches(1001, batch_size=1001, seed=3))
+    many = concatenate(simulated_data_batches(1001, batch_size=77, seed=3))
+    for name in FEED_COLUMNS:
+        assert np.array_equal(one[name], many[name])
+
+
+def test_regular_timestamps():
+    data = concatenate(simulated_data_batches(10, seed=0, irregular=False, mean_dt=0.5))
+    assert np.allclose(data['time'], 0.5 * np.arange(1, 11))
+
+
+def test_generator_replays_through_trackers():
+    records = list(simulated_data_generator(400, batch_size=64, seed=4))
+    assert list(records[0]) == FEED_COLUMNS
+    assert isinstance(records[0]['falcon_id'], int)
+
+    tracker, batch_tracker = EMWAVarTracker(horizon=3), EMWAVarTracker(horizon=3)
+    for payload in records:
+        tracker.tick(payload, {})
+    data = concatenate(simulated_data_batches(400, batch_size=64, seed=4))
+    batch_tracker.tick_batch(data['time'], data['dove_location'])
+    assert batch_tracker.count == tracker.count > 0
+    assert batch_tracker.predict() == tracker.predict()
@@ -1,5 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.autoetstracker import AutoETSConstants, AutoETSsktimeTracker
 
-from birdgame.examples.derived.autoetstracker import AutoETSsktimeTracker
+
+class StubForecaster:
+    """ Picklable stand-in for an sktime forecaster: predicts the variance of the series it was fitted on. """
+
+    def clone(self):
+        return StubForecaster()
+
+    def fit(self, y, fh=None):
+        self.y_ = np.array(y)
+        return self
+
+    def predict_var(self, fh=None):
+        return pd.DataFrame([[float(np.var(self.y_))]])
 
 
 
@@ -10,4 +27,38 @@ def test_autoets_test_run():
             max_rows=1000,
             live=False, # Set to True to use live streaming data; set to False to use data from a CSV file
             step_print=1000 # Print the score and progress every 1000 steps
-        )
\ No newline at end of file
+        )
+
+
+@pytest.mark.skipif(AutoETSsktimeTracker is None, reason="needs sktime")
+def test_autoets_sync_retrain_fits_on_a_copy(monkeypatch):
+    monkeypatch.setattr(AutoETSConstants, 'USE_THREADING', False)
+    tracker = AutoETSsktimeTracker()
+    retrain, shared = tracker._retrain_model_sync, []
+
+    def checked_retrain(y):
+        shared.append(np.shares_memory(y, tracker.last_observed_data._data))
+        retrain(y)
+
+    tracker._retrain_model_sync = checked_retrain
+    for payload in simulated_data_generator(200, seed=0):
+        prediction = tracker.tick_and_predict(payload, {})
+    assert shared and not any(shared)  # Retrained, never on a view of the ring buffer
+    assert prediction['components'][0]['density']['params']['scale'] > 1e-6
+
+
+@pytest.mark.skipif(AutoETSsktimeTracker is None, reason="needs sktime")
+def test_autoets_process_pool_retrain(monkeypatch):
+    monkeypatch.setattr(AutoETSConstants, 'USE_THREADING', True)
+    monkeypatch.setattr(AutoETSConstants, 'USE_PROCESS_POOL', True)
+    tracker = AutoETSsktimeTracker()
+    tracker._forecaster_template = StubForecaster()  # Fitted in a worker process, so it has to pickle
+    for payload in simulated_data_generator(200, seed=0):
+        tracker.tick_and_predict(payload, {})
+    assert tracker.retrain_executor.wait(timeout=60)
+    tracker.close()
+
+    metrics = tracker.retrain_executor.metrics()
+    assert metrics['completed'] >= 1 and metrics['failed'] == 0
+    assert isinstance(tracker.forecaster, StubForecaster)
+    assert tracker.scale == pytest.approx(np.std(tracker.forecaster.y_))
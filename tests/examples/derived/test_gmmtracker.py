@@ -1,5 +1,11 @@
+import gc
+import pickle
+import weakref
+import numpy as np
+import pytest
 
 from birdgame.examples.derived.gmmtracker import GMMTracker
+from birdgame.examples.derived.volscaledgmmtracker import VolScaledGMMTracker
 
 
 if GMMTracker is not None:
@@ -10,4 +16,76 @@ if GMMTracker is not None:
             max_rows=1000,
             live=False, # Set to True to use live streaming data; set to False to use data from a CSV file
             step_print=1000 # Print the score and progress every 1000 steps
-        )
\ No newline at end of file
+        )
+
+    def _feed(tracker, n, seed=0):
+        from birdgame.datasources.simulateddata import simulated_data_generator
+        for payload in simulated_data_generator(n, seed=seed, mean_dt=0.1):
+            tracker.tick(payload, {})
+        return tracker
+
+    def test_background_and_sync_refits():
+        sync = _feed(GMMTracker(batch_size=300, burn_in=500, fit_mode='sync'), 3000)
+        background = _feed(GMMTracker(batch_size=300, burn_in=500, fit_mode='background'), 3000)
+        assert background.wait_for_refit(timeout=30)
+        assert sync.refit_count == len(sync.x_changes) // 300
+        assert 1 <= background.refit_count <= sync.refit_count  # Requests made during a fit are coalesced
+        assert sync.gmm.n_iter_ < 20  # Warm started from the previous fit
+        for tracker in (sync, background):
+            prediction = tracker.predict()
+            assert len(prediction["components"]) == 2
+            assert abs(sum(c["weight"] for c in prediction["components"]) - 1) < 1e-6
+
+    def test_pickle_round_trip():
+        for tracker in (_feed(GMMTracker(batch_size=300, burn_in=500, fit_mode='background'), 2000),
+                        _feed(VolScaledGMMTracker(gmm_tracker=GMMTracker(batch_size=300, burn_in=500,
+                                                                         fit_mode='background')), 2000)):
+            gmm_tracker = getattr(tracker, 'gmm_tracker', tracker)
+            assert gmm_tracker.wait_for_refit(timeout=30)
+            copy = pickle.loads(pickle.dumps(tracker))
+            copied_gmm_tracker = getattr(copy, 'gmm_tracker', copy)
+            assert copied_gmm_tracker._worker_thread.is_alive()
+            assert copy.predict() == tracker.predict()
+            _feed(tracker, 1000, seed=1)
+            _feed(copy, 1000, seed=1)
+            assert copied_gmm_tracker.wait_for_refit(timeout=30) and gmm_tracker.wait_for_refit(timeout=30)
+            assert copied_gmm_tracker.refit_count > 0
+            assert copy.count == tracker.count
+
+    def test_background_worker_stops():
+        tracker = _feed(GMMTracker(batch_size=300, burn_in=500, fit_mode='background'), 2000)
+        thread = tracker._worker_thread
+        assert tracker.wait_for_refit(timeout=30) and tracker.refit_count > 0
+        tracker.close(timeout=30)
+        assert not thread.is_alive()
+        refit_count = tracker.refit_count
+        _feed(tracker, 600, seed=1)
+        assert tracker.refit_count > refit_count  # Refits are made in tick once closed
+
+        tracker = _feed(GMMTracker(batch_size=300, burn_in=500, fit_mode='background'), 2000)
+        thread, tracker_ref = tracker._worker_thread, weakref.ref(tracker)
+        del tracker
+        gc.collect()
+        thread.join(timeout=30)
+        assert tracker_ref() is None and not thread.is_alive()  # The worker does not keep the tracker alive
+
+    def test_online_em_recovers_mixture():
+        rng = np.random.default_rng(1)
+        n = 50_000
+        wide = rng.random(n) < 0.2
+        x_changes = np.where(wide, rng.normal(0.0, 1.0, n), rng.normal(0.0, 0.1, n))
+        tracker = GMMTracker(fit_mode='online', batch_size=100, window_len=20_000)
+        for x_change in x_changes.tolist():
+            tracker._online_update(x_change)
+        weights, means, stds, _ = tracker.gmm_params
+        order = np.argsort(stds)
+        assert np.allclose(stds[order], [0.1, 1.0], rtol=0.15)
+        assert np.allclose(weights[order], [0.8, 0.2], atol=0.05)
+        assert np.allclose(means, 0.0, atol=0.1)
+
+    def test_online_tracker_predicts():
+        tracker = _feed(GMMTracker(fit_mode='online', batch_size=100, burn_in=500), 2000)
+        prediction = tracker.predict()
+        assert tracker.is_fitted and len(prediction["components"]) == 2
+        with pytest.raises(ValueError):
+            GMMTracker(fit_mode='eventually')
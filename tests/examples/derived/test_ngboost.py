@@ -1,5 +1,25 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.ngboosttracker import NGBoostConstants, NGBoostTracker
 
-from birdgame.examples.derived.ngboosttracker import NGBoostTracker
+try:
+    from sklearn.base import BaseEstimator
+except ImportError:
+    BaseEstimator = object
+
+
+class StubNGBoost(BaseEstimator):
+    """ Picklable stand-in for NGBoost: predicts the standard deviation of the targets it was fitted on. """
+
+    def fit(self, X, y):
+        self.n_rows_ = len(X)
+        self.scale_ = float(np.std(y))
+        return self
+
+    def pred_dist(self, X):
+        return SimpleNamespace(scale=np.full(len(X), self.scale_))
 
 
 
@@ -10,4 +30,38 @@ def test_ngboost_test_run():
             max_rows=1000,
             live=False, # Set to True to use live streaming data; set to False to use data from a CSV file
             step_print=1000 # Print the score and progress every 1000 steps
-        )
\ No newline at end of file
+        )
+
+
+@pytest.mark.skipif(NGBoostTracker is None, reason="needs ngboost")
+def test_ngboost_sync_retrain_fits_on_copies(monkeypatch):
+    monkeypatch.setattr(NGBoostConstants, 'USE_THREADING', False)
+    tracker = NGBoostTracker()
+    retrain, shared = tracker._retrain_model_sync, []
+
+    def checked_retrain(X, y):
+        shared.append(np.shares_memory(X, tracker.xi_data._data) or np.shares_memory(y, tracker.yi_data._data))
+        retrain(X, y)
+
+    tracker._retrain_model_sync = checked_retrain
+    for payload in simulated_data_generator(500, seed=0):
+        prediction = tracker.tick_and_predict(payload, {})
+    assert shared and not any(shared)  # Retrained, never on views of the ring buffers
+    assert prediction['components'][0]['density']['params']['scale'] > 1e-6
+
+
+@pytest.mark.skipif(NGBoostTracker is None, reason="needs ngboost")
+def test_ngboost_process_pool_retrain(monkeypatch):
+    monkeypatch.setattr(NGBoostConstants, 'USE_THREADING', True)
+    monkeypatch.setattr(NGBoostConstants, 'USE_PROCESS_POOL', True)
+    tracker = NGBoostTracker()
+    tracker._model_template = StubNGBoost()  # Fitted in a worker process, so it has to pickle
+    for payload in simulated_data_generator(500, seed=0):
+        tracker.tick_and_predict(payload, {})
+    assert tracker.retrain_executor.wait(timeout=60)
+    tracker.close()
+
+    metrics = tracker.retrain_executor.metrics()
+    assert metrics['completed'] >= 1 and metrics['failed'] == 0
+    assert isinstance(tracker.model, StubNGBoost) and tracker.model.n_rows_ > tracker.window_size
+    assert tracker.predict()['components'][0]['density']['params']['scale'] == max(tracker.model.scale_, 1e-6)
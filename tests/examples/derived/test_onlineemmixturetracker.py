@@ -0,0 +1,21 @@
+import numpy as np
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.onlineemmixturetracker import OnlineEMMixtureTracker
+
+
+def test_tracker_predicts_the_online_mixture():
+    tracker = OnlineEMMixtureTracker(n_components=3, burn_in=200)
+    for payload in simulated_data_generator(2000, seed=0, mean_dt=0.1):
+        tracker.tick(payload, {})
+        prediction = tracker.predict()
+        if tracker.count < tracker.burn_in:
+            assert prediction == tracker.fallback.predict()
+    assert tracker.count > tracker.burn_in
+
+    weights, means, stds = tracker.em.get()
+    components = prediction["components"]
+    assert len(components) == 3
+    assert abs(sum(c["weight"] for c in components) - 1) < 1e-9
+    assert np.allclose([c["density"]["params"]["loc"] for c in components], tracker.current_x + means)
+    assert np.allclose([c["density"]["params"]["scale"] for c in components], stds)
+    assert tracker.em.count == tracker.count  # One EM step per difference, nothing buffered
@@ -0,0 +1,54 @@
+import numpy as np
+from birdgame.stats.fewvar import FEWVar
+from birdgame.stats.fewmean import FEWMean
+from birdgame.stats.fewvarbank import FEWVarBank
+from birdgame.stats.fewmeanbank import FEWMeanBank
+
+FADING_FACTORS = [0.0001, 0.001, 0.01, 0.1, 0.5]
+
+
+def test_fewvarbank_matches_fewvars():
+    rng = np.random.default_rng(0)
+    bank = FEWVarBank(FADING_FACTORS)
+    fewvars = [FEWVar(fading_factor=f) for f in FADING_FACTORS]
+    for x in rng.standard_t(df=3, size=2000).tolist():
+        bank.update(x)
+        for v in fewvars:
+            v.update(x)
+        assert np.array_equal(bank.get_var(), [v.get_var() for v in fewvars])
+        assert np.array_equal(bank.get_mean(), [v.get_mean() for v in fewvars])
+
+    restored = FEWVarBank.from_dict(bank.to_dict())
+    assert [v.to_dict() for v in restored.to_fewvars()] == [v.to_dict() for v in fewvars]
+    assert np.array_equal(FEWVarBank.from_fewvars(fewvars).get_var(), bank.get_var())
+
+
+def test_fewvarbank_streams_with_gaps():
+    rng = np.random.default_rng(1)
+    n_streams = 3
+    bank = FEWVarBank(FADING_FACTORS, n_streams=n_streams)
+    fewvars = [[FEWVar(fading_factor=f) for f in FADING_FACTORS] for _ in range(n_streams)]
+    for row in rng.normal(size=(500, n_streams)):
+        row[rng.uniform(size=n_streams) < 0.2] = np.nan
+        bank.update(row)
+        for x, stream in zip(row.tolist(), fewvars):
+            if not np.isnan(x):
+                for v in stream:
+                    v.update(x)
+    assert [[v.to_dict() for v in stream] for stream in bank.to_fewvars()] == \
+           [[v.to_dict() for v in stream] for stream in fewvars]
+
+
+def test_fewmeanbank_matches_fewmeans():
+    rng = np.random.default_rng(2)
+    bank = FEWMeanBank(FADING_FACTORS, n_streams=2)
+    fewmeans = [[FEWMean(fading_factor=f) for f in FADING_FACTORS] for _ in range(2)]
+    for row in rng.normal(size=(1000, 2)):
+        bank.update(row)
+        for x, stream in zip(row.tolist(), fewmeans):
+            for m in stream:
+                m.update(x)
+    assert np.array_equal(bank.get_mean(), [[m.get() for m in stream] for stream in fewmeans])
+    restored = FEWMeanBank.from_dict(bank.to_dict())
+    assert [[m.to_dict() for m in stream] for stream in restored.to_fewmeans()] == \
+           [[m.to_dict() for m in stream] for stream in fewmeans]
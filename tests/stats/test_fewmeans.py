@@ -68,5 +68,19 @@ def test_jumps():
 
     assert fm_mse < sm_mse
 
+
+def test_to_dict_round_trip_keeps_var_and_buffer_size():
+    fm = FEWMeans(fading_factors=[0.01, 0.1], var_fading_factor=0.05, buffer_size=8)
+    for x in np.random.default_rng(0).normal(size=50):
+        fm.update(x)
+    restored = FEWMeans.from_dict(fm.to_dict())
+    assert restored.get_var() == fm.get_var() and restored.var.fading_factor == 0.05
+    assert all(e.maxlen == 8 for e in restored.errors)
+    for x in [0.3, -1.2, 2.0]:
+        fm.update(x)
+        restored.update(x)
+        assert restored.get() == fm.get() and restored.get_var() == fm.get_var()
+
+
 if __name__ == "__main__":
-    test_jumps()
\ No newline at end of file
+    test_jumps()
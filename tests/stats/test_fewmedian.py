@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from birdgame.stats.fewmedian import FEWMedian
+
+
+@pytest.mark.parametrize("window_size", [1, 2, 6, 57])
+@pytest.mark.parametrize("quantile", [0.0, 0.1, 0.5, 0.9, 1.0])
+def test_backends_match_numpy_quantile(window_size, quantile):
+    rng = np.random.default_rng(0)
+    xs = np.round(rng.normal(size=2000) * 3).tolist()  # plenty of duplicates
+    sorted_filter = FEWMedian(window_size=window_size, quantile=quantile)
+    heap_filter = FEWMedian(window_size=window_size, quantile=quantile, backend='heaps')
+    for i, x in enumerate(xs):
+        sorted_filter.update(x)
+        heap_filter.update(x)
+        expected = np.quantile(xs[max(0, i + 1 - window_size):i + 1], quantile)
+        assert sorted_filter.get() == heap_filter.get() == pytest.approx(expected, abs=1e-12)
+
+
+def test_median_unchanged_and_round_trip():
+    data_stream = [10, 11, 12, 100, 11, 13, 200, 14, 9, 15, 16, 300, 10]
+    median_filter = FEWMedian(window_size=4)
+    heap_filter = FEWMedian(window_size=4, backend='heaps')
+    for i, x in enumerate(data_stream):
+        median = np.median(data_stream[max(0, i - 3):i + 1])
+        assert median_filter.update(x).get() == heap_filter.update(x).get() == median
+
+    restored = FEWMedian.from_dict(heap_filter.to_dict())
+    assert restored.to_dict() == heap_filter.to_dict()
+    assert restored.update(1).get() == heap_filter.update(1).get()
@@ -0,0 +1,48 @@
+import random
+import numpy as np
+from birdgame.stats.jumpdiffusion import jump_diffusion, jump_diffusion_paths, jump_diffusion_chunks
+
+
+def test_seeded_paths_are_reproducible():
+    paths = jump_diffusion_paths(500, n_paths=4, jump_rate=0.05, jump_size=3.0, seed=7)
+    assert paths.shape == (4, 500)
+    assert np.array_equal(paths, jump_diffusion_paths(500, n_paths=4, jump_rate=0.05, jump_size=3.0, seed=7))
+    assert not np.array_equal(paths, jump_diffusion_paths(500, n_paths=4, jump_rate=0.05, jump_size=3.0, seed=8))
+    assert not np.array_equal(paths[0], paths[1])
+    assert jump_diffusion(100, jump_rate=0.01, jump_size=1.0, seed=3) == jump_diffusion_paths(
+        100, jump_rate=0.01, jump_size=1.0, seed=3)[0].tolist()
+
+
+def test_unseeded_series_follows_the_global_random_state():
+    def seeded_globally():
+        random.seed(11)
+        np.random.seed(11)
+        return jump_diffusion(200, jump_rate=0.05, jump_size=2.0)
+
+    assert seeded_globally() == seeded_globally()
+    assert seeded_globally() != jump_diffusion(200, jump_rate=0.05, jump_size=2.0)
+
+
+def test_chunks_concatenate_to_paths():
+    dt = np.random.default_rng(0).exponential(size=1000)
+    paths, latent = jump_diffusion_paths(1000, n_paths=3, seed=5, dt=dt, return_latent=True)
+    chunks = list(jump_diffusion_chunks(1000, chunk_size=33, n_paths=3, seed=5, dt=dt, return_latent=True))
+    assert [c[0].shape[1] for c in chunks][-2:] == [33, 1000 % 33]
+    assert np.array_equal(np.concatenate([c[0] for c in chunks], axis=1), paths)
+    assert np.array_equal(np.concatenate([c[1] for c in chunks], axis=1), latent)
+
+
+def test_increments_scale_with_dt():
+    dt = np.where(np.arange(200_000) % 2, 4.0, 1.0)
+    _, latent = jump_diffusion_paths(200_000, jump_rate=0.0, sigma=0.5, drift=0.1, seed=1, dt=dt,
+                                     return_latent=True)
+    increments = np.diff(latent[0], prepend=0.0)
+    for step_dt in [1.0, 4.0]:
+        selected = increments[dt == step_dt]
+        assert abs(selected.mean() - 0.1 * step_dt) < 0.02
+        assert abs(selected.var() / (0.25 * step_dt) - 1) < 0.02
+
+
+def test_empty():
+    assert jump_diffusion_paths(0, n_paths=2).shape == (2, 0)
+    assert jump_diffusion(0, jump_rate=0.1, jump_size=1.0) == []
@@ -0,0 +1,42 @@
+import math
+import numpy as np
+import pytest
+from birdgame.stats.onlineem import OnlineEMMixture
+
+
+def test_recovers_mixture_and_round_trips():
+    rng = np.random.default_rng(1)
+    n = 50_000
+    wide = rng.random(n) < 0.2
+    xs = np.where(wide, rng.normal(0.0, 1.0, n), rng.normal(0.0, 0.1, n))
+    em = OnlineEMMixture(n_components=2, fading_factor=5e-5)
+    em.update_many(xs[:n // 2])
+
+    restored = OnlineEMMixture.from_dict(em.to_dict())
+    em.update_many(xs[n // 2:])
+    restored.update_many(xs[n // 2:])
+    for a, b in zip(em.get(), restored.get()):
+        assert np.array_equal(a, b)
+
+    weights, means, stds = em.get()
+    order = np.argsort(stds)
+    assert np.allclose(stds[order], [0.1, 1.0], rtol=0.15)
+    assert np.allclose(weights[order], [0.8, 0.2], atol=0.05)
+    assert np.allclose(means, 0.0, atol=0.1)
+
+    x = 0.3
+    expected = sum(w * math.exp(-0.5 * ((x - m) / s) ** 2) / (s * math.sqrt(2 * math.pi))
+                   for w, m, s in zip(weights, means, stds))
+    assert em.log_pdf(x) == pytest.approx(math.log(expected))
+
+
+def test_forgets_old_regime():
+    rng = np.random.default_rng(2)
+    em = OnlineEMMixture(n_components=3, fading_factor=1e-3)
+    em.update_many(rng.normal(0.0, 1.0, 20_000))
+    em.update_many(rng.normal(0.0, 5.0, 20_000))
+    weights, means, stds = em.get()
+    assert math.sqrt(np.dot(weights, stds ** 2 + means ** 2)) == pytest.approx(5.0, rel=0.1)
+    assert em.get() is not None and OnlineEMMixture().get() is None
+    with pytest.raises(ValueError):
+        OnlineEMMixture(fading_factor=0.0)
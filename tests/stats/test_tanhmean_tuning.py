@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from birdgame.stats.tanhmean import TanhMean
+from birdgame.stats.tanhmeantuning import tune_tanhmean
+from birdgame.stats.jumpdiffusion import jump_diffusion
+
+GRIDS = {
+    "alpha": [0.1, 0.3],
+    "mean_fading_factor": [0.01, 0.1, 0.5],
+    "var_fading_factor": [0.01, 0.2],
+}
+
+
+def series():
+    return np.asarray(jump_diffusion(1500, jump_rate=0.01, jump_size=5.0, epsilon=0.3, vega=2.0, seed=1))
+
+
+def test_apply_series_keeps_var_fading_factor():
+    xs = series()
+    slow, fast = TanhMean(var_fading_factor=0.01), TanhMean(var_fading_factor=0.5)
+    assert slow.apply_series(xs) != fast.apply_series(xs)
+    assert fast.var_fading_factor == 0.5
+    assert TanhMean(**fast.get_params()).get_params() == fast.get_params()
+
+
+def test_exhaustive_search_ranks_every_combination():
+    xs = series()
+    results = tune_tanhmean(xs, param_grids=GRIDS, max_workers=1)
+    assert len(results) == 12
+    assert results['metric'].is_monotonic_increasing
+    for _, row in results.iterrows():
+        params = {k: row[k] for k in GRIDS}
+        assert row['metric'] == TanhMean(**params).apply_series(xs)
+        assert row['length'] == len(xs) and row['seconds'] > 0
+
+
+def test_process_pool_matches_in_process():
+    xs = series()
+    sequential = tune_tanhmean(xs, param_grids=GRIDS, halving_rounds=1, eta=2, max_workers=1)
+    parallel = tune_tanhmean(xs, param_grids=GRIDS, halving_rounds=1, eta=2, max_workers=2)
+    columns = list(GRIDS) + ['metric', 'rung', 'length']
+    pd.testing.assert_frame_equal(sequential[columns], parallel[columns])
+
+
+def test_successive_halving_prunes():
+    xs = series()
+    results = tune_tanhmean(xs, param_grids=GRIDS, halving_rounds=2, eta=2, max_workers=1)
+    assert list(results['rung'].value_counts().sort_index()) == [6, 3, 3]
+    assert (results.loc[:2, 'length'] == len(xs)).all()
+    assert results.loc[0, 'metric'] == results.loc[results['rung'] == 2, 'metric'].min()
+
+
+def test_fit_to_simulation_sets_best_params():
+    tm = TanhMean(outlier_fading_factor=0.2)
+    best = tm.fit_to_simulation(n_sim=600, param_grids=GRIDS, max_workers=1)
+    assert best == tm.get_params()
+    assert best['outlier_fading_factor'] == 0.2
+    assert len(tm.tuning_results) == 12
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+import birdgame.stats.ewfilter as ewfilter
+from birdgame.stats.fewmean import FEWMean
+from birdgame.stats.fewvar import FEWVar
+from birdgame.stats.fewmedian import FEWMedian
+from birdgame.stats.tanhmean import TanhMean
+from birdgame.stats.jumpdiffusion import jump_diffusion
+
+
+def series(n=3000):
+    return np.asarray(jump_diffusion(n, jump_rate=0.01, jump_size=5.0, epsilon=0.3, vega=2.0, seed=0))
+
+
+@pytest.mark.parametrize("using_scipy", [True, False])
+@pytest.mark.parametrize("fading_factor", [0.0, 0.01, 0.5, 1.0])
+def test_fewmean_fewvar_match_repeated_update(monkeypatch, using_scipy, fading_factor):
+    monkeypatch.setattr(ewfilter, "using_scipy", using_scipy and ewfilter.using_scipy)
+    xs = series()
+    head, tail = xs[:100], xs[100:]  # update_many must also continue from an existing state
+
+    mean, var = FEWMean(fading_factor), FEWVar(fading_factor)
+    expected_means, expected_vars = [], []
+    for x in xs:
+        mean.update(x)
+        var.update(x)
+        expected_means.append(mean.get())
+        expected_vars.append(var.get())
+
+    bulk_mean, bulk_var = FEWMean(fading_factor), FEWVar(fading_factor)
+    means = np.concatenate([bulk_mean.update_many(head), bulk_mean.update_many(tail)])
+    var_means, variances = zip(bulk_var.update_many(head), bulk_var.update_many(tail))
+    assert np.allclose(means, expected_means, rtol=1e-9, atol=1e-9)
+    assert np.allclose(np.concatenate(var_means), expected_means, rtol=1e-9, atol=1e-9)
+    assert np.allclose(np.concatenate(variances), expected_vars, rtol=1e-7, atol=1e-9)
+    assert bulk_var.get() == pytest.approx(var.get(), rel=1e-7)
+    assert bulk_var.weight_sum == pytest.approx(var.weight_sum)
+
+
+def test_transform_leaves_state_unchanged():
+    var = FEWVar(0.1)
+    var.update(1.0)
+    before = var.to_dict()
+    means, variances = var.transform([2.0, 3.0])
+    assert var.to_dict() == before
+    assert len(means) == len(variances) == 2
+    assert FEWMean(0.1).update_many([]).shape == (0,)
+
+
+def test_tanhmean_matches_repeated_update():
+    xs = series()
+    reference = TanhMean(mean_fading_factor=0.05, var_fading_factor=0.02)
+    expected = []
+    for x in xs:
+        reference.update(x)
+        expected.append((reference.get_mean(), reference.get_var()))
+
+    bulk = TanhMean(mean_fading_factor=0.05, var_fading_factor=0.02)
+    means, variances = bulk.update_many(xs, chunk_size=700)
+    assert np.array_equal(means, [m for m, _ in expected])
+    assert np.array_equal(variances, [v for _, v in expected])
+    assert bulk.n == reference.n
+    assert bulk._outlier_ewa.get() == reference._outlier_ewa.get()
+
+
+def test_fewmedian_update_many():
+    xs = series(200)
+    reference = FEWMedian(window_size=7)
+    expected = [reference.update(x).get() for x in xs]
+    assert np.array_equal(FEWMedian(window_size=7).update_many(xs), expected)
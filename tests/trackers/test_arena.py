@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from birdgame import GAME_PARAMS
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.trackers.arena import Arena, tracker_names
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+from birdgame.wealth.wealth_mechanism import update_wealth
+
+
+def make_trackers():
+    return {'fast': EMWAVarTracker(fading_factor=0.01), 'default': EMWAVarTracker(),
+            'slow': EMWAVarTracker(fading_factor=0.00001)}
+
+
+def test_arena_matches_separate_evaluators_and_update_wealth():
+    payloads = list(simulated_data_generator(2000, seed=0))
+    arena = Arena(make_trackers(), warmup=100, record_every=50)
+    board = arena.run(data=iter(payloads))
+
+    evaluators = {name: TrackerEvaluator(tracker) for name, tracker in make_trackers().items()}
+    players = {name: {'wealth': GAME_PARAMS['initial_wealth']} for name in evaluators}
+    for i, payload in enumerate(payloads):
+        for evaluator in evaluators.values():
+            evaluator.tick_and_predict(payload, {})
+        update_wealth(players, {name: e.last_score for name, e in evaluators.items()}, wealth_update=i >= 100)
+
+    for name, evaluator in evaluators.items():
+        assert board.loc[name, 'log_likelihood'] == evaluator.overall_likelihood_score()
+        assert board.loc[name, 'wealth'] == players[name]['wealth']
+        assert board.loc[name, 'scores'] == evaluator.score_count
+    assert list(board['wealth']) == sorted(board['wealth'], reverse=True)
+    assert (board[['tick_p50_ms', 'tick_p99_ms', 'predict_max_ms']] >= 0).all().all()
+
+    trajectory = arena.wealth_trajectory()
+    assert trajectory.shape == (40, 3)
+    assert list(trajectory.iloc[-1]) == [players[name]['wealth'] for name in arena.names]
+    assert (trajectory.iloc[0] == GAME_PARAMS['initial_wealth']).all()  # Still warming up
+
+
+def test_sharded_run_matches_single_process():
+    payloads = list(simulated_data_generator(1500, seed=1))
+    single = Arena(make_trackers()).run(data=iter(payloads))
+    arena = Arena(make_trackers())
+    sharded = arena.run(data=iter(payloads), max_workers=2)
+
+    columns = ['scores', 'log_likelihood', 'recent_log_likelihood', 'wealth']
+    assert sharded[columns].equals(single[columns])
+    assert arena.trackers['slow'].count == single.loc['slow', 'scores']  # Trained trackers come back
+    assert arena.evaluators['fast'].latency.tick.count == 1500
+
+
+def test_tracker_names():
+    assert tracker_names([EMWAVarTracker(), EMWAVarTracker()]) == ['EMWAVarTracker_1', 'EMWAVarTracker_2']
+    assert tracker_names([EMWAVarTracker()]) == ['EMWAVarTracker']
+    with pytest.raises(ValueError):
+        Arena([])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from birdgame.trackers.mixture_scorer import pack_mixtures
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker as BenchmarkEMWAVarTracker
+from birdgame.examples.derived.ewmatracker import EMWAVarTracker
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+from birdgame.examples.derived.quantileregtracker import QuantileRegressionRiverTracker
+
+
+def synthetic_feed(n, seed=0):
+    rng = np.random.default_rng(seed)
+    times = 100 + np.cumsum(rng.choice([0.0, 0.02, 0.1, 0.5], size=n))
+    dove_locations = np.cumsum(rng.standard_t(df=3, size=n) * 0.01)
+    return times, dove_locations
+
+
+def loop_predictions(tracker, times, dove_locations):
+    predictions = []
+    for t, x in zip(times.tolist(), dove_locations.tolist()):
+        tracker.tick({'time': t, 'dove_location': x}, {})
+        predictions.append(tracker.predict())
+    return pack_mixtures(predictions)
+
+
+def assert_same_predictions(a, b):
+    for key in ["weight", "loc", "scale"]:
+        assert np.allclose(a[key], b[key], rtol=1e-12, atol=0, equal_nan=True)
+
+
+@pytest.mark.parametrize("tracker_class", [BenchmarkEMWAVarTracker, EMWAVarTracker, MixtureTracker])
+def test_vectorized_batch_matches_tick_loop(tracker_class):
+    times, dove_locations = synthetic_feed(3000)
+    expected = loop_predictions(tracker_class(), times, dove_locations)
+
+    tracker = tracker_class()
+    chunks = [slice(0, 1), slice(1, 40), slice(40, 40), slice(40, 2500), slice(2500, 3000)]
+    got = [tracker.predict_batch(times[c], dove_locations[c]) for c in chunks]
+    got = {key: np.concatenate([g[key] for g in got]) for key in expected}
+    assert_same_predictions(got, expected)
+
+    reference = tracker_class()
+    loop_predictions(reference, times, dove_locations)
+    assert tracker.count == reference.count
+    assert list(tracker.quarantine) == list(reference.quarantine)
+    assert tracker.ewa_dx_core.get() == pytest.approx(reference.ewa_dx_core.get(), rel=1e-12)
+
+
+def test_tick_batch_then_tick():
+    times, dove_locations = synthetic_feed(1000, seed=1)
+    tracker, reference = MixtureTracker(), MixtureTracker()
+    tracker.tick_batch(times[:600], dove_locations[:600])
+    loop_predictions(reference, times[:600], dove_locations[:600])
+    assert_same_predictions(loop_predictions(tracker, times[600:], dove_locations[600:]),
+                            loop_predictions(reference, times[600:], dove_locations[600:]))
+
+
+def test_default_batch_loops_over_tick():
+    times, dove_locations = synthetic_feed(300, seed=2)
+    got = QuantileRegressionRiverTracker().predict_batch(times, dove_locations)
+    assert_same_predictions(got, loop_predictions(QuantileRegressionRiverTracker(), times, dove_locations))
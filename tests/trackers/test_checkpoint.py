@@ -0,0 +1,102 @@
+import math
+import threading
+from collections import deque
+import numpy as np
+import pytest
+from sklearn.mixture import GaussianMixture
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.gmmtracker import GMMTracker
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+from birdgame.examples.derived.onlineemmixturetracker import OnlineEMMixtureTracker
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.stats.fewmeans import FEWMeans
+from birdgame.trackers.checkpoint import decode_state, encode_state
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+
+TRACKERS = [MixtureTracker, EMWAVarTracker, OnlineEMMixtureTracker,
+            lambda: GMMTracker(fit_mode='sync', batch_size=300, burn_in=500)]
+
+
+@pytest.mark.parametrize("make_tracker", TRACKERS)
+def test_restored_tracker_resumes_hot(make_tracker):
+    payloads = list(simulated_data_generator(3000, seed=0, mean_dt=0.1))
+    tracker = make_tracker()
+    for payload in payloads[:1500]:
+        tracker.tick(payload, {})
+    restored = make_tracker().restore(tracker.checkpoint())
+    assert list(restored.quarantine) == list(tracker.quarantine)
+    for payload in payloads[1500:]:
+        tracker.tick(payload, {})
+        restored.tick(payload, {})
+        assert restored.predict() == tracker.predict()
+    with pytest.raises(ValueError):
+        EMWAVarTracker().restore(MixtureTracker().checkpoint())
+
+
+_halt, _mid_fit, _resume = threading.Event(), threading.Event(), threading.Event()
+
+
+class HaltingGaussianMixture(GaussianMixture):
+    """ While _halt is set, stops each fit with its weights half updated until _resume is set. """
+
+    def fit(self, X, y=None):
+        super().fit(X, y)
+        if _halt.is_set():
+            weights, self.weights_ = self.weights_, np.full_like(self.weights_, np.nan)
+            _mid_fit.set()
+            _resume.wait(30)
+            self.weights_ = weights
+        return self
+
+
+def test_background_gmm_snapshot_is_not_taken_midway_through_a_fit():
+    tracker = GMMTracker(batch_size=300, burn_in=500, fit_mode='background')
+    tracker.gmm = HaltingGaussianMixture(**tracker.gmm.get_params())
+    payloads = list(simulated_data_generator(1500, seed=0, mean_dt=0.1))
+    for payload in payloads[:1000]:
+        tracker.tick(payload, {})
+    assert tracker.wait_for_refit(timeout=30) and tracker.is_fitted
+
+    _halt.set()
+    try:
+        for payload in payloads[1000:]:
+            tracker.tick(payload, {})
+        assert _mid_fit.wait(30)
+        state = tracker.checkpoint_state()
+    finally:
+        _halt.clear()
+        _resume.set()
+    assert tracker.wait_for_refit(timeout=30)
+    gmm, (weights, means, stds, _) = decode_state(state['gmm']), decode_state(state['gmm_params'])
+    assert np.array_equal(gmm.weights_, weights) and np.array_equal(gmm.means_.ravel(), means)
+
+
+def test_encoding_round_trips_values_json_cannot_hold():
+    means = FEWMeans(fading_factors=[0.1, 0.01], buffer_size=3)
+    for x in [1.0, 2.0, 4.0, 3.0]:
+        means.update(x)
+    value = {'array': np.arange(6, dtype=np.float32).reshape(2, 3), 'inf': math.inf, 'tuple': (1, 'a'),
+             'deque': deque([(0.5, 1.0)], maxlen=4), 2: np.int64(7), 'means': means}
+    decoded = decode_state(encode_state(value))
+    assert decoded['array'].dtype == np.float32 and np.array_equal(decoded['array'], value['array'])
+    assert decoded['inf'] == math.inf and decoded['tuple'] == (1, 'a') and decoded[2] == 7
+    assert decoded['deque'] == value['deque'] and decoded['deque'].maxlen == 4
+    assert decoded['means'].to_dict() == means.to_dict()
+    with pytest.raises(TypeError):
+        encode_state(object())
+
+
+def test_periodic_background_checkpoints(tmp_path):
+    path = tmp_path / 'tracker.ckpt'
+    tracker = MixtureTracker()
+    checkpointer = tracker.checkpoint_every(str(path), interval=0.0)  # Snapshot after every tick
+    evaluator = TrackerEvaluator(tracker)
+    for payload in simulated_data_generator(200, seed=1, mean_dt=0.1):
+        evaluator.tick_and_predict(payload, {})
+    checkpointer.close()
+    metrics = checkpointer.metrics()
+    assert metrics['snapshots'] == 201 and metrics['errors'] == 0
+    assert metrics['written'] + metrics['coalesced'] == 201 and metrics['written'] >= 1
+    restored = MixtureTracker().load_checkpoint(str(path))
+    assert restored.count == tracker.count and restored.predict() == tracker.predict()
+    assert restored.checkpointer is None and restored.latency_monitor is None
@@ -0,0 +1,87 @@
+import multiprocessing
+import pytest
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.trackers.deadline_tracker import DeadlineTracker
+from birdgame.trackers.trackerbase import TrackerBase
+
+ON_TIME = 30.0  # Deadline for ticks that must make it, far longer than an ungated predict takes
+
+
+class GatedTracker(TrackerBase):
+    """
+    Predicts a normal centered on the number of ticks seen. On the ticks listed, predict blocks until
+    `release` is set, so the test decides which ticks miss the deadline instead of the clock.
+    """
+
+    def __init__(self, gated_ticks=(), fail_ticks=(), horizon=3):
+        super().__init__(horizon)
+        self.gated_ticks = set(gated_ticks)
+        self.fail_ticks = set(fail_ticks)
+        self.release = multiprocessing.Event()  # Shared with a process worker too
+        self.seen = []
+
+    def tick(self, payload, performance_metrics):
+        self.seen.append(payload['time'])
+        self.count += 1
+
+    def predict(self):
+        if self.count in self.fail_ticks:
+            raise RuntimeError("Broken")
+        if self.count in self.gated_ticks:
+            self.release.wait()
+        return {"type": "mixture", "components": [
+            {"density": {"type": "builtin", "name": "norm", "params": {"loc": float(self.count), "scale": 1.0}},
+             "weight": 1.0}]}
+
+
+def loc(prediction):
+    return prediction['components'][0]['density']['params']['loc']
+
+
+def payloads(n):
+    return [{'time': float(i), 'dove_location': 0.0} for i in range(n)]
+
+
+def play(tracker, inner, payloads):
+    """ Tick and predict on every payload. Gated ticks get no time at all, and are released afterwards. """
+    predictions = []
+    for payload in payloads:
+        gated = tracker.seq + 1 in inner.gated_ticks
+        tracker.deadline = 0.0 if gated else ON_TIME
+        predictions.append(tracker.tick_and_predict(payload, {}))
+        if gated:
+            inner.release.set()
+    return predictions
+
+
+def test_late_predict_falls_back_to_cached_prediction():
+    inner = GatedTracker(gated_ticks=[10])
+    with DeadlineTracker(inner) as tracker:
+        locs = [loc(prediction) for prediction in play(tracker, inner, payloads(30))]
+    assert inner.seen == [float(i) for i in range(30)]  # The worker caught up on every payload
+    assert locs == [float(i) for i in range(1, 10)] + [9.0] + [float(i) for i in range(11, 31)]
+    assert tracker.metrics() == {'predictions': 30, 'on_time': 29, 'cached_fallbacks': 1, 'tracker_fallbacks': 0,
+                                 'errors': 0, 'fallback_rate': 1 / 30}
+
+
+def test_fallback_tracker_when_nothing_cached_or_stale():
+    inner = GatedTracker(gated_ticks=[1], fail_ticks=[20])
+    fallback = EMWAVarTracker()
+    with DeadlineTracker(inner, fallback=fallback, max_stale_ticks=0) as tracker:
+        first = play(tracker, inner, payloads(1))[0]
+        assert first == fallback.predict()
+        locs = [loc(prediction) for prediction in play(tracker, inner, payloads(25)[1:])]
+    assert locs[:18] == [float(i) for i in range(2, 20)] and locs[-5:] == [float(i) for i in range(21, 26)]
+    assert tracker.metrics()['errors'] == 1
+    assert tracker.metrics()['tracker_fallbacks'] == 2  # The first tick, and the one that raised
+    assert tracker.metrics()['cached_fallbacks'] == 0
+
+
+def test_process_worker():
+    inner = GatedTracker(gated_ticks=[5])
+    with DeadlineTracker(inner, worker='process') as tracker:
+        locs = [loc(prediction) for prediction in play(tracker, inner, payloads(20))]
+    assert locs[3:6] == [4.0, 4.0, 6.0] and locs[-1] == 20.0
+    assert tracker.metrics()['cached_fallbacks'] == 1 and tracker.metrics()['on_time'] == 19
+    with pytest.raises(ValueError):
+        DeadlineTracker(GatedTracker(), worker='fiber')
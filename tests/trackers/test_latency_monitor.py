@@ -0,0 +1,102 @@
+import time
+import numpy as np
+import pytest
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.trackers.latency_monitor import LatencyHistogram, LatencyMonitor
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator
+from birdgame.trackers.trackerbase import TrackerBase
+
+
+class SometimesSlowTracker(TrackerBase):
+    """ Predicts a normal at the current location, sleeping in predict on the ticks listed. """
+
+    def __init__(self, slow_ticks, delay=0.02, horizon=3):
+        super().__init__(horizon)
+        self.slow_ticks = set(slow_ticks)
+        self.delay = delay
+        self.current_x = None
+
+    def tick(self, payload, performance_metrics=None):
+        self.current_x = payload['dove_location']
+        self.count += 1
+
+    def predict(self):
+        if self.count in self.slow_ticks:
+            time.sleep(self.delay)
+        return {"type": "mixture", "components": [
+            {"density": {"type": "builtin", "name": "norm", "params": {"loc": self.current_x, "scale": 1.0}},
+             "weight": 1.0}]}
+
+
+def test_histogram_percentiles_are_within_precision():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=10, sigma=2, size=20_000).astype(np.int64)
+    histogram = LatencyHistogram()
+    for value in values[:10_000].tolist():
+        histogram.record(value)
+    histogram.record_many(values[10_000:])
+
+    assert histogram.count == len(values) and histogram.max == values.max() and histogram.min == values.min()
+    assert histogram.total == values.sum()
+    for q in (1, 50, 90, 99, 99.9):
+        exact = np.percentile(values, q, method='inverted_cdf')
+        assert histogram.percentile(q) == pytest.approx(exact, rel=2 ** -7)
+    assert histogram.percentile(100) == values.max()
+
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert np.array_equal(restored.counts, histogram.counts)
+    merged = LatencyHistogram().merge(restored).merge(histogram)
+    assert merged.count == 2 * len(values) and merged.percentile(50) == histogram.percentile(50)
+
+
+def test_histogram_record_many_matches_record():
+    values = np.concatenate([np.arange(1000), 2 ** np.arange(60) - 1, [61 * 10 ** 9]])
+    one, many = LatencyHistogram(sub_bucket_bits=5), LatencyHistogram(sub_bucket_bits=5)
+    for value in values.tolist():
+        one.record(value)
+    many.record_many(values)
+    assert np.array_equal(one.counts, many.counts)
+    for index in range(one.n_buckets - 1):  # Every value lands in the bucket that bounds it
+        low, high = one.bucket_bounds(index)
+        assert one._index(low) == index and one._index(high) == index
+
+
+def test_budget_violations_and_fallback():
+    payloads = [{'time': float(i), 'dove_location': float(i)} for i in range(20)]
+    tracker = SometimesSlowTracker(slow_ticks=[5, 12])
+    monitor = tracker.monitor_latency(budget=0.01, fallback_to_last_prediction=True)
+    predictions = [tracker.tick_and_predict(payload, {}) for payload in payloads]
+
+    assert monitor.violations == 2 and monitor.fallbacks == 2
+    assert predictions[4] is predictions[3] is not None  # The late prediction is replaced by the previous one
+    assert predictions[4]['components'][0]['density']['params']['loc'] == 3.0
+    summary = monitor.summary()
+    assert summary['calls'] == 20 and summary['predict_max_ms'] >= 20
+    assert summary['total_p50_ms'] < 10
+
+
+def test_evaluator_records_latency():
+    evaluator = TrackerEvaluator(EMWAVarTracker(), latency_budget=1.0)
+    for i in range(100):
+        evaluator.tick_and_predict({'time': float(i), 'dove_location': 0.1 * i})
+    assert evaluator.latency.tick.count == evaluator.latency.predict.count == 100
+    assert evaluator.latency.violations == 0
+    assert evaluator.latency is evaluator.tracker.latency_monitor  # One timing path, the tracker's
+
+
+def test_evaluator_goes_through_tracker_tick_and_predict():
+    class CountingTracker(SometimesSlowTracker):
+        calls = 0
+
+        def tick_and_predict(self, payload, performance_metrics):
+            self.calls += 1
+            return super().tick_and_predict(payload, performance_metrics)
+
+    tracker = CountingTracker(slow_ticks=[3], delay=0.02)
+    monitor = tracker.monitor_latency(budget=0.01)
+    evaluator = TrackerEvaluator(tracker, latency_budget=1.0)
+    for i in range(10):
+        evaluator.tick_and_predict({'time': float(i), 'dove_location': float(i)}, {})
+    assert tracker.calls == 10 and evaluator.latency is monitor  # The tracker's own monitor is kept
+    assert monitor.total.count == 10 and monitor.violations == 1
+    assert evaluator.score_count == 10 - tracker.horizon
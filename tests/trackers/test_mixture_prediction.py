@@ -0,0 +1,28 @@
+import math
+import pytest
+from densitypdf import density_pdf
+from birdgame.datasources.simulateddata import simulated_data_generator
+from birdgame.examples.derived.mixturetracker import MixtureTracker
+from birdgame.model_benchmark.emwavartracker import EMWAVarTracker
+from birdgame.trackers.mixture_scorer import mixture_pdf
+
+
+def reference_dict(locs, scales, weights):
+    return {"type": "mixture", "components": [
+        {"density": {"type": "builtin", "name": "norm", "params": {"loc": loc, "scale": scale}}, "weight": weight}
+        for loc, scale, weight in zip(locs, scales, weights)]}
+
+
+@pytest.mark.parametrize("tracker_class", [EMWAVarTracker, MixtureTracker])
+def test_tracker_predictions_unchanged(tracker_class):
+    tracker = tracker_class()
+    predictions = []
+    for payload in simulated_data_generator(500, seed=0):
+        tracker.tick(payload, {})
+        predictions.append(tracker.predict())
+        core, tail = tracker.ewa_dx_core.get(), tracker.ewa_dx_tail.get()
+        stds = [max(math.sqrt(core), 1e-6), max(math.sqrt(tail), 1e-6)]
+        assert predictions[-1] == reference_dict([payload['dove_location']] * 2, stds, tracker.weights)
+        assert density_pdf(predictions[-1], x=payload['dove_location']) == pytest.approx(
+            mixture_pdf(predictions[-1], payload['dove_location']))
+    assert len({id(p) for p in predictions}) == len(predictions)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from densitypdf import density_pdf
+from birdgame.trackers.mixture_scorer import mixture_pdf, NormalMixture, compile_mixture, batch_mixture_pdf
+
+
+def norm_component(loc, scale, weight):
+    return {"density": {"type": "builtin", "name": "norm", "params": {"loc": loc, "scale": scale}}, "weight": weight}
+
+
+def random_predictions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    predictions = []
+    for _ in range(n):
+        k = rng.integers(1, 5)
+        components = [norm_component(float(rng.normal()), float(rng.uniform(1e-3, 3)), float(rng.uniform(-1, 1)))
+                      for _ in range(k)]
+        predictions.append({"type": "mixture", "components": components})
+    return predictions
+
+
+def test_parity_with_density_pdf():
+    rng = np.random.default_rng(1)
+    for prediction in random_predictions(500):
+        x = float(rng.normal(scale=2))
+        assert mixture_pdf(prediction, x) == pytest.approx(density_pdf(prediction, x=x), rel=1e-12, abs=1e-300)
+        assert NormalMixture.from_dict(prediction).pdf(x) == pytest.approx(density_pdf(prediction, x=x), rel=1e-12)
+
+
+def test_batch_parity_with_fallback():
+    rng = np.random.default_rng(2)
+    predictions = random_predictions(200)
+    predictions[7] = {"type": "builtin", "name": "t", "params": {"df": 3, "loc": 0.0, "scale": 1.0}}
+    predictions[11] = {"type": "mixture", "components": [{"density": predictions[7], "weight": 1.0},
+                                                          norm_component(0.5, 2.0, 1.0)]}
+    xs = rng.normal(size=len(predictions))
+    expected = [density_pdf(p, x=float(x)) for p, x in zip(predictions, xs)]
+    assert np.allclose(batch_mixture_pdf(predictions, xs), expected, rtol=1e-12)
+    assert mixture_pdf(predictions[11], float(xs[11])) == pytest.approx(expected[11])
+    assert compile_mixture(predictions[7]) is None
+
+
+def test_invalid_scale_raises_like_density_pdf():
+    prediction = {"type": "mixture", "components": [norm_component(0.0, 0.0, 1.0)]}
+    with pytest.raises(ValueError):
+        mixture_pdf(prediction, 0.0)
+
+
+def test_round_trip():
+    prediction = {"type": "mixture", "components": [norm_component(1.0, 0.5, 0.9), norm_component(1.0, 2.0, 0.1)]}
+    assert NormalMixture.from_dict(prediction).to_dict() == prediction
+    grid = np.linspace(-3, 5, 11)
+    assert np.allclose(NormalMixture.from_dict(prediction).pdf(grid), [density_pdf(prediction, x=x) for x in grid])
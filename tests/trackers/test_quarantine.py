@@ -0,0 +1,80 @@
+import random
+import numpy as np
+from birdgame.trackers.trackerbase import Quarantine
+
+
+class ListQuarantine:
+    """ The original list-based implementation, kept here as the reference semantics. """
+
+    def __init__(self, horizon):
+        self.horizon = horizon
+        self.quarantine = []
+
+    def add_to_quarantine(self, time, value):
+        self.quarantine.append((time + self.horizon, value))
+
+    def pop_from_quarantine(self, current_time):
+        valid = [(j, (ti, xi)) for (j, (ti, xi)) in enumerate(self.quarantine) if ti <= current_time]
+        if valid:
+            prev_ndx, (ti, prev_x) = valid[-1]
+            self.quarantine = self.quarantine[prev_ndx:]
+            return prev_x
+        return None
+
+
+def _compare(times, horizon=3):
+    fast, slow = Quarantine(horizon), ListQuarantine(horizon)
+    for i, t in enumerate(times):
+        fast.add_to_quarantine(t, i)
+        slow.add_to_quarantine(t, i)
+        assert fast.pop_from_quarantine(t) == slow.pop_from_quarantine(t)
+        assert list(fast.quarantine) == slow.quarantine
+
+
+def test_monotone_times():
+    random.seed(1)
+    t, times = 0.0, []
+    for _ in range(5000):
+        t += random.choice([0.0, 0.0, 0.01, 0.1, 0.5])  # repeated times are common in the feed
+        times.append(t)
+    _compare(times)
+
+
+def test_out_of_order_times():
+    random.seed(2)
+    times = [random.uniform(0, 50) for _ in range(2000)]
+    _compare(times)
+
+
+def test_mostly_monotone_with_glitches():
+    random.seed(3)
+    t, times = 0.0, []
+    for _ in range(5000):
+        t += random.uniform(0, 0.2)
+        times.append(t - 4.0 if random.random() < 0.01 else t)
+    _compare(times)
+
+
+def _compare_batch(times, chunk_size, horizon=3):
+    fast, slow = Quarantine(horizon), ListQuarantine(horizon)
+    for start in range(0, len(times), chunk_size):
+        chunk = times[start:start + chunk_size]
+        values = [float(start + i) for i in range(len(chunk))]
+        popped, released = fast.add_and_pop_batch(chunk, values)
+        for t, x, p, r in zip(chunk, values, popped, released):
+            slow.add_to_quarantine(t, x)
+            expected = slow.pop_from_quarantine(t)
+            assert r == (expected is not None)
+            assert (p == expected) if r else np.isnan(p)
+        assert list(fast.quarantine) == slow.quarantine
+
+
+def test_add_and_pop_batch():
+    random.seed(4)
+    t, times = 0.0, []
+    for _ in range(3000):
+        t += random.choice([0.0, 0.05, 0.5, 2.0])
+        times.append(t)
+    for chunk_size in [1, 7, 500, 3000]:
+        _compare_batch(times, chunk_size)
+    _compare_batch([random.uniform(0, 50) for _ in range(500)], 50)  # out-of-order fallback
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+import numpy as np
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from birdgame.trackers.retrain_executor import RetrainExecutor
+
+
+def fit_line(model, x, y, delay=0.0):
+    time.sleep(delay)
+    return {'name': model, 'coefficients': np.polyfit(x, y, 1), 'n': len(x)}
+
+
+def fit_fails(model, x):
+    raise ValueError("cannot fit")
+
+
+def test_fits_in_a_worker_and_coalesces():
+    swapped = []
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        executor = RetrainExecutor(fit=fit_line, on_result=swapped.append, pool=pool)
+        x = np.arange(100.0)
+        view = x[::2]  # Not contiguous, copied into shared memory on submit
+        executor.submit('line', view, 3 * view + 1, delay=0.5)
+        for n in range(10, 15):
+            executor.submit('line', x[:n], 2 * x[:n], version=n)  # While the first fit is running
+        assert executor.wait(timeout=30)
+        executor.close()
+
+    assert [model['n'] for model in swapped] == [50, 14]  # The latest request replaced the others
+    assert executor.model is swapped[-1]
+    assert np.allclose(swapped[0]['coefficients'], [3, 1]) and np.allclose(swapped[1]['coefficients'], [2, 0])
+    metrics = executor.metrics()
+    assert (metrics['submitted'], metrics['completed'], metrics['coalesced'], metrics['failed']) == (6, 2, 4, 0)
+    assert metrics['versions_behind'] == 0 and metrics['model_age_s'] >= 0
+    assert metrics['fit_max_ms'] >= 500 and metrics['round_trip_p50_ms'] > 0
+    with pytest.raises(RuntimeError):
+        executor.submit('line', x, x)
+
+
+def test_failures_are_counted_and_keep_the_previous_model():
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        executor = RetrainExecutor(fit=fit_fails, pool=pool)
+        executor.submit('model', np.ones(3))
+        assert executor.wait(timeout=30)
+        executor.close()
+    assert executor.model is None
+    assert executor.metrics()['failed'] == 1
+
+
+def test_idle_executor_holds_no_shared_memory():
+    # Never closed, as a tracker that is simply dropped at exit
+    script = """
+import numpy as np
+from birdgame.trackers.retrain_executor import RetrainExecutor
+executor = RetrainExecutor(fit=np.add)
+for n in range(3):
+    executor.submit(1.0, np.arange(1000.0 + n))
+assert executor.wait(timeout=30)
+assert executor._spare is None and executor.model[0] == 1.0
+"""
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'leaked' not in result.stderr
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from birdgame.trackers.ring_buffer import RingBuffer
+
+
+def test_views_match_a_trimmed_list():
+    buffer = RingBuffer(capacity=7)
+    values = []
+    for i in range(30):
+        buffer.append(float(i))
+        values = (values + [float(i)])[-7:]
+        assert len(buffer) == len(values)
+        assert buffer.view().tolist() == values
+        assert buffer.view(3).tolist() == values[-3:]
+        windows = buffer.windows(3)
+        expected = [values[j:j + 3] for j in range(len(values) - 2)]
+        assert windows.tolist() == expected
+        assert buffer.windows(3) is windows  # Cached until the next append
+        if len(windows):
+            assert np.shares_memory(windows, buffer.view())  # No copies
+    with pytest.raises(ValueError):
+        buffer.view()[0] = 1.0
+    assert buffer.count == 30
+
+
+def test_rows_extend_and_round_trip():
+    buffer = RingBuffer(capacity=4, width=2)
+    one_by_one = RingBuffer(capacity=4, width=2)
+    rows = np.arange(22.0).reshape(11, 2)
+    buffer.extend(rows[:2])
+    buffer.extend(rows[2:])
+    for row in rows:
+        one_by_one.append(row)
+    assert np.array_equal(buffer.view(), rows[-4:])
+    assert np.array_equal(one_by_one.view(), rows[-4:])
+    assert buffer.count == one_by_one.count == 11
+
+    restored = RingBuffer.from_dict(buffer.to_dict())
+    restored.append([100.0, 101.0])
+    buffer.append([100.0, 101.0])
+    assert np.array_equal(restored.view(), buffer.view()) and restored.count == 12
+    assert RingBuffer(capacity=3).windows(2).shape == (0, 2)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from birdgame.trackers.trackerbase import TrackerBase
+from birdgame.trackers.tracker_evaluator import TrackerEvaluator, robust_mean_log_like
+
+
+class RandomScaleTracker(TrackerBase):
+    """ Predicts a normal at the current location with a randomly varying scale. """
+
+    def __init__(self, horizon=3, seed=0):
+        super().__init__(horizon)
+        self.rng = np.random.default_rng(seed)
+        self.current_x = None
+
+    def tick(self, payload, performance_metrics=None):
+        self.current_x = payload['dove_location']
+
+    def predict(self):
+        scale = float(self.rng.uniform(1e-3, 2.0))
+        return {"type": "mixture", "components": [
+            {"density": {"type": "builtin", "name": "norm", "params": {"loc": self.current_x, "scale": scale}},
+             "weight": 1.0}]}
+
+
+def synthetic_feed(n, seed=1):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.exponential(0.06, size=n))
+    locations = np.cumsum(rng.normal(scale=0.05, size=n))
+    for t, x in zip(times, locations):
+        yield {'time': float(t), 'dove_location': float(x)}
+
+
+@pytest.mark.parametrize("window", [1, 7, 100])
+def test_running_scores_match_full_history(window):
+    evaluator = TrackerEvaluator(RandomScaleTracker(), score_window_size=window, keep_scores=True)
+    for i, payload in enumerate(synthetic_feed(3000)):
+        evaluator.tick_and_predict(payload)
+        if evaluator.score_count and i % 97 == 0:
+            scores = list(evaluator.scores)
+            assert evaluator.overall_likelihood_score() == pytest.approx(robust_mean_log_like(scores), rel=1e-10)
+            assert evaluator.recent_likelihood_score() == pytest.approx(robust_mean_log_like(scores[-window:]),
+                                                                        rel=1e-9, abs=1e-12)
+    assert len(evaluator.scores) == evaluator.score_count > 0
+
+
+def test_scores_retained_unless_asked_not_to():
+    retained, dropped = TrackerEvaluator(RandomScaleTracker()), TrackerEvaluator(RandomScaleTracker(), keep_scores=False)
+    for payload in synthetic_feed(500):
+        retained.tick_and_predict(payload)
+        dropped.tick_and_predict(payload)
+    assert len(retained.scores) == retained.score_count > 0
+    assert dropped.scores is None
+    assert dropped.score_count == retained.score_count
+    assert dropped.overall_likelihood_score() == retained.overall_likelihood_score()
@@ -0,0 +1,55 @@
+import numpy as np
+from birdgame import GAME_PARAMS
+from birdgame.wealth.wealth_mechanism import update_wealth
+from birdgame.wealth.wealth_book import WealthBook
+
+
+def random_likelihoods(n_ticks, n_players, seed=0):
+    rng = np.random.default_rng(seed)
+    likelihoods = rng.lognormal(mean=0.0, sigma=1.5, size=(n_ticks, n_players))
+    likelihoods[rng.uniform(size=likelihoods.shape) < 0.1] = np.nan  # skipped predictions
+    likelihoods[rng.uniform(size=likelihoods.shape) < 0.02] = 0.0
+    likelihoods[:5, 0] = np.nan  # a late joiner
+    return likelihoods
+
+
+def assert_same(players, book):
+    for i, name in enumerate(book.names):
+        assert np.isclose(players[name]["wealth"], book.wealth[i], rtol=1e-12)
+        if "ewma_blend_logL" in players[name]:
+            assert np.isclose(players[name]["ewma_short_logL"], book.ewma_short_logL[i], rtol=1e-12)
+            assert np.isclose(players[name]["ewma_long_logL"], book.ewma_long_logL[i], rtol=1e-12)
+            assert np.isclose(players[name]["ewma_blend_logL"], book.ewma_blend_logL[i], rtol=1e-12)
+        else:
+            assert not book.initialized[i]
+
+
+def test_parity_with_update_wealth():
+    params = dict(GAME_PARAMS, ewma_weight=0.7, investment_fraction=0.01)
+    names = [f"player_{i}" for i in range(25)]
+    likelihoods = random_likelihoods(400, len(names))
+    players = {name: {"wealth": params["initial_wealth"]} for name in names}
+    book = WealthBook(names, params=params)
+
+    for k, row in enumerate(likelihoods):
+        wealth_update = k >= 50
+        update_wealth(players, {name: (None if np.isnan(v) else float(v)) for name, v in zip(names, row)},
+                      params, wealth_update=wealth_update)
+        book.update(row, wealth_update=wealth_update)
+        assert_same(players, book)
+
+
+def test_update_block_and_round_trip():
+    likelihoods = random_likelihoods(300, 10, seed=1)
+    flags = np.arange(300) >= 20
+    book = WealthBook(10)
+    trajectory = book.update_block(likelihoods, wealth_update=flags, record=True)
+    assert trajectory.shape == (300, 10)
+    assert np.array_equal(trajectory[-1], book.wealth)
+
+    players = WealthBook(10).to_players()
+    for row, flag in zip(likelihoods, flags):
+        update_wealth(players, {i: (None if np.isnan(v) else float(v)) for i, v in enumerate(row)},
+                      wealth_update=flag)
+    assert_same(players, book)
+    assert_same(players, WealthBook.from_players(players))